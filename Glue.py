@@ -8,22 +8,49 @@ import subprocess
 import os
 import threading
 import shlex
-import json
+import time
 import traceback
 
 if version_info[0] == 3:
     import io
-    from .GlueIO import FileReader
+    from .GlueStream import StreamDecoder, iter_process_output, decode_output
+    from .GlueScrollback import ScrollbackTrimmer
+    from .GluePath import executable_index, login_environment
+    from .GlueUser import user_commands, UserCommandCycleError
+    from .GlueJobs import get_job_table, remove_job, close_job_table, parse_job_id, process_group_args, release_process
+    from .GlueScheduler import scheduler
+    from .GlueRegistry import subcommands
+    from .GlueOutput import get_write_queue, close_write_queue
+    from .GlueSpill import OutputSpiller, spill_registry
+    from .GlueMetrics import CommandMetrics, command_metrics, format_duration
+    from .GlueSession import get_session, close_session
+    from .GlueHistory import command_history
+    from .GlueComplete import complete_command_line, common_prefix, directory_cache
+    from .GlueSearch import output_index
+    from .GlueCache import result_cache, OutputTee
+    from .GlueTranscript import transcript_registry
 else:
     import StringIO
-    from GlueIO import FileReader
+    from GlueStream import StreamDecoder, iter_process_output, decode_output
+    from GlueScrollback import ScrollbackTrimmer
+    from GluePath import executable_index, login_environment
+    from GlueUser import user_commands, UserCommandCycleError
+    from GlueJobs import get_job_table, remove_job, close_job_table, parse_job_id, process_group_args, release_process
+    from GlueScheduler import scheduler
+    from GlueRegistry import subcommands
+    from GlueOutput import get_write_queue, close_write_queue
+    from GlueSpill import OutputSpiller, spill_registry
+    from GlueMetrics import CommandMetrics, command_metrics, format_duration
+    from GlueSession import get_session, close_session
+    from GlueHistory import command_history
+    from GlueComplete import complete_command_line, common_prefix, directory_cache
+    from GlueSearch import output_index
+    from GlueCache import result_cache, OutputTee
+    from GlueTranscript import transcript_registry
 
 class GlueCommand(sublime_plugin.TextCommand):
     def __init__(self, *args, **kwargs):
         self.settings = sublime.load_settings('Glue.sublime-settings')
-        self.stdout = ""
-        self.stderr = ""
-        self.exitcode = 1
         self.userpath = self.settings.get('glue_userpath')
         self.shellpath = self.settings.get('glue_shellpath')
         self.original_env_path = os.environ['PATH']
@@ -31,14 +58,32 @@ class GlueCommand(sublime_plugin.TextCommand):
         self.start_dirpath = ""
         self.current_dirpath = self.settings.get('glue_working_directory')
         self.current_filepath = ""
+        self.stream_output = self.settings.get('glue_stream_output', True)
+        self.stream_buffer_size = self.settings.get('glue_stream_buffer_size', 1048576)
+        self.output_encoding = self.settings.get('glue_output_encoding', 'utf-8')
+        self.output_errors = self.settings.get('glue_output_errors', 'replace')
+        self.strip_ansi = self.settings.get('glue_strip_ansi', True)
+        self.overwrite_lines = self.settings.get('glue_overwrite_lines', True)
+        self.spill_threshold = self.settings.get('glue_spill_threshold', 262144)
+        self.spill_tail_chars = self.settings.get('glue_spill_tail_chars', 8192)
+        self.session_mode = self.settings.get('glue_session_mode', False)
+        self.command_timeout = self.settings.get('glue_command_timeout', 0)
+        self.next_timeout = None # set by glue timeout for the next system command
+        self.next_cache_key = None # set by glue cached for the next system command
+        self.next_prompt_command = None # set by glue cached, the command line that the prompt of the next system command shows
+        self.user_command_chain = [] # user commands whose expansion is running, for cycles through built-ins
         self.attr_lock = threading.Lock() # thread lock for attribute reads/writes
         sublime_plugin.TextCommand.__init__(self, *args, **kwargs)
 
     #------------------------------------------------------------------------------
     # [ run method ] - plugin start method
     #------------------------------------------------------------------------------
-    def run(self, edit):
+    def run(self, edit, panel_only=False):
         try:
+            # reopen the input panel after a command when the working directory is already established
+            if panel_only and len(self.current_dirpath) > 0 and self.view.window() is not None:
+                self.show_panel()
+                return
             #------------------------------------------------------------------------------
             # Establish Current Working Directory
             # 1. check for current_dirpath attribute (empty string by default)
@@ -120,10 +165,37 @@ class GlueCommand(sublime_plugin.TextCommand):
             #------------------------------------------------------------------------------
             # Launch the Input Panel for User Input - off to the races...
             #------------------------------------------------------------------------------
-            self.view.window().show_input_panel(self.ps1 + ' ', '', self.muterun_runner, None, None)
+            self.show_panel()
         except Exception:
             self.exception_handler()
 
+    #------------------------------------------------------------------------------
+    # [ show_panel method ] - open the input panel for the next command
+    #   the panel view is marked for the history navigation and completion key bindings
+    #------------------------------------------------------------------------------
+    def show_panel(self):
+        self.view.settings().set('glue_view', True) # for the cancel key binding
+        panel_view = self.view.window().show_input_panel(self.ps1 + ' ', '', self.muterun_runner, None, None)
+        if panel_view is not None:
+            panel_view.settings().set('glue_input_panel', True)
+            panel_view.settings().set('glue_panel_dirpath', self.current_dirpath)
+        self.prefetch_completions()
+
+    #------------------------------------------------------------------------------
+    # [ prefetch_completions method ] - update the completion indexes in the background while the user types
+    #------------------------------------------------------------------------------
+    def prefetch_completions(self):
+        directory_cache.refresh_async(self.current_dirpath)
+        if len(self.userpath) > 0:
+            path_string = self.userpath
+        elif self.use_login_environment():
+            path_string = self.get_login_path()
+        else:
+            path_string = os.environ.get('PATH', '')
+        executable_index.refresh_async(path_string)
+        self.load_user_commands()
+        user_commands.refresh_async()
+
     #------------------------------------------------------------------------------
     # [ cleanup method ] - odds and ends before close of plugin when 'exit' called
     #------------------------------------------------------------------------------
@@ -131,6 +203,7 @@ class GlueCommand(sublime_plugin.TextCommand):
         self.current_dirpath = "" # clear the saved working directory path
         self.start_dirpath = "" # clear the start directory path for the file
         self.settings.set('glue_working_directory', '') # clear the saved directory path
+        close_session(self.view.id()) # end the shell session of the view
         if sublime.platform() == "osx":
             os.environ['PATH'] = self.original_env_path # cleanup any environ PATH changes that Glue performed on Mac systems
 
@@ -160,6 +233,7 @@ class GlueCommand(sublime_plugin.TextCommand):
     #------------------------------------------------------------------------------
     def muterun_runner(self, user_command):
         try:
+            command_history.add(user_command, self.current_dirpath)
             self.muterun(user_command)
         except Exception:
             self.exception_handler(user_command)
@@ -205,242 +279,143 @@ class GlueCommand(sublime_plugin.TextCommand):
             else:
                 dirchange_error_message = "Please enter a path following the 'cd' command\n"
                 self.view.run_command('glue_writer', {'text': dirchange_error_message, 'command': 'cd', 'exit': False})
+        # JOBS command
+        elif com_args[0] == "jobs":
+            job_lines = []
+            for job in self.get_jobs().list_jobs():
+                pid_string = str(job.pid) if job.pid is not None else '-'
+                job_lines.append("[" + str(job.job_id) + "]  " + job.get_status().ljust(8) + "  " + pid_string.rjust(7) + "  " + job.command)
+            if len(job_lines) > 0:
+                jobs_text = '\n'.join(job_lines) + '\n'
+            else:
+                jobs_text = "There are no Glue jobs\n"
+            self.view.run_command('glue_writer', {'text': jobs_text, 'command': user_command, 'exit': False})
+        # FG command
+        elif com_args[0] == "fg":
+            if len(com_args) > 1:
+                job = self.find_job(com_args[1])
+            else:
+                job_list = [job for job in self.get_jobs().list_jobs() if job.background]
+                job = job_list[-1] if len(job_list) > 0 else None # the most recent background job
+            if job is None or not job.background:
+                fg_error_msg = "fg: no such background job\n"
+                self.view.run_command('glue_writer', {'text': fg_error_msg, 'command': user_command, 'exit': False})
+            else:
+                self.foreground_job(job, user_command)
+        # KILL command (%n job ids only, process ids and other arguments are passed to the system kill command)
+        elif com_args[0] == "kill" and len(com_args) == 2 and com_args[1].startswith('%'):
+            job = self.find_job(com_args[1])
+            if job is None:
+                kill_msg = "kill: " + com_args[1] + ": no such job\n"
+            elif job.kill():
+                kill_msg = "[" + str(job.job_id) + "] killed " + job.command + "\n"
+            else:
+                kill_msg = "[" + str(job.job_id) + "] is not running\n"
+            self.view.run_command('glue_writer', {'text': kill_msg, 'command': user_command, 'exit': False})
         # GLUE commands
         elif com_args[0] == 'glue':
             glue_command = ' '.join(com_args)
             if len(com_args) > 1:
-                # HELP Command
-                if com_args[1] == "--help" or com_args[1] == "-h" or com_args[1] == "help":
-                    help_text = get_help_text()
-                    self.view.run_command('glue_writer', {'text': help_text, 'command': glue_command, 'exit': False})
-                # BROWSE command
-                elif com_args[1] == "browse":
-                    if len(com_args) > 2:
-                        import webbrowser
-                        browse_string = com_args[2]
-                        # if they requested a url with protocol, just open it
-                        if browse_string.startswith('http://') or browse_string.startswith('https://'):
-                            webbrowser.open(browse_string)
-                        else:
-                            # check if it is a local file that user wants to open in browser
-                              # remove the initial OS dependent filepath separator character if added (will be added back in .join method below)
-                            if browse_string.startswith(os.sep):
-                                browse_string = browse_string[1:] # remove the first char (?are there typically two chars '\\' in Windows?)
-                            elif os.altsep != None:
-                                if browse_string.startswith(os.altsep): # if there is an alternate separator (i.e. / on windows)
-                                    browse_string = browse_string[1:] # then remove it
-                            check_path = os.path.join(os.path.abspath(self.current_dirpath), browse_string)
-                            # test for existence of local file on the path
-                            if self.is_file_here(check_path):
-                                webbrowser.open('file://' + check_path) # if it is a local file, open it in browser
-                            else:
-                                webbrowser.open('http://' + browse_string) # if not, assume that it is a URL without protcol and add it
-                        browser_msg = "glue browse [ " + browse_string + " ] complete\n"
-                        self.view.run_command('glue_writer', {'text': browser_msg, 'command': glue_command, 'exit': False})
-                    else:
-                        browser_error_msg = "Please enter a URL or local filepath after the glue browse command\n"
-                        self.view.run_command('glue_writer', {'text': browser_error_msg, 'command': glue_command, 'exit': False})
-                # CLEAR command
-                elif com_args[1] == "clear":
-                    self.view.run_command('glue_clear_editor')
-                    # keeps the input panel open for more commands
-                    self.view.run_command('glue')
-                # FINDER command
-                elif com_args[1] == "finder":
-                    # user is requesting a directory as an argument
-                    if len(com_args) > 2:
-                        finder_dirpath = com_args[2]
-                        if os.path.isdir(finder_dirpath):
-                            self.view.window().run_command("open_dir", {"dir": os.path.abspath(finder_dirpath)}) # open it
-                            curdir_finder_msg = "The requested directory was opened in your finder\n"
-                        elif os.path.isfile(finder_dirpath):
-                            finder_dirpath = os.path.dirname(finder_dirpath)
-                            self.view.window().run_command("open_dir", {"dir": os.path.abspath(finder_dirpath)}) # open it
-                            curdir_finder_msg = "The requested directory was opened in your finder\n"
-                        else:
-                            curdir_finder_msg = "Unable to find the requested directory path.  Please try again.\n"
-                        # provide Glue view output to user after execution of the finder reveal
-                        self.view.run_command('glue_writer', {'text': curdir_finder_msg, 'command': glue_command, 'exit': False})
-                    # user is requesting the current working directory (i.e. no argument)
-                    else:
-                        if len(self.current_dirpath) > 0 and os.path.isdir(self.current_dirpath):
-                            self.view.window().run_command("open_dir", {"dir": self.current_dirpath})
-                            curdir_finder_msg = "The current directory was opened in your finder.\n"
-                            self.view.run_command('glue_writer', {'text': curdir_finder_msg, 'command': glue_command, 'exit': False})
-                        else:
-                            curdir_finderror_msg = "Unable to detect the current working directory.  Please restart the Glue plugin and try again.\n"
-                            self.view.run_command('glue_writer', {'text': curdir_finderror_msg, 'command': glue_command, 'exit': False})
-                # GOTO command
-                elif com_args[1] == "goto":
-                    if len(com_args) > 2:
-                        goto_user_msg = "goto " + com_args[2] + " completed\n"
-                        self.view.window().run_command("show_overlay", {"overlay": "goto", "show_files": True, "text": com_args[2]})
-                        self.view.run_command('glue_writer', {'text': goto_user_msg, 'command': glue_command, 'exit': False})
-                    else:
-                        # if no query string, just open the overlay
-                        goto_user_msg = "goto overlay launch completed\n"
-                        self.view.window().run_command("show_overlay", {"overlay": "goto", "show_files": True})
-                        self.view.run_command('glue_writer', {'text': goto_user_msg, 'command': glue_command, 'exit': False})
-                # LOCALHOST command
-                elif com_args[1] == "localhost":
-                    import webbrowser
-                    localhost_url = 'http://localhost:8000'
-                    if len(com_args) > 2:
-                        protocol = com_args[2] # the argument is the requested protocol (doesn't perform sanity check)
-                        localhost_url = 'http://localhost:' + protocol
-                    webbrowser.open(localhost_url)
-                    localhost_browse_msg = "glue localhost complete\n"
-                    self.view.run_command('glue_writer', {'text': localhost_browse_msg, 'command': glue_command, 'exit': False})
-                # NEW command
-                elif com_args[1] == "new":
-                    filenew_text = "glue new command completed\n"
-                    self.view.run_command('glue_writer', {'text': filenew_text, 'command': glue_command, 'exit': False})
-                    self.view.window().new_file()
-                # OPEN command
-                elif com_args[1] == "open":
-                    if len(com_args) > 2:
-                        fileopen_text = "glue open command completed\n"
-                        self.view.run_command('glue_writer', {'text': fileopen_text, 'command': glue_command, 'exit': False})
-                        self.view.window().run_command('glue_file_opener', {'current_dir': self.current_dirpath, 'file_list': com_args[2:]})
-                    else:
-                        missing_file_error_msg = "Please enter at least one filepath after the open command.\n"
-                        self.view.run_command('glue_writer', {'text': missing_file_error_msg, 'command': glue_command, 'exit': False})
-                # PATH command
-                elif com_args[1] == "path":
-                    if len(self.userpath) == 0:
-                        # obtain the 'real' mac osx path using the get_mac_path method if not set by user
-                        if sublime.platform() == "osx":
-                            # get the PATH
-                            updated_path = self.get_mac_path() # attempt to obtain the PATH set in the user's respective shell startup file
-                            # set the Mac environ PATH to the obtained PATH
-                            os.environ['PATH'] = updated_path
-                            # assign the PATH to the self.userpath attribute for the executable search below (and for reuse while running)
-                            self.userpath = updated_path
-                            the_path = self.userpath
-                        elif sublime.platform() == "windows":
-                            the_path = os.environ['PATH']
-                            # do not set the PATH in Windows, letting Win shell handle the command
-                        elif sublime.platform() == "linux":
-                            self.userpath = os.environ['PATH']
-                            the_path = self.userpath
-                    else:
-                        # if there is a self.userpath that is set (user set in settings, previously set above) then set Python environ PATH string
-                        the_path = self.userpath
-                    self.view.run_command('glue_writer', {'text': the_path + '\n', 'command': glue_command, 'exit': False})
-                # TEMPLATE command
-                elif com_args[1] == "template":
-                    if len(com_args) > 2:
-                        template_name = ""
-                        template_filename = ""
-                        template_multi = False
-                        # test for the flag and name option in the user command
-                        for argument in com_args[2:]: # only test the arguments after the 'template' subcommand
-                            if "--multi" in argument:
-                                template_multi = True # user indicated that the file will specify multiple file paths
-                            elif argument.startswith('--name='):
-                                name_list = argument.split('=')
-                                template_filename = name_list[1] # the user assigned file write name of the file
-                            else:
-                                template_name = argument # if it is not one of the above options, then it is the requested template name
-                        print_string = template_name + " " + template_filename + " " + str(template_multi)
-                        self.view.run_command('glue_writer', {'text': print_string, 'command': glue_command, 'exit': False})
-                    else:
-                        # user did not enter a template name
-                        template_err_msg = "Please enter a template name after your command.\n"
-                        self.view.run_command('glue_writer', {'text': template_err_msg, 'command': glue_command, 'exit': False})
-                # USER command
-                elif com_args[1] == "user":
-                    uc_file_path = os.path.join(sublime.packages_path(), 'Glue-Commands', 'glue.json')
-                    if self.is_file_here(uc_file_path):
-                        fr = FileReader(uc_file_path)
-                        user_json = fr.read_utf8()
-                        usercom_dict = json.loads(user_json)
-                        if len(usercom_dict) > 0:
-                            if len(usercom_dict) == 1:
-                                com_extension_string = 'extension'
-                                com_number_string = 'lonely'
-                            else:
-                                com_extension_string = 'extensions'
-                                com_number_string = str(len(usercom_dict))
-                            number_com_msg = "Your " + com_number_string + " Glue " + com_extension_string + ":\n\n"
-                            com_list = []
-                            for key, value in self.xitems(usercom_dict):
-                                com_string = key + " : " + value
-                                com_list.append(com_string)
-                            com_string = '\n'.join(sorted(com_list))
-                            com_string = number_com_msg + com_string + '\n'
-                            self.view.run_command('glue_writer', {'text': com_string, 'command': glue_command, 'exit': False})
-                        else:
-                            user_error_msg = "Your glue.json file does not contain any commands\n"
-                            self.view.run_command('glue_writer', {'text': user_error_msg, 'command': glue_command, 'exit': False})
-                    else:
-                        usercom_error_msg = "The glue.json file could not be found.  Please confirm that this is contained in a Glue-Commands directory in your Sublime Text Packages directory.\n"
-                        self.view.run_command('glue_writer', {'text': usercom_error_msg, 'command': glue_command, 'exit': False})
-                # WCO command
-                elif com_args[1] == "wco":
-                    if len(com_args) > 2:
-                        fileopen_text = "glue wco command completed\n"
-                        self.view.run_command('glue_writer', {'text': fileopen_text, 'command': glue_command, 'exit': False})
-                        self.view.window().run_command('glue_file_wildcard_opener', {'current_dir': self.current_dirpath, 'match_pattern': com_args[2]})
-                    else:
-                        missing_file_error_msg = "Please enter at least one filepath after the open command.\n"
-                        self.view.run_command('glue_writer', {'text': missing_file_error_msg, 'command': glue_command, 'exit': False})
-                # TEST command
-                elif com_args[1] == "test":
-                    pass
-                    # test open containing folder
-
-                    #self.view.window().run_command("open_dir", {"dir": self.current_dirpath})
-
-                    # self.view.run_command('glue_writer', {'text': current_proj, 'command': glue_command, 'exit': False})
-                # USER ALIAS commands
+                # single lookup in the subcommand table, user command extensions otherwise
+                handler = subcommands.get(com_args[1])
+                if handler is not None:
+                    handler(self, com_args, glue_command)
                 else:
-                    if len(com_args) > 1:
-                        uc_file_path = os.path.join(sublime.packages_path(), 'Glue-Commands', 'glue.json')
-                        if self.is_file_here(uc_file_path):
-                            fr = FileReader(uc_file_path)
-                            user_json = fr.read_utf8()
-                            usercom_dict = json.loads(user_json)
-                            # if arguments from command, add those in location indicated by the file
-                            if len(com_args) > 2:
-                                # arguments were included on the command line, pass them to the user command
-                                arguments = ' '.join(com_args[2:])
-                            else:
-                                # no additional arguments were included so pass empty string if there is an {{args}} tag
-                                arguments = ''
-                            if com_args[1] in usercom_dict:
-                                user_command = usercom_dict[com_args[1]]
-                                user_command = user_command.replace('{{args}}', arguments) # replace with CL args
-                                user_command = user_command.replace('{{pwd}}', os.getcwd()) #  replace with working dir path
-                                user_command = user_command.replace('{{clipboard}}', sublime.get_clipboard()) # replace with contents of clipboard
-                                self.muterun(user_command) # execute the command
-                            else:
-                                # didn't find a glue alias with the requested name in the existing glue alias settings file
-                                bad_cmd_error_msg = "Glue could not identify that command.  Please try again.\n"
-                                self.view.run_command('glue_writer', {'text': bad_cmd_error_msg, 'command': glue_command, 'exit': False})
-                        # Didn't find a glue alias setting file, provide error message
-                        else:
-                            bad_cmd_error_msg = "Glue could not identify that command.  Please try again.\n"
-                            self.view.run_command('glue_writer', {'text': bad_cmd_error_msg, 'command': glue_command, 'exit': False})
+                    self.run_user_command(com_args, glue_command)
             else:
                 missing_arg_error_msg = "Glue requires an argument.  Please use 'glue help' for for more information.\n"
                 self.view.run_command('glue_writer', {'text': missing_arg_error_msg, 'command': glue_command, 'exit': False})
         # Execute the system command that was entered
         else:
             try:
+                # a trailing & runs the command as a background job
+                background = False
+                foreground_command = strip_background(user_command)
+                if foreground_command is not None:
+                    if version_info[0] == 3:
+                        com_args = shlex.split(foreground_command)
+                    else:
+                        com_args = foreground_command.split()
+                    background = True
+                if len(com_args) == 0:
+                    no_command_msg = "Please enter a command before the '&'"
+                    self.view.run_command('glue_writer', {'text': no_command_msg, 'command': user_command, 'exit': False})
+                    return
+
                 if len(com_args) > 0:
                     arguments = ' '.join(com_args[1:])
                 else:
                     arguments = ''
 
-                command = os.path.join(self.get_path(com_args[0]), com_args[0]) + " " + arguments
-                t = threading.Thread(target=self.execute_command, args=(command, user_command))
-                t.start() # launch the thread to execute the command
-                self.progress_indicator(t) # provide progress indicator
-                self.print_on_complete(t, user_command) # polls for completion of the thread and prints to editor
+                metrics = CommandMetrics(user_command, com_args[0], os.getcwd())
+                if self.use_session() and not background:
+                    # the shell session resolves the command itself, with its own aliases and functions
+                    command = user_command.strip()
+                else:
+                    command = os.path.join(self.get_path(com_args[0]), com_args[0]) + " " + arguments
+                    metrics.path_time = metrics.elapsed()
+                job = self.get_jobs().add(self.next_prompt_command or user_command, background, self.stream_buffer_size)
+                job.metrics = metrics
+                job.timeout = self.get_timeout(background)
+                job.cache_key = self.next_cache_key
+                self.next_cache_key = None
+                self.next_prompt_command = None
+                if self.use_session() and not background:
+                    self.stream_command(command, job, self.execute_command_session)
+                elif background:
+                    job.stream.set_listener(lambda: scheduler.notify(job, lambda: self.watch_background(job)))
+                    job.thread = threading.Thread(target=self.execute_command_stream, args=(command, job))
+                    job.thread.start()
+                    bg_job_msg = "[" + str(job.job_id) + "] running in the background, use 'fg " + str(job.job_id) + "' to view its output\n"
+                    self.view.run_command('glue_writer', {'text': bg_job_msg, 'command': user_command, 'exit': False})
+                elif self.stream_output:
+                    self.stream_command(command, job)
+                else:
+                    job.stream.set_listener(lambda: scheduler.notify(job, lambda: self.print_on_complete(job))) # called when the thread completes
+                    job.thread = threading.Thread(target=self.execute_command, args=(command, job))
+                    scheduler.start_indicator(job, self.view) # provide progress indicator
+                    job.thread.start() # launch the thread to execute the command
             except Exception as e:
                 raise e
 
+    #------------------------------------------------------------------------------
+    # [ run_user_command method ] - execute a Glue user command extension
+    #------------------------------------------------------------------------------
+    def run_user_command(self, com_args, glue_command):
+        if self.load_user_commands():
+            # if arguments from command, add those in location indicated by the file
+            if len(com_args) > 2:
+                # arguments were included on the command line, pass them to the user command
+                arguments = ' '.join(com_args[2:])
+            else:
+                # no additional arguments were included so pass empty string if there is an {{args}} tag
+                arguments = ''
+            # tags are only evaluated when the command template contains them
+            tag_values = {'pwd': os.getcwd, 'clipboard': sublime.get_clipboard}
+            outer_chain = self.user_command_chain
+            chain = list(outer_chain)
+            try:
+                user_command = user_commands.expand(com_args[1], arguments, tag_values, subcommands.names(), chain)
+            except UserCommandCycleError as uce:
+                cycle_error_msg = "Glue found a loop in your user commands: " + str(uce) + "\n"
+                self.view.run_command('glue_writer', {'text': cycle_error_msg, 'command': glue_command, 'exit': False})
+                return
+            if user_command is not None:
+                # built-ins like 'glue timeout' run their command through muterun, a user command reached from there is part of this chain
+                self.user_command_chain = chain
+                try:
+                    self.muterun(user_command) # execute the command
+                finally:
+                    self.user_command_chain = outer_chain
+            else:
+                # didn't find a glue alias with the requested name in the existing glue alias settings file
+                bad_cmd_error_msg = "Glue could not identify that command.  Please try again.\n"
+                self.view.run_command('glue_writer', {'text': bad_cmd_error_msg, 'command': glue_command, 'exit': False})
+        # Didn't find a glue alias setting file, provide error message
+        else:
+            bad_cmd_error_msg = "Glue could not identify that command.  Please try again.\n"
+            self.view.run_command('glue_writer', {'text': bad_cmd_error_msg, 'command': glue_command, 'exit': False})
+
     #------------------------------------------------------------------------------
     # [ is_file_here ] - returns boolean for presence of filepath
     #------------------------------------------------------------------------------
@@ -451,187 +426,435 @@ class GlueCommand(sublime_plugin.TextCommand):
             return False
 
     #------------------------------------------------------------------------------
-    # [ get_mac_path method ] - obtain the user PATH setting on the Mac from bash
+    # [ load_user_commands method ] - point the shared user command registry at the extension files
+    #   returns boolean for presence of at least one extension file
+    #------------------------------------------------------------------------------
+    def load_user_commands(self):
+        file_paths = []
+        for file_path in self.settings.get('glue_user_command_files', ['Glue-Commands/glue.json']):
+            file_paths.append(os.path.join(sublime.packages_path(), os.path.expanduser(file_path))) # relative to Packages directory unless absolute
+        user_commands.set_files(file_paths)
+        return user_commands.has_files()
+
+    #------------------------------------------------------------------------------
+    # [ get_login_path method ] - obtain the user PATH setting from the login shell environment
+    #   the login environment is cached on disk and refreshed in the background on plugin load,
+    #   the environment PATH is returned until it is available
+    #------------------------------------------------------------------------------
+    def get_login_path(self):
+        login_env = login_environment.get()
+        if login_env is None:
+            login_environment.refresh_async() # no-op while a refresh is running
+        elif 'PATH' in login_env:
+            return login_env['PATH']
+        return os.environ['PATH']
+
+    #------------------------------------------------------------------------------
+    # [ use_login_environment method ] - boolean for use of the login shell environment on this platform
+    #------------------------------------------------------------------------------
+    def use_login_environment(self):
+        if sublime.platform() == "osx":
+            return True # fix for OSX PATH set issue in with Python subprocess module
+        elif sublime.platform() == "linux":
+            return self.settings.get('glue_login_environment', False)
+        else:
+            return False
+
+    #------------------------------------------------------------------------------
+    # [ command_env method ] - environment for the command subprocess, None to inherit the ST environment
     #------------------------------------------------------------------------------
-    def get_mac_path(self):
-        pathgetter = "bash -ilc 'echo -n $PATH'"
-        updated_path = subprocess.Popen(pathgetter, stdout=subprocess.PIPE, shell=True).stdout.read()
-        # update the shell PATH with this path
-        return updated_path.decode("utf-8").rstrip().rstrip(':')
+    def command_env(self):
+        login_env = login_environment.get()
+        if version_info[0] == 2 or not self.use_login_environment() or login_env is None:
+            return None
+        command_env = dict(os.environ)
+        command_env.update(login_env)
+        if len(self.userpath) > 0:
+            command_env['PATH'] = self.userpath
+        return command_env
+
+    #------------------------------------------------------------------------------
+    # [ use_session method ] - boolean for running commands in the persistent shell session of the view
+    #------------------------------------------------------------------------------
+    def use_session(self):
+        return self.session_mode and os.name == 'posix'
+
+    #------------------------------------------------------------------------------
+    # [ get_session_shell method ] - the shell of the session, with the environment that it starts with
+    #------------------------------------------------------------------------------
+    def get_session_shell(self):
+        session_env = self.get_shell_env()
+        if len(self.shellpath) > 0 and os.path.exists(self.shellpath) and os.path.isfile(self.shellpath):
+            return get_session(self.view.id(), self.shellpath, session_env)
+        return get_session(self.view.id(), '/bin/sh', session_env)
+
+    #------------------------------------------------------------------------------
+    # [ get_shell_env method ] - environment for command strings that the shell resolves itself
+    #------------------------------------------------------------------------------
+    def get_shell_env(self):
+        if len(self.userpath) == 0:
+            self.get_path('') # establish the PATH string for this platform
+        shell_env = self.command_env() or dict(os.environ)
+        if len(self.userpath) > 0:
+            shell_env['PATH'] = self.userpath
+        return shell_env
 
     #------------------------------------------------------------------------------
     # [ get_path method ] - find the correct path to the executable from the user's PATH settings
     #------------------------------------------------------------------------------
     def get_path(self, executable):
-        # if it is not set, attempt to use the environment PATH variable that Python returns
+        path_string = self.userpath
+        # if it is not set, attempt to use the login shell or environment PATH variable
         if len(self.userpath) == 0:
-            # set the mac osx PATH with os.environ['PATH'] - fix for OSX PATH set issue in with Python subprocess module
-            if sublime.platform() == "osx":
-                # get the PATH
-                updated_path = self.get_mac_path() # obtain the PATH set in the user's respective shell rc file
-                # set the Mac environ PATH to the obtained PATH
-                os.environ['PATH'] = updated_path
-                # assign the PATH to the self.userpath attribute for the executable search below (and for reuse while running)
-                self.userpath = updated_path
-            elif sublime.platform == "windows":
+            if self.use_login_environment():
+                path_string = self.get_login_path()
+                if sublime.platform() == "osx":
+                    # set the Mac environ PATH to the obtained PATH
+                    os.environ['PATH'] = path_string
+                if login_environment.is_ready():
+                    # assign the PATH to the self.userpath attribute for reuse while running
+                    self.userpath = path_string
+            elif sublime.platform() == "windows":
                 pass # do nothing, do not want to set path on Win, let Win shell handle it...
-            elif sublime.platform == "linux":
+            elif sublime.platform() == "linux":
                 self.userpath = os.environ['PATH']
+                path_string = self.userpath
         else:
             # fix for Mac OSX users PATH settings
             if sublime.platform() == "osx":
                 os.environ['PATH'] = self.userpath
-        # need to keep the Windows ; PATH separator logic first because the : will match in Windows paths like C:\blah
-        if ';' in self.userpath:
-            paths = self.userpath.split(';')
-            for path in paths:
-                test_path = os.path.join(path, executable)
-                # Windows unicode test in Py2
-                if version_info[0] == 2:
-                    if os.path.isfile(unicode(test_path)):
-                        return path
-                # otherwise perform standard string comparisons
-                if os.path.isfile(test_path):
-                    return path
-                elif os.path.islink(test_path):
-                    return os.path.dirname(os.path.realpath(test_path))
-            # if the method did not return with found path, just return empty path and keep fingers crossed...
-            return ''
-        elif ':' in self.userpath:
-            paths = self.userpath.split(':')
-            for path in paths:
-                test_path = os.path.join(path, executable)
-                # Unicode test in Py2, determine whether unicode string matches for OS that encodes as unicode
-                if version_info[0] == 2:
-                    if os.path.isfile(unicode(test_path)):
-                        return path
-                # otherwise perform standard string comparisons (Py3 str incorporates unicode type from Py2)
-                if os.path.isfile(test_path):
-                    return path
-                elif os.path.islink(test_path):
-                    return os.path.dirname(os.path.realpath(test_path))
-            # if the method did not return with found path, just return empty path and keep fingers crossed...
-            return ''
-        else:
-            # there was one path in the setting, so return it as the proper path to executable
-            return self.userpath
+        # resolve through the shared executable index (one directory listing per PATH entry, cached by mtime)
+        return executable_index.lookup(executable, path_string)
+
+    #------------------------------------------------------------------------------
+    # [ get_timeout method ] - seconds before the next system command is stopped, 0 = no limit
+    #   the default timeout does not apply to background jobs, a glue timeout prefix applies to all commands
+    #------------------------------------------------------------------------------
+    def get_timeout(self, background):
+        timeout = self.next_timeout
+        self.next_timeout = None
+        if timeout is None:
+            timeout = 0 if background else self.command_timeout
+        return timeout
+
+    #------------------------------------------------------------------------------
+    # [ get_jobs method ] - returns the job table of the Glue terminal view
+    #------------------------------------------------------------------------------
+    def get_jobs(self):
+        return get_job_table(self.view.id())
+
+    def remove_job(self, job):
+        remove_job(self.view.id(), job)
+
+    #------------------------------------------------------------------------------
+    # [ find_job method ] - returns the job for a '%n' or 'n' job specification, None if there is no such job
+    #------------------------------------------------------------------------------
+    def find_job(self, job_spec):
+        job_id = parse_job_id(job_spec)
+        if job_id is None:
+            return None
+        return self.get_jobs().get(job_id)
 
     #------------------------------------------------------------------------------
     # [ print_on_complete method ] - print to editor from main thread when cmd execution complete
     #------------------------------------------------------------------------------
-    def print_on_complete(self, thread, user_command):
-        if thread.is_alive():
-            sublime.set_timeout(lambda: self.print_on_complete(thread, user_command), 20)
-            return
+    def print_on_complete(self, job):
+        scheduler.stop_indicator(job)
+        # command was successful
+        if job.exitcode == 0:
+            response_text = job.stdout
+        # command was not successful (non-zero exit status)
         else:
-            # command was successful
-            if self.exitcode == 0:
-                # clean the standard output string
-                clean_stdout = self.clean_output(self.stdout)
-                self.view.run_command('glue_writer', {'text': clean_stdout, 'command': user_command})
-            # command was not successful (non-zero exit status)
-            else:
-                self.view.run_command('glue_writer', {'text': self.stderr, 'command': user_command})
+            response_text = job.stderr
+        response_text += job.get_stop_message() # after the partial output of a cancelled command
+        # large outputs are written to a spill file, only the start and end are printed
+        view_text = []
+        output = OutputSpiller(view_text.append, self.spill_threshold, self.spill_tail_chars)
+        output.feed(response_text)
+        output.close()
+        self.view.run_command('glue_writer', {'text': ''.join(view_text), 'command': job.command})
+        self.remove_job(job)
+        self.show_duration(job)
 
-            # print to stdout as well - removed
-            # self.print_response()
+        # print to stdout as well - removed
+        # self.print_response(job)
 
     #------------------------------------------------------------------------------
-    # [ clean_output method ] - remove special characters that should not be printed to standard output view
+    # [ stream_command method ] - execute a system command and push its output to the editor as it arrives
     #------------------------------------------------------------------------------
-    def clean_output(self, stdout_string):
-        # remove carriage return char (they display as CR in ST)
-        stdout_string = stdout_string.replace('\r\n', '\n') # include this above the '\r' statement so that user does not get '\n\n' replacements
-        stdout_string = stdout_string.replace('\r', '\n')
-        return stdout_string
+    def stream_command(self, command, job, execute=None):
+        # write the prompt line now, output is appended below it as it is received
+        self.view.run_command('glue_writer', {'text': '', 'command': job.command, 'exit': False, 'stream': True})
+        job.stream.set_listener(lambda: scheduler.notify(job, lambda: self.print_on_stream(job)))
+        job.thread = threading.Thread(target=execute or self.execute_command_stream, args=(command, job))
+        scheduler.start_indicator(job, self.view)
+        job.thread.start()
 
     #------------------------------------------------------------------------------
-    # [ progress_indicator method ] - display progress indicator for long running processes
+    # [ print_on_stream method ] - write the pending output batch to the editor from the main thread
+    #   run by the scheduler when the job has new output or finishes
+    #------------------------------------------------------------------------------
+    def print_on_stream(self, job):
+        if job.reported:
+            return # completion was already written by an earlier notification
+        text = job.stream.drain()
+        if text:
+            self.view.run_command('glue_stream_writer', {'text': text})
+        if job.stream.is_done():
+            job.reported = True
+            scheduler.stop_indicator(job)
+            self.remove_job(job)
+            self.show_duration(job)
+            self.view.run_command('glue_stream_writer', {'text': job.get_stop_message(), 'complete': True})
+
+    #------------------------------------------------------------------------------
+    # [ watch_background method ] - notify the user when a background job finishes
+    #------------------------------------------------------------------------------
+    def watch_background(self, job):
+        if job.stream.is_closed():
+            sublime.status_message("Glue: [" + str(job.job_id) + "] " + job.get_status() + " " + job.command)
+            self.show_duration(job)
+
     #------------------------------------------------------------------------------
-    def progress_indicator(self, thread, i=0, direction=1):
-        if thread.is_alive():
-            before = i % 8
-            after = (7) - before
-            if not after:
-                direction = -1
-            if not before:
-                direction = 1
-            i += direction
-            self.view.set_status('glue_status_indicator', 'Glue: Running command [%s|%s]' % (' ' * before, ' ' * after))
-            sublime.set_timeout(lambda: self.progress_indicator(thread, i, direction), 75)
-            return
+    # [ record_metrics method ] - complete the metrics of a finished command, run in the command thread
+    #------------------------------------------------------------------------------
+    def record_metrics(self, job):
+        job.metrics.finish(job.exitcode)
+        command_metrics.add(job.metrics)
+
+    #------------------------------------------------------------------------------
+    # [ show_duration method ] - show the duration of the last command in the status bar of the view
+    #------------------------------------------------------------------------------
+    def show_duration(self, job):
+        duration_string = "Glue: " + job.metrics.executable + " " + format_duration(job.metrics.wall_time)
+        if job.metrics.exitcode != 0:
+            duration_string += " (exit " + str(job.metrics.exitcode) + ")"
+        self.view.set_status('glue_last_command', duration_string)
+
+    #------------------------------------------------------------------------------
+    # [ foreground_job method ] - write the output of a background job to the editor
+    #   a running job continues to stream into the editor until it completes
+    #------------------------------------------------------------------------------
+    def foreground_job(self, job, user_command):
+        job.stream.set_listener(lambda: scheduler.notify(job, lambda: self.print_on_stream(job)))
+        job.foreground()
+        if job.stream.dropped > 0:
+            dropped_msg = "[ Glue discarded " + str(job.stream.dropped) + " characters of earlier output from job " + str(job.job_id) + " ]\n"
         else:
-            self.view.erase_status('glue_status_indicator')
-            sublime.status_message('Glue: Command completed.')
+            dropped_msg = ""
+        self.view.run_command('glue_writer', {'text': '', 'command': user_command + " (" + job.command + ")", 'exit': False, 'stream': True})
+        if len(dropped_msg) > 0:
+            self.view.run_command('glue_stream_writer', {'text': dropped_msg})
+        if not job.stream.is_closed():
+            scheduler.start_indicator(job, self.view)
+        self.print_on_stream(job)
+
+    #------------------------------------------------------------------------------
+    # [ open_process method ] - start a system command with separate stdout and stderr pipes
+    #------------------------------------------------------------------------------
+    def open_process(self, command, env=None):
+        if env is None:
+            env = self.command_env()
+        if len(self.shellpath) > 0 and os.path.exists(self.shellpath) and os.path.isfile(self.shellpath):
+            process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, executable=self.shellpath, env=env, **process_group_args())
+        else:
+            # run the default shell type if the user did not assign a shellpath or it cannot be identified
+            process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, env=env, **process_group_args())
+        process.stdin.close() # commands do not receive input from Glue
+        return process
+
+    #------------------------------------------------------------------------------
+    # [ create_decoder method ] - decoder for command output with the encoding, ANSI code and CR settings
+    #   CRLF becomes LF, ANSI escape sequences are removed and a CR overwrites the line unless turned off
+    #------------------------------------------------------------------------------
+    def create_decoder(self):
+        return StreamDecoder(self.output_encoding, self.output_errors, self.strip_ansi, self.overwrite_lines)
+
+    def decode_output(self, data):
+        return decode_output(data, self.output_encoding, self.output_errors, self.strip_ansi, self.overwrite_lines)
+
+    #------------------------------------------------------------------------------
+    # [ create_output_record method ] - writer for the output of a command, records it for glue grep
+    #   and stores it in the result cache when the command was run by glue cached
+    #------------------------------------------------------------------------------
+    def create_output_record(self, job):
+        record = output_index.create_writer(job.metrics.command, job.metrics.cwd)
+        if job.cache_key is None:
+            return record
+        return OutputTee([record, result_cache.create_writer(job.cache_key, job.metrics.command, job.metrics.cwd)])
+
+    #------------------------------------------------------------------------------
+    # [ execute_command_stream method ] - execute a system command in a separate thread
+    #   feeds decoded stdout and stderr chunks to the bounded output stream of the job as they are read
+    #------------------------------------------------------------------------------
+    def execute_command_stream(self, command, job):
+        exitcode = 1
+        output = OutputSpiller(job.stream.feed, self.spill_threshold, self.spill_tail_chars) # large outputs go to a spill file
+        record = self.create_output_record(job) # for glue grep and glue cached
+        process = None
+        try:
+            spawn_start = time.time()
+            process = self.open_process(command)
+            job.set_process(process)
+            job.metrics.spawn_time = time.time() - spawn_start
+            decoder = self.create_decoder()
+            for name, chunk in iter_process_output(process):
+                if job.metrics.first_byte_time is None:
+                    job.metrics.first_byte_time = job.metrics.elapsed()
+                job.metrics.output_bytes += len(chunk)
+                text = decoder.decode(name, chunk)
+                output.feed(text)
+                record.write(text)
+            text = decoder.flush()
+            output.feed(text)
+            record.write(text)
+            process.stdout.close()
+            process.stderr.close()
+            exitcode = process.wait()
+        except Exception as e:
+            output.feed("Glue was unable to execute the command: " + str(e) + "\n")
+        finally:
+            if process is not None:
+                release_process(process)
+            output.close()
+            job.exitcode = exitcode
+            record.close(exitcode)
+            self.record_metrics(job)
+            job.finish(exitcode)
+
+    #------------------------------------------------------------------------------
+    # [ execute_command_session method ] - run a command in the shell session of the view
+    #   output is streamed like execute_command_stream, a cd in the command changes the Glue working directory
+    #------------------------------------------------------------------------------
+    def execute_command_session(self, command, job):
+        exitcode = 1
+        output = OutputSpiller(job.stream.feed, self.spill_threshold, self.spill_tail_chars)
+        record = self.create_output_record(job)
+        decoder = self.create_decoder()
+        def on_output(chunk):
+            if job.metrics.first_byte_time is None:
+                job.metrics.first_byte_time = job.metrics.elapsed()
+            job.metrics.output_bytes += len(chunk)
+            text = decoder.decode('stdout', chunk)
+            output.feed(text)
+            record.write(text)
+        try:
+            spawn_start = time.time()
+            session = self.get_session_shell()
+            job.set_process(session) # job kill stops the session and the command, a new session starts with the next command
+            with self.attr_lock:
+                command_dirpath = self.current_dirpath
+            job.metrics.spawn_time = time.time() - spawn_start
+            exitcode, session_dirpath = session.run(command, command_dirpath, on_output)
+            text = decoder.flush()
+            output.feed(text)
+            record.write(text)
+            if session_dirpath is None:
+                output.feed("[ Glue: the shell session ended, a new session starts with the next command ]\n")
+            elif session_dirpath != command_dirpath and os.path.isdir(session_dirpath):
+                with self.attr_lock:
+                    self.current_dirpath = session_dirpath
+                os.chdir(session_dirpath)
+                self.settings.set('glue_working_directory', session_dirpath)
+        except Exception as e:
+            output.feed("Glue was unable to execute the command: " + str(e) + "\n")
+        finally:
+            output.close()
+            job.exitcode = exitcode
+            record.close(exitcode)
+            self.record_metrics(job)
+            job.finish(exitcode)
 
     #------------------------------------------------------------------------------
     # [ execute_command method ] - execute a system command
     #   run in a separate thread from muterun() method above
-    #   assigns stdout stderr and exitcode in instance attributes
+    #   assigns stdout stderr and exitcode in the job attributes
     #------------------------------------------------------------------------------
-    def execute_command(self, command, user_command):
+    def execute_command(self, command, job):
         # Python 3 version = Sublime Text 3 version
         if version_info[0] == 3:
             try:
+                spawn_start = time.time()
                 # execute the system command (with user assigned shell if glue_shellpath is set)
                 if len(self.shellpath) == 0:
-                    response = subprocess.check_output(command, stderr=subprocess.STDOUT, shell=True)
+                    response = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True, env=self.command_env(), **process_group_args())
                 elif os.path.exists(self.shellpath) and os.path.isfile(self.shellpath):
-                    response = subprocess.check_output(command, stderr=subprocess.STDOUT, shell=True, executable=self.shellpath)
+                    response = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True, executable=self.shellpath, env=self.command_env(), **process_group_args())
                 else:
                     # run the default shell type if cannot identify the shellpath that the user assigned
-                    response = subprocess.check_output(command, stderr=subprocess.STDOUT, shell=True)
+                    response = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True, env=self.command_env(), **process_group_args())
+                job.set_process(response)
+                job.metrics.spawn_time = time.time() - spawn_start
+                output = response.communicate()[0]
+                job.metrics.output_bytes = len(output)
                 # acquire thread lock on attribute data
                 with self.attr_lock:
-                    self.exitcode = 0
-                    self.stdout = response.decode('utf-8')
-            except subprocess.CalledProcessError as cpe:
-                # acquire thread lock on the attribute data
-                with self.attr_lock:
-                    self.stderr = cpe.output.decode('utf-8')
-                    if cpe.returncode:
-                        self.exitcode = cpe.returncode
+                    if response.returncode == 0:
+                        job.exitcode = 0
+                        job.stdout = self.decode_output(output)
                     else:
-                        self.exitcode = 1
+                        job.stderr = self.decode_output(output)
+                        job.exitcode = response.returncode
             except Exception as e:
                 raise e
+            finally:
+                self.record_metrics(job)
+                record = self.create_output_record(job)
+                record.write(job.stdout if job.exitcode == 0 else job.stderr)
+                record.close(job.exitcode)
+                job.finish(job.exitcode)
         # Python 2 version = Sublime Text 2 version
         else:
             try:
+                spawn_start = time.time()
                 if len(self.shellpath) == 0:
                     response = subprocess.Popen(command, shell=True,
                                stdout=subprocess.PIPE,
-                               stderr=subprocess.PIPE)
+                               stderr=subprocess.PIPE,
+                               **process_group_args())
                 elif os.path.exists(self.shellpath) and os.path.isfile(self.shellpath):
                     response = subprocess.Popen(command, shell=True,
                                stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE,
-                               executable=self.shellpath)
+                               executable=self.shellpath,
+                               **process_group_args())
                 else:
                     # run the default shell if cannot identify the shellpath that the user assigned
                     response = subprocess.Popen(command, shell=True,
                                stdout=subprocess.PIPE,
-                               stderr=subprocess.PIPE)
+                               stderr=subprocess.PIPE,
+                               **process_group_args())
+                job.set_process(response)
+                job.metrics.spawn_time = time.time() - spawn_start
                 stdout, stderr = response.communicate()
+                job.metrics.output_bytes = len(stdout) + len(stderr)
                 with self.attr_lock: # use the attribute lock (separate thread)
-                    self.stdout = stdout.decode('utf-8')
-                    self.stderr = stderr.decode('utf-8')
-                    self.exitcode = response.returncode
+                    job.stdout = self.decode_output(stdout)
+                    job.stderr = self.decode_output(stderr)
+                    job.exitcode = response.returncode
             except Exception as e:
                 raise e
+            finally:
+                self.record_metrics(job)
+                record = self.create_output_record(job)
+                record.write(job.stdout + job.stderr)
+                record.close(job.exitcode)
+                job.finish(job.exitcode)
 
     #------------------------------------------------------------------------------
     # [ print_response method ] - print a string to the stdout on ST console
     #------------------------------------------------------------------------------
-    def print_response(self):
+    def print_response(self, job):
         with self.attr_lock:
-            excode = self.exitcode
+            excode = job.exitcode
         if excode == 0:
             with self.attr_lock:
-                print(self.stdout)
+                print(job.stdout)
         else:
             with self.attr_lock:
-                print(self.stderr)
+                print(job.stderr)
 
     #------------------------------------------------------------------------------
     # [ xitems iterator ] - uses appropriate method from Py2 and Py3 to iterate through dict items
@@ -644,7 +867,8 @@ class GlueCommand(sublime_plugin.TextCommand):
 
 
 #------------------------------------------------------------------------------
-# [ GlueWriterCommand class ] - writes to a ST view
+# [ GlueWriterCommand class ] - writes a prompt line and command output to a ST view
+#   the text is queued and written with other pending text by glue_flush
 #------------------------------------------------------------------------------
 class GlueWriterCommand(sublime_plugin.TextCommand):
     def __init__(self, *args, **kwargs):
@@ -654,114 +878,214 @@ class GlueWriterCommand(sublime_plugin.TextCommand):
         self.exit_message = self.settings.get('glue_exit_message')
         sublime_plugin.TextCommand.__init__(self, *args, **kwargs)
 
-    def run(self, edit, text="", command="", exit=False):
+    def run(self, edit, text="", command="", exit=False, stream=False):
         path_string = "[ " + os.getcwd() + " ]"
         if not exit:
             if self.show_path:
                 command_line = self.ps1 + " " + path_string + " " + command + "\n"
             else:
                 command_line = self.ps1 + " " + command + "\n"
-            self.view.insert(edit, self.view.sel()[0].begin(), command_line)
-            text = text + '\n'
-            self.view.insert(edit, self.view.sel()[0].begin(), text)
-            self.view.show(self.view.sel()[0].begin())
-            # keeps the input panel open for more commands
-            self.view.run_command('glue')
+            if stream:
+                # output follows with glue_stream_writer, it reopens the input panel on completion
+                get_write_queue(self.view).append(command_line)
+            else:
+                # keeps the input panel open for more commands
+                get_write_queue(self.view).append(command_line + text + '\n', reopen_panel=True)
         else:
-            # do not reopen the input panel with the run_command call above
+            # do not reopen the input panel
             if self.show_path:
                 exit_command = self.ps1 + " " + path_string + " exit\n"
             else:
                 exit_command = self.ps1 + " exit\n"
             exit_string = self.exit_message + "\n"
-            self.view.insert(edit, self.view.sel()[0].begin(), exit_command)
-            self.view.insert(edit, self.view.sel()[0].begin(), exit_string)
-            self.view.show(self.view.sel()[0].begin())
+            get_write_queue(self.view).append(exit_command + exit_string)
 
 #------------------------------------------------------------------------------
-# [ GlueClearEditorCommand class ] - clears the editor window
+# [ GlueStreamWriterCommand class ] - appends streamed command output to a ST view
 #------------------------------------------------------------------------------
-class GlueClearEditorCommand(sublime_plugin.TextCommand):
-
-    def run(self, edit):
-        the_viewer = sublime.Region(0, self.view.size())
-        self.view.erase(edit, the_viewer)
-
+class GlueStreamWriterCommand(sublime_plugin.TextCommand):
+    def run(self, edit, text="", complete=False):
+        if complete:
+            text = text + '\n'
+        # the input panel is reopened once the command has finished
+        get_write_queue(self.view).append(text, reopen_panel=complete)
 
 #------------------------------------------------------------------------------
-# [ get_help_text function ] - returns the user help string
+# [ GlueFlushCommand class ] - writes all queued text to the view in a single edit
 #------------------------------------------------------------------------------
-def get_help_text():
-    help_string = """
-        __
- .-----|  .--.--.-----.
- |  _  |  |  |  |  -__|
- |___  |__|_____|_____|
- |_____|
-
-Copyright 2014 Christopher Simpkins | MIT License
-
-Glue joins your shell to Sublime Text in quasi-perfect harmony.
-
-USAGE
-
-  <command> [option(s)]
-
-  Enter a system command in the input panel at the bottom of your editor using the same syntax that you use in your terminal.  The standard output stream from the executable is printed in the active view of your editor after it returns.
-
-  To quit Glue, submit the command 'exit'.
-
-COMMANDS
-
-  Glue provides the following additional commands:
-
-    glue browse <url,path>    Open default browser to <url> or local <path>
-    glue clear                Clear the text in the Glue view
-    glue finder [path]        Reveal current directory (default) or [path] directory in finder
-    glue goto <query>         Sublime Text Goto Anything search for <query>
-    glue help                 Glue help
-    glue localhost [port]     Open browser to localhost:8000 or optional localhost:[port]
-    glue new                  Create a new Sublime Text buffer
-    glue open <path>          Open a file at <path> in the editor. Accepts multiple <path>
-    glue path                 View your PATH settings
-    glue user                 View your Glue extensions (if present)
-    glue wco <pattern>        Open file(s) with wildcard <pattern> in the editor
-
-USER COMMANDS
-
-  Create a `Glue-Commands` directory inside your Sublime Text `Packages` directory.  Create a `glue.json` file inside the `Glue-Commands` directory.  Then map your JSON key:value as "command-name": "system command string".
-
-  You have the option to include the following replacement tags in your system command string:
+class GlueFlushCommand(sublime_plugin.TextCommand):
+    def __init__(self, *args, **kwargs):
+        self.settings = sublime.load_settings('Glue.sublime-settings')
+        self.scrollback = ScrollbackTrimmer(self.settings)
+        sublime_plugin.TextCommand.__init__(self, *args, **kwargs)
 
-    {{args}}              additional arguments that you include on the command line
-    {{clipboard}}         the contents of the clipboard
-    {{pwd}}               the current working directory path
+    def run(self, edit):
+        text, reopen_panel = get_write_queue(self.view).take()
+        if text:
+            self.view.insert(edit, self.view.sel()[0].begin(), text)
+            self.scrollback.trim(self.view, edit) # same edit as the insert, no additional redraw
+            self.view.show(self.view.sel()[0].begin())
+        transcript = transcript_registry.get(self.view.file_name())
+        if transcript is not None and (text or reopen_panel):
+            transcript.append(text, end_block=reopen_panel) # the block ends when the input panel reopens
+        if reopen_panel:
+            # keeps the input panel open for more commands
+            self.view.run_command('glue', {'panel_only': True})
 
-  Launch Glue and run your command extension(s) with the following syntax:
+#------------------------------------------------------------------------------
+# [ GlueCancelCommand class ] - stop the running foreground commands of a Glue view (key binding)
+#   the output that the commands wrote before they were stopped stays in the view
+#------------------------------------------------------------------------------
+class GlueCancelCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        cancelled = [job for job in get_job_table(self.view.id()).list_jobs() if not job.background and job.kill()]
+        if len(cancelled) > 0:
+            sublime.status_message('Glue: cancelled ' + ', '.join(job.command for job in cancelled))
+        else:
+            sublime.status_message('Glue: no running command to cancel')
 
-     glue <command-name> [args]
+#------------------------------------------------------------------------------
+# [ GlueHistoryNavigateCommand class ] - replace the input panel text with an older or newer history entry
+#   the text typed before the first key press is the prefix that the entries must start with,
+#   entries of the working directory come first
+#------------------------------------------------------------------------------
+history_navigation = {} # input panel view id -> navigation state
 
-  Your command is executed from your current working directory. Please see the documentation for additional details.
+class GlueHistoryNavigateCommand(sublime_plugin.TextCommand):
+    def run(self, edit, direction="older"):
+        panel_text = self.view.substr(sublime.Region(0, self.view.size()))
+        state = history_navigation.get(self.view.id())
+        if state is None or panel_text != state['shown']:
+            # the text was edited, start a new search with it as prefix
+            dirpath = self.view.settings().get('glue_panel_dirpath')
+            state = {'prefix': panel_text, 'matches': command_history.search(panel_text, dirpath, prefix=True, limit=500), 'position': -1}
+            history_navigation.clear() # only the state of the open panel is needed
+            history_navigation[self.view.id()] = state
+        if direction == "older":
+            position = min(state['position'] + 1, len(state['matches']) - 1)
+        else:
+            position = max(state['position'] - 1, -1)
+        state['position'] = position
+        if position == -1:
+            state['shown'] = state['prefix'] # back to the typed text
+        else:
+            state['shown'] = state['matches'][position]
+        self.view.replace(edit, sublime.Region(0, self.view.size()), state['shown'])
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(self.view.size()))
 
-NAVIGATION
+#------------------------------------------------------------------------------
+# [ GlueCompleteCommand class ] - complete the last word in the input panel
+#   completes to the longest common prefix of the candidates, repeated presses cycle through them
+#------------------------------------------------------------------------------
+completion_state = {} # input panel view id -> completion state
+glue_shell_commands = ['cd', 'exit', 'fg', 'glue', 'jobs', 'kill']
 
-  The working directory is initially set to the directory containing the buffer in which you are using Glue (when you open from sidebar right click menu or with a project file open in the editor).
+class GlueCompleteCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        panel_text = self.view.substr(sublime.Region(0, self.view.size()))
+        state = completion_state.get(self.view.id())
+        if state is not None and panel_text == state['shown'] and len(state['candidates']) > 1:
+            state['position'] = (state['position'] + 1) % len(state['candidates'])
+            completed_text = state['head'] + state['candidates'][state['position']]
+        else:
+            dirpath = self.view.settings().get('glue_panel_dirpath') or os.getcwd()
+            command_names = executable_index.get_names() + glue_shell_commands
+            glue_names = list(subcommands.names()) + user_commands.get_names()
+            user_commands.refresh_async() # for the next completion if a command file changed
+            start, candidates = complete_command_line(panel_text, dirpath, command_names, glue_names)
+            if len(candidates) == 0:
+                sublime.status_message('Glue: no completions')
+                return
+            state = {'head': panel_text[:start], 'candidates': candidates, 'position': -1}
+            completion_state.clear() # only the state of the open panel is needed
+            completion_state[self.view.id()] = state
+            if len(candidates) == 1:
+                completed_text = state['head'] + candidates[0]
+                if not candidates[0].endswith(os.sep):
+                    completed_text += ' '
+            else:
+                completed_text = state['head'] + common_prefix(candidates)
+                sublime.status_message('Glue: ' + '  '.join(candidates[:30]) + ('  ...' if len(candidates) > 30 else ''))
+        state['shown'] = completed_text
+        self.view.replace(edit, sublime.Region(0, self.view.size()), completed_text)
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(self.view.size()))
 
-  Change directories with the 'cd' command:
+#------------------------------------------------------------------------------
+# [ GlueClearEditorCommand class ] - clears the editor window
+#------------------------------------------------------------------------------
+class GlueClearEditorCommand(sublime_plugin.TextCommand):
 
-  cd <directory path>        Make `directory path` the working directory
-  cd ..                      Make parent directory the working directory
-  cd ~                       Make user home directory the working directory
+    def run(self, edit):
+        get_write_queue(self.view).discard() # queued text would be cleared anyway
+        the_viewer = sublime.Region(0, self.view.size())
+        self.view.erase(edit, the_viewer)
 
-  Note that your working directory defaults to the system User directory if you launch Glue from the Command Palette without having an open project file in the editor (or in a clean editor window without an open project).
+#------------------------------------------------------------------------------
+# [ GlueViewListener class ] - releases the state that Glue keeps per view id when a view is closed
+#   called for every view that closes, views without Glue state are not in the tables
+#------------------------------------------------------------------------------
+class GlueViewListener(sublime_plugin.EventListener):
+    def on_close(self, view):
+        close_job_table(view.id()) # also stops the jobs that are still running
+        close_session(view.id())
+        close_write_queue(view.id())
 
-ISSUES
+#------------------------------------------------------------------------------
+# [ strip_background function ] - returns the command without a trailing & that requests a background job
+#   None if there is no such &, the & is detected on the raw text so a quoted or escaped & stays part of the last argument
+#------------------------------------------------------------------------------
+def strip_background(user_command):
+    command = user_command.rstrip()
+    if not command.endswith('&') or command.endswith('&&'):
+        return None
+    command = command[:-1]
+    if version_info[0] == 3:
+        try:
+            shlex.split(command) # an open quote or a dangling escape means the & was quoted
+        except ValueError:
+            return None
+    elif command.endswith('\\'):
+        return None
+    return command
 
-  Please submit bug reports on the GitHub repository @ https://github.com/chrissimpkins/glue/issues
+#------------------------------------------------------------------------------
+# [ get_cache_dir function ] - returns the directory for Glue cache files
+#------------------------------------------------------------------------------
+def get_cache_dir():
+    if hasattr(sublime, 'cache_path'):
+        return os.path.join(sublime.cache_path(), 'Glue')
+    else:
+        return os.path.join(sublime.packages_path(), 'User', 'Glue.cache') # ST2 does not have a cache directory
 
-HELP
+#------------------------------------------------------------------------------
+# [ plugin_loaded function ] - start background work once the ST API is available
+#------------------------------------------------------------------------------
+def plugin_loaded():
+    settings = sublime.load_settings('Glue.sublime-settings')
+    login_environment.configure(os.path.join(get_cache_dir(), 'login_env.json'))
+    spill_registry.configure(os.path.join(get_cache_dir(), 'spill'), settings.get('glue_spill_max_files', 20))
+    spill_registry.clear() # spilled output of earlier sessions
+    if settings.get('glue_metrics_log', False):
+        metrics_log_path = os.path.join(get_cache_dir(), 'metrics.jsonl')
+    else:
+        metrics_log_path = None
+    command_metrics.configure(settings.get('glue_metrics_records', 200), metrics_log_path)
+    command_history.configure(os.path.join(get_cache_dir(), 'history.jsonl'), settings.get('glue_history_size', 10000))
+    history_thread = threading.Thread(target=command_history.load) # read the history before it is needed
+    history_thread.daemon = True
+    history_thread.start()
+    output_index.configure(os.path.join(get_cache_dir(), 'outputs'), settings.get('glue_output_index_size', 67108864), settings.get('glue_output_index_records', 1000))
+    index_thread = threading.Thread(target=output_index.load)
+    index_thread.daemon = True
+    index_thread.start()
+    result_cache.configure(os.path.join(get_cache_dir(), 'results'), settings.get('glue_cache_size', 52428800))
+    transcript_registry.configure(os.path.join(get_cache_dir(), 'transcripts'), settings.get('glue_transcript_size', 4194304))
+    if sublime.platform() == "osx" or (sublime.platform() == "linux" and settings.get('glue_login_environment', False)):
+        login_environment.refresh_async()
 
-  Detailed help is available @ http://gluedocs.readthedocs.org/
 
-"""
-    return help_string
+# ST2 does not call plugin_loaded
+if version_info[0] == 2:
+    plugin_loaded()
@@ -3,9 +3,9 @@
 
 import sublime
 import sublime_plugin
-import webbrowser
 
 class GlueBrowseThisCommand(sublime_plugin.TextCommand):
     def run(self, edit, url=""):
         if len(url) > 0:
+            import webbrowser # imported on first use to keep plugin load time down
             webbrowser.open(url)
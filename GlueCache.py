@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import json
+import time
+import hashlib
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueGlob import Globber, split_pattern
+    from .GlueIO import FileReader, AtomicWriter
+else:
+    from GlueGlob import Globber, split_pattern
+    from GlueIO import FileReader, AtomicWriter
+
+#------------------------------------------------------------------------------
+# [ ResultCache class ] - output of read-only commands on disk, least recently used entries are removed first
+#   an entry is one file <key>.txt with a JSON header line and the output.  The file mtime is
+#   the time of the last use, a hit touches the file.  Only commands that exit with 0 are stored.
+#------------------------------------------------------------------------------
+class ResultCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cache_dir = None
+        self.max_bytes = 52428800
+
+    def configure(self, cache_dir, max_bytes):
+        with self.lock:
+            self.cache_dir = cache_dir
+            self.max_bytes = max_bytes
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, key + '.txt')
+
+    #------------------------------------------------------------------------------
+    # [ get method ] - returns (header dict, output text) or None, entries older than max_age seconds are misses
+    #------------------------------------------------------------------------------
+    def get(self, key, max_age=0):
+        if self.cache_dir is None:
+            return None
+        file_path = self.get_path(key)
+        try:
+            header_line, output = FileReader(file_path).read_bytes().decode('utf-8', 'replace').split('\n', 1)
+            header = json.loads(header_line)
+            if max_age > 0 and time.time() - header['created'] > max_age:
+                return None
+            os.utime(file_path, None) # most recently used
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+        return header, output
+
+    def create_writer(self, key, command, cwd):
+        return CacheWriter(self, key, {'command': command, 'cwd': cwd, 'created': time.time()})
+
+    #------------------------------------------------------------------------------
+    # [ evict method ] - remove the least recently used entries until the cache is within max_bytes
+    #------------------------------------------------------------------------------
+    def evict(self):
+        with self.lock:
+            entries = []
+            total_size = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.txt'):
+                    continue
+                try:
+                    stat_info = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat_info.st_mtime, stat_info.st_size, name))
+                total_size += stat_info.st_size
+            entries.sort()
+            for mtime, size, name in entries:
+                if total_size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    total_size -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self.lock:
+            if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+                return 0
+            removed = 0
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.txt') or name.endswith('.tmp'):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                        removed += 1
+                    except OSError:
+                        pass
+            return removed
+
+# shared by all GlueCommand instances
+result_cache = ResultCache()
+
+#------------------------------------------------------------------------------
+# [ CacheWriter class ] - writes the output of a command that runs to a temporary file,
+#   the file becomes the cache entry when the command exits with 0
+#------------------------------------------------------------------------------
+class CacheWriter:
+    def __init__(self, cache, key, header):
+        self.cache = cache
+        self.key = key
+        self.file = None
+        try:
+            if not os.path.isdir(cache.cache_dir):
+                os.makedirs(cache.cache_dir)
+            self.file = AtomicWriter(cache.get_path(key), sync=False) # the cache can be rebuilt, no fsync
+            self.file.write(json.dumps(header) + '\n')
+        except (IOError, OSError):
+            self.discard()
+
+    def write(self, text):
+        if text and self.file is not None:
+            try:
+                self.file.write(text)
+            except (IOError, OSError):
+                self.discard()
+
+    def close(self, exitcode):
+        if self.file is None:
+            return
+        if exitcode != 0:
+            self.discard()
+            return
+        try:
+            self.file.commit()
+            self.file = None
+        except (IOError, OSError):
+            self.file = None
+            return
+        self.cache.evict()
+
+    def discard(self):
+        if self.file is not None:
+            self.file.discard()
+            self.file = None
+
+#------------------------------------------------------------------------------
+# [ get_cache_key function ] - hash of the command, working directory, environment variables and input files
+#   input_patterns are glob patterns relative to cwd (** matches subdirectories), the path, size and
+#   mtime of every matching file are part of the key
+#------------------------------------------------------------------------------
+def get_cache_key(command, cwd, env, input_patterns):
+    inputs = []
+    for pattern in input_patterns:
+        root_dir, relative_pattern = split_pattern(cwd, pattern)
+        for rel_path in Globber(root_dir, relative_pattern, ['.git/', '.hg/', '.svn/'], False).iter_files():
+            try:
+                stat_info = os.stat(os.path.join(root_dir, rel_path))
+                inputs.append([pattern, rel_path, stat_info.st_size, stat_info.st_mtime])
+            except OSError:
+                pass
+    key_data = json.dumps({'command': command, 'cwd': cwd, 'env': env, 'inputs': inputs}, sort_keys=True)
+    return hashlib.sha1(key_data.encode('utf-8')).hexdigest()
+
+#------------------------------------------------------------------------------
+# [ OutputTee class ] - passes command output to several writers with write(text) and close(exitcode) methods
+#------------------------------------------------------------------------------
+class OutputTee:
+    def __init__(self, writers):
+        self.writers = writers
+
+    def write(self, text):
+        for writer in self.writers:
+            writer.write(text)
+
+    def close(self, exitcode):
+        for writer in self.writers:
+            writer.close(exitcode)
@@ -4,7 +4,13 @@
 import sublime
 import sublime_plugin
 import os
-from glob import glob
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueGlob import Globber, split_pattern
+else:
+    from GlueGlob import Globber, split_pattern
 
 #------------------------------------------------------------------------------
 # [ GlueFileOpenerCommand class ] - executed from glue open command
@@ -25,17 +31,74 @@ class GlueFileOpenerCommand(sublime_plugin.WindowCommand):
 
 #------------------------------------------------------------------------------
 # [ GlueFileWildcardOpenerCommand class ] - executed from glue wco command
+#   the pattern is matched relative to current_dir, the process cwd is not used
 #------------------------------------------------------------------------------
 class GlueFileWildcardOpenerCommand(sublime_plugin.WindowCommand):
     def run(self, paths=[], current_dir="", match_pattern=""):
         if len(current_dir) > 0 and len(match_pattern) > 0:
-            os.chdir(current_dir)
-            file_list = glob(match_pattern)
-            if len(file_list) > 0:
-                for the_file in file_list:
-                    abs_filepath = os.path.join(current_dir, the_file)
-                    self.file_opener(abs_filepath)
+            settings = sublime.load_settings('Glue.sublime-settings')
+            excludes = settings.get('glue_wco_exclude', ['.git/', '.hg/', '.svn/'])
+            root_dir, pattern = split_pattern(current_dir, match_pattern)
+            globber = Globber(root_dir, pattern, excludes, settings.get('glue_wco_gitignore', True))
+            WildcardOpener(self.window, match_pattern, settings.get('glue_wco_max_files', 50)).start(globber, root_dir)
 
-    def file_opener(self, file_path):
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            self.window.open_file(file_path)
+#------------------------------------------------------------------------------
+# [ WildcardOpener class ] - opens the files of one glue wco pattern
+#   the directory tree is read in a background thread and the matching files are opened in
+#   batches as they are found.  Above max_files matches the user is asked before the rest are opened.
+#------------------------------------------------------------------------------
+class WildcardOpener:
+    batch_size = 25
+
+    def __init__(self, window, match_pattern, max_files):
+        self.window = window
+        self.match_pattern = match_pattern
+        self.max_files = max_files
+        self.opened = 0
+
+    def start(self, globber, root_dir):
+        scan_thread = threading.Thread(target=self.scan, args=(globber, root_dir))
+        scan_thread.daemon = True
+        scan_thread.start()
+
+    def scan(self, globber, root_dir):
+        batch = []
+        found = 0
+        remaining = [] # matches above max_files, opened after confirmation
+        for rel_path in globber.iter_files():
+            file_path = os.path.join(root_dir, rel_path.replace('/', os.sep))
+            found += 1
+            if found > self.max_files:
+                remaining.append(file_path)
+                continue
+            batch.append(file_path)
+            if len(batch) >= self.batch_size:
+                self.open_later(batch)
+                batch = []
+        if len(batch) > 0:
+            self.open_later(batch)
+        sublime.set_timeout(lambda: self.finish(found, remaining), 0)
+
+    def open_later(self, file_list):
+        sublime.set_timeout(lambda: self.open_files(file_list), 0)
+
+    def open_files(self, file_list):
+        for file_path in file_list:
+            self.window.open_file(file_path) # the scan only yields regular files
+        self.opened += len(file_list)
+
+    def finish(self, found, remaining):
+        if len(remaining) > 0:
+            confirm_msg = "Glue: " + str(found) + " files match '" + self.match_pattern + "'.  Open the " + str(len(remaining)) + " files that were not opened yet?"
+            if sublime.ok_cancel_dialog(confirm_msg, "Open"):
+                for start in range(0, len(remaining), self.batch_size):
+                    self.open_later(remaining[start:start + self.batch_size])
+                sublime.set_timeout(self.show_status, 0)
+                return
+        self.show_status()
+
+    def show_status(self):
+        if self.opened == 0:
+            sublime.status_message("Glue: no files match '" + self.match_pattern + "'")
+        else:
+            sublime.status_message("Glue: opened " + str(self.opened) + " files matching '" + self.match_pattern + "'")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import threading
+
+#------------------------------------------------------------------------------
+# [ DirectoryCache class ] - directory listings for path completion
+#   get() only returns listings that are already cached and queues the directory for a
+#   background check, the listing is read again when the directory mtime changed
+#------------------------------------------------------------------------------
+class DirectoryCache:
+    def __init__(self, max_dirs=200):
+        self.max_dirs = max_dirs
+        self.lock = threading.Lock()
+        self.listings = {} # directory path -> (mtime, sorted list of (name, is_dir))
+        self.queue = []
+        self.worker = None
+
+    def get(self, dirpath):
+        dirpath = os.path.normpath(dirpath)
+        with self.lock:
+            listing = self.listings.get(dirpath)
+        self.refresh_async(dirpath)
+        if listing is None:
+            return None
+        return listing[1]
+
+    def refresh_async(self, dirpath):
+        dirpath = os.path.normpath(dirpath)
+        with self.lock:
+            if dirpath in self.queue:
+                return
+            self.queue.append(dirpath)
+            if self.worker is not None:
+                return
+            self.worker = threading.Thread(target=self.work)
+            self.worker.daemon = True
+        self.worker.start()
+
+    def work(self):
+        while True:
+            with self.lock:
+                if len(self.queue) == 0:
+                    self.worker = None
+                    return
+                dirpath = self.queue[0]
+            self.refresh(dirpath)
+            with self.lock:
+                self.queue.remove(dirpath)
+
+    def refresh(self, dirpath):
+        try:
+            mtime = os.stat(dirpath).st_mtime
+        except OSError:
+            with self.lock:
+                self.listings.pop(dirpath, None)
+            return
+        with self.lock:
+            cached = self.listings.get(dirpath)
+        if cached is not None and cached[0] == mtime:
+            return
+        entries = []
+        try:
+            if hasattr(os, 'scandir'):
+                for entry in os.scandir(dirpath):
+                    entries.append((entry.name, entry.is_dir()))
+            else:
+                for name in os.listdir(dirpath):
+                    entries.append((name, os.path.isdir(os.path.join(dirpath, name))))
+        except OSError:
+            pass
+        entries.sort()
+        with self.lock:
+            if dirpath not in self.listings and len(self.listings) >= self.max_dirs:
+                self.listings.pop(next(iter(self.listings))) # any old listing, they are cheap to read again
+            self.listings[dirpath] = (mtime, entries)
+
+# shared by all GlueCommand instances
+directory_cache = DirectoryCache()
+
+#------------------------------------------------------------------------------
+# [ complete_command_line function ] - completion candidates for the last word of the command line
+#   returns (start, candidates) where start is the offset of the word that the candidates replace.
+#   Candidates for the command word come from command_names, the word after 'glue' from
+#   glue_names, other words are paths relative to dirpath.  Directory candidates end with a
+#   path separator, spaces are escaped with a backslash.  Returns no candidates while a
+#   listing is not cached yet.
+#------------------------------------------------------------------------------
+def complete_command_line(text, dirpath, command_names, glue_names):
+    start = len(text)
+    while start > 0 and not (text[start - 1] == ' ' and text[start - 2:start - 1] != '\\'):
+        start -= 1
+    word = text[start:].replace('\\ ', ' ')
+    words_before = text[:start].split()
+    if len(words_before) == 0 and os.sep not in word and not word.startswith('.') and not word.startswith('~'):
+        candidates = match_names(command_names, word)
+    elif words_before == ['glue']:
+        candidates = match_names(glue_names, word)
+    else:
+        candidates = complete_path(word, dirpath)
+    return start, [candidate.replace(' ', '\\ ') for candidate in candidates]
+
+def match_names(names, word):
+    return sorted(set(name for name in names if name.startswith(word)))
+
+def complete_path(word, dirpath):
+    word_dir, word_name = os.path.split(word)
+    if len(word_dir) > 0:
+        listing_dir = os.path.join(dirpath, os.path.expanduser(word_dir))
+    else:
+        listing_dir = dirpath
+    listing = directory_cache.get(listing_dir)
+    if listing is None:
+        return []
+    candidates = []
+    for name, is_dir in listing:
+        if name.startswith(word_name) and (word_name.startswith('.') or not name.startswith('.')):
+            candidate = os.path.join(word_dir, name) if len(word_dir) > 0 else name
+            candidates.append(candidate + os.sep if is_dir else candidate)
+    return candidates
+
+#------------------------------------------------------------------------------
+# [ common_prefix function ] - longest common prefix of the candidates
+#------------------------------------------------------------------------------
+def common_prefix(candidates):
+    if len(candidates) == 0:
+        return ''
+    first = min(candidates)
+    last = max(candidates)
+    length = 0
+    while length < len(first) and first[length] == last[length]:
+        length += 1
+    return first[:length]
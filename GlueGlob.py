@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import re
+import stat
+import fnmatch
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileReader
+else:
+    from GlueIO import FileReader
+
+try:
+    from os import scandir # Py3.5+
+except ImportError:
+    scandir = None
+
+glob_chars = re.compile(r'[*?[]')
+case_flags = re.IGNORECASE if os.name == 'nt' else 0
+
+#------------------------------------------------------------------------------
+# [ IgnoreRules class ] - .gitignore style exclude patterns that apply below one directory
+#   a rule without a slash matches the name at any depth, a rule with a slash is relative to
+#   the directory, a trailing slash only matches directories and ! re-includes a path.
+#   The last matching rule decides, like git.
+#------------------------------------------------------------------------------
+class IgnoreRules:
+    def __init__(self, base, lines):
+        self.base = base # relative path of the directory that the rules apply to, '' for the root
+        self.rules = [] # (compiled regex, negated, directories only)
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if len(line.strip()) == 0 or line.startswith('#'):
+                continue
+            line = line.rstrip(' ')
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if len(line) == 0:
+                continue
+            anchored = '/' in line
+            self.rules.append((re.compile(translate_rule(line.lstrip('/'), anchored), case_flags), negated, dir_only))
+
+    # returns True (ignored), False (re-included) or None (no rule matched)
+    def match(self, rel_path, is_dir):
+        if len(self.base) > 0:
+            if not rel_path.startswith(self.base + '/'):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+# gitignore pattern -> regex over a '/' separated relative path
+def translate_rule(rule, anchored):
+    regex = ''
+    i = 0
+    while i < len(rule):
+        if rule.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif rule.startswith('/**', i) and i + 3 == len(rule):
+            regex += '/.*'
+            i += 3
+        elif rule[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif rule[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif rule[i] == '[' and rule.find(']', i + 1) != -1:
+            end = rule.find(']', i + 1)
+            regex += '[' + rule[i + 1:end].replace('!', '^', 1).replace('\\', '\\\\') + ']'
+            i = end + 1
+        else:
+            regex += re.escape(rule[i])
+            i += 1
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    return regex + '$'
+
+#------------------------------------------------------------------------------
+# [ Globber class ] - scandir based glob with ** recursion that does not use the process cwd
+#   iter_files() yields the relative paths of matching files as the directories are read.
+#   Every directory is listed at most once per pattern segment, directory entries are not
+#   stat'ed again, literal segments are checked without listing the directory.
+#------------------------------------------------------------------------------
+class Globber:
+    def __init__(self, root, pattern, excludes=(), use_gitignore=True):
+        self.root = root
+        self.segments = []
+        for segment in pattern.replace('\\', '/').split('/'):
+            if segment == '**' and len(self.segments) > 0 and self.segments[-1] == '**':
+                continue # a/**/**/b is a/**/b
+            if len(segment) > 0 and segment != '.':
+                self.segments.append(segment)
+        self.matchers = [self.compile_segment(segment) for segment in self.segments]
+        self.use_gitignore = use_gitignore
+        self.base_rules = IgnoreRules('', excludes)
+
+    def compile_segment(self, segment):
+        if segment == '**' or not glob_chars.search(segment):
+            return None
+        return re.compile(fnmatch.translate(segment), case_flags)
+
+    def iter_files(self):
+        if len(self.segments) == 0:
+            return
+        rules = [self.base_rules]
+        # a stack instead of recursion, entries are (directory path, relative path, segment index, ignore rules)
+        stack = [(self.root, '', 0, self.read_gitignore(self.root, '', rules))]
+        seen_files = set()
+        while stack:
+            dirpath, rel_dir, index, rules = stack.pop()
+            segment = self.segments[index]
+            last = index == len(self.segments) - 1
+            if segment == '**':
+                if last:
+                    continue # ** at the end matches directories only
+                # more directories: keep ** for each subdirectory, zero directories: match the next segment here first
+                for name, is_dir, is_link in self.list_dir(dirpath):
+                    if is_dir and not is_link and not name.startswith('.') and not self.is_ignored(rules, join_rel(rel_dir, name), True):
+                        child_rel = join_rel(rel_dir, name)
+                        child_path = os.path.join(dirpath, name)
+                        stack.append((child_path, child_rel, index, self.read_gitignore(child_path, child_rel, rules)))
+                stack.append((dirpath, rel_dir, index + 1, rules))
+                continue
+            matcher = self.matchers[index]
+            if matcher is None:
+                # literal segment, no directory listing needed
+                try:
+                    child_mode = os.stat(os.path.join(dirpath, segment)).st_mode
+                except OSError:
+                    continue
+                candidates = [(segment, stat.S_ISDIR(child_mode), False)]
+            else:
+                hidden = segment.startswith('.')
+                candidates = [entry for entry in self.list_dir(dirpath) if matcher.match(entry[0]) and (hidden or not entry[0].startswith('.'))]
+            if last:
+                for name, is_dir, is_link in reversed(candidates):
+                    child_rel = join_rel(rel_dir, name)
+                    if not is_dir and child_rel not in seen_files and not self.is_ignored(rules, child_rel, False):
+                        seen_files.add(child_rel)
+                        yield child_rel
+                continue
+            for name, is_dir, is_link in candidates:
+                child_rel = join_rel(rel_dir, name)
+                if is_dir and not self.is_ignored(rules, child_rel, True):
+                    child_path = os.path.join(dirpath, name)
+                    stack.append((child_path, child_rel, index + 1, self.read_gitignore(child_path, child_rel, rules)))
+
+    # returns (name, is_dir, is_symlink) tuples in reverse name order, directories pushed in this order are popped in name order
+    def list_dir(self, dirpath):
+        entries = []
+        try:
+            if scandir is not None:
+                for entry in scandir(dirpath):
+                    try:
+                        entries.append((entry.name, entry.is_dir(), entry.is_symlink()))
+                    except OSError:
+                        pass
+            else:
+                for name in os.listdir(dirpath):
+                    child_path = os.path.join(dirpath, name)
+                    entries.append((name, os.path.isdir(child_path), os.path.islink(child_path)))
+        except OSError:
+            pass # unreadable directory
+        entries.sort(reverse=True)
+        return entries
+
+    def read_gitignore(self, dirpath, rel_dir, rules):
+        if not self.use_gitignore:
+            return rules
+        gitignore_path = os.path.join(dirpath, '.gitignore')
+        if not os.path.isfile(gitignore_path):
+            return rules
+        try:
+            return rules + [IgnoreRules(rel_dir, FileReader(gitignore_path).iter_lines())]
+        except (IOError, OSError):
+            return rules
+
+    # the rules of deeper directories come later and override the rules of their parents
+    def is_ignored(self, rules, rel_path, is_dir):
+        ignored = False
+        for rule_set in rules:
+            result = rule_set.match(rel_path, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
+
+def join_rel(rel_dir, name):
+    return rel_dir + '/' + name if len(rel_dir) > 0 else name
+
+#------------------------------------------------------------------------------
+# [ split_pattern function ] - returns (root directory, relative pattern) for a pattern that may be absolute or start with ~
+#------------------------------------------------------------------------------
+def split_pattern(current_dir, pattern):
+    pattern = os.path.expanduser(pattern)
+    if not os.path.isabs(pattern):
+        return current_dir, pattern
+    drive, path = os.path.splitdrive(pattern)
+    return drive + os.sep, path.lstrip('/\\')
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import json
+import time
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileReader, FileWriter
+else:
+    from GlueIO import FileReader, FileWriter
+
+#------------------------------------------------------------------------------
+# [ HistoryIndex class ] - prefix and substring search over unique commands, most recent first
+#   every command has the sequence number of its newest entry, a command that is entered again
+#   gets a new number.  Each bigram and trigram of '\x01' + command has a posting list of sequence
+#   numbers, oldest first.  A search walks the shortest posting list of the query backwards and
+#   checks the commands, so it stops after limit matches instead of scanning all commands.
+#   Numbers of old entries stay in the lists until a list is half dead and is rewritten.  One
+#   character substring queries walk all commands, most recent first.
+#------------------------------------------------------------------------------
+class HistoryIndex:
+    def __init__(self, commands=()):
+        self.next_number = 0
+        self.numbers = {} # command -> sequence number of its newest entry
+        self.counts = {} # command -> number of entries
+        self.commands = {} # sequence number -> command, current numbers only
+        self.order = [] # sequence numbers, oldest first
+        self.order_dead = 0 # old numbers in self.order
+        self.postings = {} # trigram -> sequence numbers, oldest first
+        self.dead = {} # trigram -> old numbers in its posting list
+        for command in commands: # oldest first
+            self.add(command)
+
+    #------------------------------------------------------------------------------
+    # [ add method ] - add an entry of the command, the command becomes the most recent one
+    #------------------------------------------------------------------------------
+    def add(self, command):
+        count = self.counts.get(command, 0)
+        self.counts[command] = count + 1
+        if count > 0:
+            self.unlink(command)
+        number = self.next_number
+        self.next_number += 1
+        self.numbers[command] = number
+        self.commands[number] = command
+        self.order.append(number)
+        for key in get_command_keys(command):
+            if key in self.postings:
+                self.postings[key].append(number)
+            else:
+                self.postings[key] = [number]
+
+    #------------------------------------------------------------------------------
+    # [ remove method ] - remove the oldest entry of the command, the command goes when it has no entries left
+    #------------------------------------------------------------------------------
+    def remove(self, command):
+        count = self.counts.get(command, 0)
+        if count == 0:
+            return
+        if count > 1:
+            self.counts[command] = count - 1
+        else:
+            del self.counts[command]
+            self.unlink(command)
+
+    # drop the current number of the command, the lists are rewritten when half of them are old numbers
+    def unlink(self, command):
+        del self.commands[self.numbers.pop(command)]
+        self.order_dead += 1
+        if 2 * self.order_dead > len(self.order):
+            self.order = [number for number in self.order if number in self.commands]
+            self.order_dead = 0
+        for key in get_command_keys(command):
+            posting = self.postings[key]
+            dead = self.dead.get(key, 0) + 1
+            if 2 * dead > len(posting):
+                posting = [number for number in posting if number in self.commands]
+                if len(posting) > 0:
+                    self.postings[key] = posting
+                else:
+                    del self.postings[key]
+                self.dead.pop(key, None)
+            else:
+                self.dead[key] = dead
+
+    def search(self, query, prefix=False, limit=50):
+        if len(query) == 0 or (len(query) == 1 and not prefix):
+            candidates = self.order
+        else:
+            candidates = None
+            for key in get_query_keys(query, prefix):
+                posting = self.postings.get(key)
+                if posting is None:
+                    return [] # no command has this bigram or trigram
+                if candidates is None or len(posting) < len(candidates):
+                    candidates = posting
+        results = []
+        for number in reversed(candidates):
+            command = self.commands.get(number)
+            if command is None:
+                continue # an older entry of a command that was entered again
+            if command.startswith(query) if prefix else query in command:
+                results.append(command)
+                if len(results) >= limit:
+                    break
+        return results
+
+# the posting list keys of a command: the bigrams and trigrams of '\x01' + command
+def get_command_keys(command):
+    text = '\x01' + command
+    keys = set(text[i:i + 2] for i in range(len(text) - 1))
+    keys.update(text[i:i + 3] for i in range(len(text) - 2))
+    return keys
+
+# the keys that every command that starts with (prefix) or contains the query has
+def get_query_keys(query, prefix):
+    text = '\x01' + query if prefix else query
+    if len(text) == 2:
+        return [text]
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+#------------------------------------------------------------------------------
+# [ CommandHistory class ] - the commands entered in Glue, globally and per working directory
+#   entries are appended to a JSON lines file, the file is rewritten with the newest entries
+#   in a background thread when it holds twice the history size
+#------------------------------------------------------------------------------
+class CommandHistory:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.file_lock = threading.Lock() # appends wait while the file is compacted
+        self.file_path = None
+        self.file_entries = 0 # number of lines in the history file
+        self.entries = [] # (command, working directory, time), oldest first
+        self.loaded = False
+        self.global_index = HistoryIndex()
+        self.dir_indexes = {} # working directory -> HistoryIndex, built on the first search in the directory
+
+    def configure(self, file_path, max_entries):
+        with self.lock:
+            self.file_path = file_path
+            self.max_entries = max_entries
+            self.loaded = False
+
+    #------------------------------------------------------------------------------
+    # [ load method ] - read the history file, run from a background thread on plugin load
+    #------------------------------------------------------------------------------
+    def load(self):
+        with self.lock:
+            self.load_entries()
+
+    # call with self.lock held
+    def load_entries(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        entries = []
+        if self.file_path is not None and os.path.isfile(self.file_path):
+            for entry in FileReader(self.file_path).iter_records(): # skips a line that was cut off when ST closed
+                try:
+                    entries.append((entry['c'], entry['d'], entry['t']))
+                except (KeyError, TypeError):
+                    pass
+        self.file_entries = len(entries)
+        self.entries = entries[-self.max_entries:]
+        self.global_index = HistoryIndex(command for command, cwd, entry_time in self.entries)
+        self.dir_indexes = {}
+
+    def add(self, command, cwd):
+        command = command.strip()
+        if len(command) == 0 or '\n' in command:
+            return
+        entry = (command, cwd, time.time())
+        with self.lock:
+            self.load_entries()
+            self.entries.append(entry)
+            self.global_index.add(command)
+            if cwd in self.dir_indexes:
+                self.dir_indexes[cwd].add(command)
+            if len(self.entries) > self.max_entries + self.max_entries // 4:
+                # trimmed in steps, not on every command
+                for old_command, old_cwd, old_time in self.entries[:-self.max_entries]:
+                    self.global_index.remove(old_command)
+                    if old_cwd in self.dir_indexes:
+                        self.dir_indexes[old_cwd].remove(old_command)
+                self.entries = self.entries[-self.max_entries:]
+        self.append_entry(entry)
+
+    #------------------------------------------------------------------------------
+    # [ search method ] - returns unique commands that start with (prefix) or contain the query, most recent first
+    #   with cwd, the commands that were entered in that directory come before the other commands
+    #------------------------------------------------------------------------------
+    def search(self, query='', cwd=None, prefix=False, limit=50):
+        with self.lock:
+            self.load_entries()
+            results = []
+            if cwd is not None:
+                results = self.get_index(cwd).search(query, prefix, limit)
+            if len(results) < limit:
+                seen = set(results)
+                for command in self.get_index(None).search(query, prefix, limit + len(results)):
+                    if command not in seen:
+                        results.append(command)
+            return results[:limit]
+
+    # call with self.lock held, a directory index is built on the first search in the directory and then kept up to date
+    def get_index(self, cwd):
+        if cwd is None:
+            return self.global_index
+        if cwd not in self.dir_indexes:
+            self.dir_indexes[cwd] = HistoryIndex(command for command, entry_cwd, entry_time in self.entries if entry_cwd == cwd)
+        return self.dir_indexes[cwd]
+
+    def append_entry(self, entry):
+        if self.file_path is None:
+            return
+        line = json.dumps({'c': entry[0], 'd': entry[1], 't': entry[2]}) + '\n'
+        with self.file_lock:
+            try:
+                history_dir = os.path.dirname(self.file_path)
+                if not os.path.isdir(history_dir):
+                    os.makedirs(history_dir)
+                FileWriter(self.file_path).append_utf8(line)
+                self.file_entries += 1
+                compact = self.file_entries > 2 * self.max_entries
+            except (IOError, OSError):
+                compact = False
+        if compact:
+            compact_thread = threading.Thread(target=self.compact)
+            compact_thread.daemon = True
+            compact_thread.start()
+
+    #------------------------------------------------------------------------------
+    # [ compact method ] - rewrite the history file with the entries that are kept in memory
+    #------------------------------------------------------------------------------
+    def compact(self):
+        with self.file_lock:
+            if self.file_entries <= 2 * self.max_entries:
+                return # compacted by another thread
+            with self.lock:
+                entries = list(self.entries[-self.max_entries:])
+            try:
+                FileWriter(self.file_path).write_lines(json.dumps({'c': command, 'd': cwd, 't': entry_time}) + '\n' for command, cwd, entry_time in entries)
+                self.file_entries = len(entries)
+            except (IOError, OSError):
+                pass
+
+    def clear(self):
+        with self.lock:
+            self.entries = []
+            self.global_index = HistoryIndex()
+            self.dir_indexes = {}
+        with self.file_lock:
+            if self.file_path is not None and os.path.isfile(self.file_path):
+                os.remove(self.file_path)
+            self.file_entries = 0
+
+# shared by all GlueCommand instances
+command_history = CommandHistory()
@@ -1,7 +1,14 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import os
+import io
 import sys
+import json
+import mmap
+import threading
+
+chunk_size = 65536 # bytes per read for the line iterator and the tail reader
 
 #------------------------------------------------------------------------------
 # [ FileReader class ] - read local files
@@ -10,10 +17,9 @@ class FileReader:
     def __init__(self, filepath):
         self.filepath = filepath
 
-    def read_utf8(self):
+    def read_utf8(self, errors='strict'):
         try:
-            import codecs
-            f = codecs.open(self.filepath, encoding='utf_8', mode='r')
+            f = io.open(self.filepath, encoding='utf_8', errors=errors, mode='r', newline='')
         except IOError as ioe:
             sys.stderr.write("Glue Plugin Error: Unable to open file for read with read_utf8() method.")
             raise ioe
@@ -25,8 +31,99 @@ class FileReader:
         finally:
             f.close()
 
+    def read_bytes(self):
+        with open(self.filepath, 'rb') as f:
+            return f.read()
+
+    #------------------------------------------------------------------------------
+    # [ iter_lines method ] - yields the lines of the file one at a time, with their line endings
+    #   the file is read in chunks, invalid UTF-8 is replaced
+    #------------------------------------------------------------------------------
+    def iter_lines(self, chunk_size=chunk_size):
+        with open(self.filepath, 'rb') as f:
+            partial = b''
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                lines = (partial + chunk).split(b'\n')
+                partial = lines.pop()
+                for line in lines:
+                    yield (line + b'\n').decode('utf-8', 'replace')
+            if partial:
+                yield partial.decode('utf-8', 'replace')
+
+    #------------------------------------------------------------------------------
+    # [ iter_records method ] - yields the JSON values of a file with one value per line
+    #   blank lines and lines that are not valid JSON (cut off when ST closed) are skipped
+    #------------------------------------------------------------------------------
+    def iter_records(self, chunk_size=chunk_size):
+        for line in self.iter_lines(chunk_size):
+            if len(line.strip()) == 0:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                pass
+
+    #------------------------------------------------------------------------------
+    # [ read_tail method ] - returns the last line_count lines of the file as one string
+    #   reads backwards from the end of the file in chunks until it has enough lines
+    #------------------------------------------------------------------------------
+    def read_tail(self, line_count, chunk_size=chunk_size):
+        if line_count <= 0:
+            return ''
+        with open(self.filepath, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0:
+                read_size = min(chunk_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+                # the last line may not end with a newline, the first line needs the newline before it
+                if data.count(b'\n', 0, len(data) - 1) >= line_count:
+                    break
+        lines = data.split(b'\n')
+        if data.endswith(b'\n'):
+            lines.pop()
+            lines[-1] += b'\n'
+        tail = b'\n'.join(lines[-line_count:]) if len(lines) > 0 else b''
+        return tail.decode('utf-8', 'replace')
+
+#------------------------------------------------------------------------------
+# [ MappedFile class ] - read-only memory map of a file for use in a with statement
+#   the mapped object supports len(), slicing and find() like bytes.  Empty files give b''
+#   because they cannot be mapped.
+#------------------------------------------------------------------------------
+class MappedFile:
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = None
+        self.mapped = None
+
+    def __enter__(self):
+        self.file = open(self.filepath, 'rb')
+        try:
+            if os.fstat(self.file.fileno()).st_size == 0:
+                return b''
+            self.mapped = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        return self.mapped
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+        self.file.close()
+        return False
+
 #------------------------------------------------------------------------------
 # [ FileWriter class ] - write to local files
+#   write_utf8 and write_lines replace the file atomically, readers see the old or the new file
 #------------------------------------------------------------------------------
 class FileWriter:
     def __init__(self, filepath):
@@ -34,15 +131,114 @@ class FileWriter:
 
     def write_utf8(self, text):
         try:
-            import codecs
-            f = codecs.open(self.filepath, encoding='utf_8', mode='w')
-        except IOError as ioe:
+            f = AtomicWriter(self.filepath)
+        except (IOError, OSError) as ioe:
             sys.stderr.write("Glue Plugin Error: Unable to open file for write with the write_utf8() method.")
             raise ioe
         try:
             f.write(text)
+            f.commit()
         except Exception as e:
+            f.discard()
             sys.stderr.write("Glue Plugin Error: Unable to write UTF-8 encoded text to file with the write_utf8() method.")
             raise e
+
+    def write_lines(self, lines):
+        with AtomicWriter(self.filepath) as f:
+            for line in lines:
+                f.write(line)
+
+    def append_utf8(self, text):
+        try:
+            f = io.open(self.filepath, encoding='utf_8', mode='a', newline='')
+        except IOError as ioe:
+            sys.stderr.write("Glue Plugin Error: Unable to open file for append with the append_utf8() method.")
+            raise ioe
+        try:
+            f.write(to_unicode(text))
+        except Exception as e:
+            sys.stderr.write("Glue Plugin Error: Unable to append UTF-8 encoded text to file with the append_utf8() method.")
+            raise e
         finally:
             f.close()
+
+    def append_bytes(self, data):
+        with open(self.filepath, 'ab') as f:
+            f.write(data)
+
+#------------------------------------------------------------------------------
+# [ AtomicWriter class ] - writes a temporary file next to the target and renames it over the target
+#   commit() flushes (and with sync, fsyncs) the data before the rename, discard() removes the
+#   temporary file.  In a with statement the file is committed unless an exception was raised.
+#------------------------------------------------------------------------------
+class AtomicWriter:
+    def __init__(self, filepath, binary=False, sync=True):
+        self.filepath = filepath
+        self.binary = binary
+        self.sync = sync
+        self.temp_path = filepath + '.' + str(os.getpid()) + '.' + str(threading.current_thread().ident) + '.tmp'
+        if binary:
+            self.file = open(self.temp_path, 'wb')
+        else:
+            self.file = io.open(self.temp_path, encoding='utf_8', mode='w', newline='')
+
+    def write(self, data):
+        self.file.write(data if self.binary else to_unicode(data))
+
+    def commit(self):
+        try:
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+            self.file.close()
+            replace_file(self.temp_path, self.filepath)
+        except Exception:
+            self.discard()
+            raise
+        if self.sync:
+            sync_directory(os.path.dirname(self.filepath))
+
+    def discard(self):
+        if not self.file.closed:
+            self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+def to_unicode(text):
+    return text if isinstance(text, type(u'')) else text.decode('utf-8')
+
+# rename over an existing file, os.replace is not available in Py2 and rename does not replace files on Windows
+def replace_file(source_path, target_path):
+    if hasattr(os, 'replace'):
+        os.replace(source_path, target_path)
+    else:
+        if os.name == 'nt' and os.path.exists(target_path):
+            os.remove(target_path)
+        os.rename(source_path, target_path)
+
+# the rename is only durable once the directory entry is written, not supported on Windows
+def sync_directory(dirpath):
+    if os.name == 'nt':
+        return
+    try:
+        dir_fd = os.open(dirpath or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
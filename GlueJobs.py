@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import signal
+import subprocess
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueStream import OutputStream
+else:
+    from GlueStream import OutputStream
+
+#------------------------------------------------------------------------------
+# [ Job class ] - record for one command executed by Glue
+#   holds the process, the execution thread and the output buffer of the command
+#------------------------------------------------------------------------------
+class Job:
+    def __init__(self, job_id, command, background=False, max_output=1048576):
+        self.job_id = job_id
+        self.command = command # the command string as the user entered it
+        self.background = background
+        self.stream = OutputStream(max_output, discard=background)
+        self.process = None
+        self.pid = None
+        self.thread = None
+        self.killed = False
+        self.reported = False # True once all output of the job was written to the view
+        self.metrics = None # CommandMetrics of the command
+        self.timeout = 0 # seconds, 0 = no timeout
+        self.timer = None
+        self.timed_out = False
+        self.cache_key = None # the output is stored in the result cache under this key (glue cached)
+        # buffered (non-streaming) execution results
+        self.stdout = ""
+        self.stderr = ""
+        self.exitcode = 1
+
+    def set_process(self, process):
+        self.process = process
+        self.pid = process.pid
+        if self.timeout > 0:
+            self.timer = threading.Timer(self.timeout, self.expire)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def expire(self):
+        self.timed_out = self.kill()
+
+    #------------------------------------------------------------------------------
+    # [ finish method ] - called by the command thread when the command has ended and its output was read
+    #------------------------------------------------------------------------------
+    def finish(self, exitcode):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.stream.close(exitcode)
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def get_status(self):
+        if self.is_running():
+            return "Running"
+        elif self.timed_out:
+            return "Timeout"
+        elif self.killed:
+            return "Killed"
+        elif self.stream.exitcode == 0:
+            return "Done"
+        else:
+            return "Exit " + str(self.stream.exitcode)
+
+    #------------------------------------------------------------------------------
+    # [ foreground method ] - reader blocks when output is not consumed, nothing is dropped
+    #------------------------------------------------------------------------------
+    def foreground(self):
+        self.background = False
+        self.stream.set_discard(False)
+
+    #------------------------------------------------------------------------------
+    # [ kill method ] - stop the command and the processes that it started
+    #------------------------------------------------------------------------------
+    def kill(self):
+        if self.process is not None and self.is_running() and not self.killed:
+            self.killed = True
+            if isinstance(self.process, subprocess.Popen):
+                kill_process_group(self.process)
+            else:
+                self.process.kill() # shell session
+            return True
+        return False
+
+    # the notice that is written after the partial output of a stopped command, empty if it was not stopped
+    def get_stop_message(self):
+        if self.timed_out:
+            return "[ Glue: the command was stopped after " + str(self.timeout) + " seconds ]\n"
+        elif self.killed:
+            return "[ Glue: the command was cancelled ]\n"
+        return ""
+
+#------------------------------------------------------------------------------
+# [ JobTable class ] - the jobs of one Glue terminal view, numbered from 1 like shell job ids
+#------------------------------------------------------------------------------
+class JobTable:
+    def __init__(self, max_finished=20):
+        self.max_finished = max_finished # finished jobs that are kept for the jobs and fg commands
+        self.lock = threading.Lock()
+        self.jobs = []
+        self.next_id = 1
+
+    def add(self, command, background=False, max_output=1048576):
+        with self.lock:
+            self.prune()
+            job = Job(self.next_id, command, background, max_output)
+            self.next_id += 1
+            self.jobs.append(job)
+            return job
+
+    def get(self, job_id):
+        with self.lock:
+            for job in self.jobs:
+                if job.job_id == job_id:
+                    return job
+        return None
+
+    def list_jobs(self):
+        with self.lock:
+            return list(self.jobs)
+
+    def remove(self, job):
+        with self.lock:
+            if job in self.jobs:
+                self.jobs.remove(job)
+            if len(self.jobs) == 0:
+                self.next_id = 1
+
+    # call with self.lock held, drops the oldest finished jobs above the limit
+    def prune(self):
+        finished = [job for job in self.jobs if not job.is_running()]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            self.jobs.remove(job)
+
+job_tables = {} # view id -> JobTable
+
+#------------------------------------------------------------------------------
+# [ get_job_table function ] - returns the job table for a Glue terminal view
+#------------------------------------------------------------------------------
+def get_job_table(view_id):
+    if view_id not in job_tables:
+        job_tables[view_id] = JobTable()
+    return job_tables[view_id]
+
+# removes a finished job, a job that finishes after its view was closed does not create a new table
+def remove_job(view_id, job):
+    table = job_tables.get(view_id)
+    if table is not None:
+        table.remove(job)
+
+# drops the job table of a closed view and stops the jobs that are still running, nothing can show their output
+def close_job_table(view_id):
+    table = job_tables.pop(view_id, None)
+    if table is not None:
+        for job in table.list_jobs():
+            job.kill()
+
+#------------------------------------------------------------------------------
+# [ process group functions ] - every command runs in its own process group so that a kill also
+#   stops the processes that the shell started.  The group gets SIGTERM, then SIGKILL if it is
+#   still running after kill_grace seconds.
+#------------------------------------------------------------------------------
+kill_grace = 2.0
+
+def process_group_args():
+    if os.name == 'nt':
+        return {'creationflags': 0x00000200} # CREATE_NEW_PROCESS_GROUP
+    if version_info[0] == 3:
+        return {'start_new_session': True} # no Python code in the child between fork and exec, ST runs other threads
+    return {'preexec_fn': os.setsid}
+
+def kill_process_group(process):
+    if os.name == 'nt':
+        try:
+            subprocess.call(['taskkill', '/F', '/T', '/PID', str(process.pid)]) # the process and its children
+        except OSError:
+            process.kill()
+        return
+    signal_group(process, signal.SIGTERM)
+    escalate = threading.Timer(kill_grace, signal_group, (process, signal.SIGKILL)) # also children that outlive the shell
+    escalate.daemon = True
+    escalate.start()
+
+# close the pipes and reap the process, also after an error in the thread that reads the output
+def release_process(process):
+    for pipe in (process.stdout, process.stderr):
+        if pipe is not None and not pipe.closed:
+            pipe.close()
+    if process.poll() is None:
+        kill_process_group(process)
+        process.wait()
+
+def signal_group(process, signal_number):
+    try:
+        os.killpg(process.pid, signal_number)
+    except OSError:
+        pass # the group exited in the meantime
+
+#------------------------------------------------------------------------------
+# [ parse_job_id function ] - parse '%n' or 'n' job specifications, returns None if not a job id
+#------------------------------------------------------------------------------
+def parse_job_id(job_spec):
+    if job_spec.startswith('%'):
+        job_spec = job_spec[1:]
+    if job_spec.isdigit():
+        return int(job_spec)
+    return None
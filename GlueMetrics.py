@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileWriter
+else:
+    from GlueIO import FileWriter
+
+#------------------------------------------------------------------------------
+# [ CommandMetrics class ] - timings of one system command, in seconds
+#------------------------------------------------------------------------------
+class CommandMetrics:
+    def __init__(self, command, executable, cwd):
+        self.command = command
+        self.executable = os.path.basename(executable)
+        self.cwd = cwd
+        self.started = time.time()
+        self.path_time = None # PATH resolution
+        self.spawn_time = None # Popen until the process runs
+        self.first_byte_time = None # from the start of the command, None for buffered commands and silent commands
+        self.wall_time = None
+        self.output_bytes = 0
+        self.exitcode = None
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def finish(self, exitcode):
+        self.exitcode = exitcode
+        self.wall_time = self.elapsed()
+
+    def to_dict(self):
+        return {'command': self.command, 'executable': self.executable, 'cwd': self.cwd, 'started': self.started,
+                'path_time': self.path_time, 'spawn_time': self.spawn_time, 'first_byte_time': self.first_byte_time,
+                'wall_time': self.wall_time, 'output_bytes': self.output_bytes, 'exitcode': self.exitcode}
+
+#------------------------------------------------------------------------------
+# [ MetricsRecorder class ] - the most recent command metrics, optionally logged to a JSON lines file
+#------------------------------------------------------------------------------
+class MetricsRecorder:
+    def __init__(self, max_records=200):
+        self.lock = threading.Lock()
+        self.records = deque(maxlen=max_records)
+        self.log_path = None
+        self.max_log_size = 4194304 # bytes, the log is rotated to <log>.1 above this size
+
+    def configure(self, max_records, log_path=None):
+        with self.lock:
+            if max_records != self.records.maxlen:
+                self.records = deque(self.records, maxlen=max_records)
+            self.log_path = log_path
+
+    def add(self, metrics):
+        with self.lock:
+            self.records.append(metrics)
+            log_path = self.log_path
+        if log_path is not None:
+            self.write_log(log_path, metrics)
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+    def get_records(self):
+        with self.lock:
+            return list(self.records)
+
+    def get_last(self):
+        with self.lock:
+            return self.records[-1] if self.records else None
+
+    #------------------------------------------------------------------------------
+    # [ aggregate method ] - returns a list of per executable summary dicts, slowest total time first
+    #------------------------------------------------------------------------------
+    def aggregate(self):
+        totals = {}
+        for metrics in self.get_records():
+            summary = totals.setdefault(metrics.executable, {'executable': metrics.executable, 'runs': 0, 'failures': 0,
+                                        'wall_times': [], 'path_times': [], 'spawn_times': [], 'first_byte_times': [], 'output_bytes': 0})
+            summary['runs'] += 1
+            if metrics.exitcode != 0:
+                summary['failures'] += 1
+            summary['output_bytes'] += metrics.output_bytes
+            for key, value in (('wall_times', metrics.wall_time), ('path_times', metrics.path_time),
+                               ('spawn_times', metrics.spawn_time), ('first_byte_times', metrics.first_byte_time)):
+                if value is not None:
+                    summary[key].append(value)
+        return sorted(totals.values(), key=lambda summary: sum(summary['wall_times']), reverse=True)
+
+    def write_log(self, log_path, metrics):
+        try:
+            log_dir = os.path.dirname(log_path)
+            if not os.path.isdir(log_dir):
+                os.makedirs(log_dir)
+            if os.path.isfile(log_path) and os.path.getsize(log_path) > self.max_log_size:
+                if os.path.isfile(log_path + '.1'):
+                    os.remove(log_path + '.1')
+                os.rename(log_path, log_path + '.1')
+            FileWriter(log_path).append_utf8(json.dumps(metrics.to_dict()) + '\n')
+        except (IOError, OSError):
+            pass # metrics are not worth an error in the Glue view
+
+# shared by all GlueCommand instances
+command_metrics = MetricsRecorder()
+
+#------------------------------------------------------------------------------
+# [ format_duration function ] - human readable duration for the status bar and glue stats
+#------------------------------------------------------------------------------
+def format_duration(seconds):
+    if seconds is None:
+        return '-'
+    elif seconds < 1:
+        return str(int(round(seconds * 1000))) + 'ms'
+    elif seconds < 60:
+        return '%.2fs' % seconds
+    else:
+        return '%dm%02ds' % (seconds // 60, seconds % 60)
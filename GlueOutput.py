@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueScheduler import scheduler
+else:
+    from GlueScheduler import scheduler
+
+#------------------------------------------------------------------------------
+# [ ViewWriteQueue class ] - text segments waiting to be written to a Glue terminal view
+#   segments are collected and written by the glue_flush command in one edit per UI frame
+#------------------------------------------------------------------------------
+class ViewWriteQueue:
+    def __init__(self, view):
+        self.view = view
+        self.lock = threading.Lock()
+        self.segments = []
+        self.reopen_panel = False # reopen the input panel after the next flush
+
+    def append(self, text, reopen_panel=False):
+        with self.lock:
+            if text:
+                self.segments.append(text)
+            if reopen_panel:
+                self.reopen_panel = True
+        scheduler.notify(self, self.flush)
+
+    #------------------------------------------------------------------------------
+    # [ take method ] - returns (text, reopen_panel) and empties the queue
+    #------------------------------------------------------------------------------
+    def take(self):
+        with self.lock:
+            text = ''.join(self.segments)
+            reopen_panel = self.reopen_panel
+            self.segments = []
+            self.reopen_panel = False
+        return text, reopen_panel
+
+    def discard(self):
+        with self.lock:
+            self.segments = []
+
+    def flush(self):
+        self.view.run_command('glue_flush')
+
+write_queues = {} # view id -> ViewWriteQueue
+
+#------------------------------------------------------------------------------
+# [ get_write_queue function ] - returns the write queue for a view
+#------------------------------------------------------------------------------
+def get_write_queue(view):
+    if view.id() not in write_queues:
+        write_queues[view.id()] = ViewWriteQueue(view)
+    return write_queues[view.id()]
+
+def close_write_queue(view_id):
+    write_queue = write_queues.pop(view_id, None)
+    if write_queue is not None:
+        write_queue.discard()
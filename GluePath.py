@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import re
+import json
+import subprocess
+import threading
+import time
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileReader, FileWriter
+    from .GlueJobs import process_group_args, kill_process_group
+else:
+    from GlueIO import FileReader, FileWriter
+    from GlueJobs import process_group_args, kill_process_group
+
+#------------------------------------------------------------------------------
+# [ split_path function ] - split a PATH string into its directories
+#   need to keep the Windows ; PATH separator logic first because the : will match in Windows paths like C:\blah
+#------------------------------------------------------------------------------
+def split_path(path_string):
+    if ';' in path_string:
+        return [path for path in path_string.split(';') if len(path) > 0]
+    elif ':' in path_string:
+        return [path for path in path_string.split(':') if len(path) > 0]
+    else:
+        return [path_string]
+
+#------------------------------------------------------------------------------
+# [ ExecutableIndex class ] - maps executable names to the PATH directory that provides them
+#   each directory is listed once and its listing is reused until the directory mtime changes
+#------------------------------------------------------------------------------
+class ExecutableIndex:
+    def __init__(self, recheck_interval=2.0):
+        self.recheck_interval = recheck_interval # seconds between directory mtime checks
+        self.lock = threading.Lock()
+        self.path_string = None
+        self.directories = []
+        self.dir_cache = {} # directory path -> (mtime, {executable name: resolved directory})
+        self.index = {} # executable name -> resolved directory of the first match in PATH order
+        self.sorted_names = ({}, []) # (index, sorted executable names of that index) for completion
+        self.last_check = 0
+        self.refreshing = False
+
+    #------------------------------------------------------------------------------
+    # [ lookup method ] - returns the directory for the executable, empty string if not found
+    #------------------------------------------------------------------------------
+    def lookup(self, executable, path_string):
+        if len(path_string) == 0:
+            return ''
+        directories = split_path(path_string)
+        if len(directories) == 1 and path_string == directories[0]:
+            # there was one path in the setting, so return it as the proper path to executable
+            return path_string
+        with self.lock:
+            if path_string != self.path_string:
+                self.path_string = path_string
+                self.directories = directories
+                self.build_index()
+            elif time.time() - self.last_check > self.recheck_interval:
+                self.build_index()
+            return self.index.get(executable, '')
+
+    #------------------------------------------------------------------------------
+    # [ get_names method ] - sorted executable names of the current index, does not read PATH directories
+    #------------------------------------------------------------------------------
+    def get_names(self):
+        index = self.index
+        if self.sorted_names[0] is not index:
+            self.sorted_names = (index, sorted(index))
+        return self.sorted_names[1]
+
+    #------------------------------------------------------------------------------
+    # [ refresh_async method ] - bring the index up to date for the path string in a background thread
+    #------------------------------------------------------------------------------
+    def refresh_async(self, path_string):
+        if self.refreshing:
+            return
+        self.refreshing = True
+        def refresh():
+            try:
+                self.lookup('', path_string)
+            finally:
+                self.refreshing = False
+        refresh_thread = threading.Thread(target=refresh)
+        refresh_thread.daemon = True
+        refresh_thread.start()
+
+    #------------------------------------------------------------------------------
+    # [ rehash method ] - discard all cached directory listings and rebuild the index
+    #------------------------------------------------------------------------------
+    def rehash(self, path_string=None):
+        with self.lock:
+            self.dir_cache = {}
+            if path_string is not None:
+                self.path_string = path_string
+                self.directories = split_path(path_string)
+            self.build_index()
+            return len(self.index), len(self.directories)
+
+    # call with self.lock held
+    def build_index(self):
+        index = {}
+        for directory in self.directories:
+            for name, resolved_dir in self.xitems(self.scan_directory(directory)):
+                if name not in index:
+                    index[name] = resolved_dir
+        self.index = index
+        self.last_check = time.time()
+
+    # call with self.lock held, returns the cached listing unless the directory mtime changed
+    def scan_directory(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self.dir_cache.pop(directory, None)
+            return {}
+        cached = self.dir_cache.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        entries = {}
+        try:
+            if hasattr(os, 'scandir'):
+                for entry in os.scandir(directory):
+                    if entry.is_file():
+                        entries[entry.name] = directory
+                    elif entry.is_symlink():
+                        entries[entry.name] = os.path.dirname(os.path.realpath(entry.path))
+            else:
+                for name in os.listdir(directory):
+                    test_path = os.path.join(directory, name)
+                    if os.path.isfile(test_path):
+                        entries[name] = directory
+                    elif os.path.islink(test_path):
+                        entries[name] = os.path.dirname(os.path.realpath(test_path))
+        except OSError:
+            pass # unreadable PATH directory, cache it as empty until its mtime changes
+        self.dir_cache[directory] = (mtime, entries)
+        return entries
+
+    def xitems(self, the_dict):
+        try:
+            return the_dict.iteritems()
+        except AttributeError:
+            return the_dict.items()
+
+# shared by all GlueCommand instances
+executable_index = ExecutableIndex()
+
+#------------------------------------------------------------------------------
+# [ LoginEnvironment class ] - environment of the user's login shell, cached on disk
+#   the cache is keyed on the mtimes of the shell startup files and refreshed in a
+#   background thread so that commands never wait on the login shell
+#------------------------------------------------------------------------------
+class LoginEnvironment:
+    startup_files = ['/etc/profile', '/etc/paths', '/etc/zshenv', '/etc/zprofile', '/etc/zshrc', '/etc/bashrc',
+                     '~/.profile', '~/.bash_profile', '~/.bash_login', '~/.bashrc',
+                     '~/.zshenv', '~/.zprofile', '~/.zshrc', '~/.zlogin']
+    ignored_variables = ['_', 'PWD', 'OLDPWD', 'SHLVL']
+    marker = '__GLUE_LOGIN_ENV__'
+    capture_timeout = 15 # seconds, for startup files that wait for input or hang
+    variable_pattern = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cache_file = None
+        self.shell = os.environ.get('SHELL', '/bin/bash')
+        self.environment = None
+        self.refresh_thread = None
+
+    def configure(self, cache_file, shell=None):
+        self.cache_file = cache_file
+        if shell:
+            self.shell = shell
+
+    def get(self):
+        with self.lock:
+            return self.environment
+
+    def is_ready(self):
+        return self.get() is not None
+
+    #------------------------------------------------------------------------------
+    # [ refresh_async method ] - load the disk cache and recapture the login environment if it is stale
+    #------------------------------------------------------------------------------
+    def refresh_async(self):
+        if self.refresh_thread is not None and self.refresh_thread.is_alive():
+            return
+        self.refresh_thread = threading.Thread(target=self.refresh)
+        self.refresh_thread.daemon = True
+        self.refresh_thread.start()
+
+    def refresh(self):
+        fingerprint = self.get_fingerprint()
+        cached = self.read_cache()
+        if cached is not None:
+            with self.lock:
+                self.environment = cached['environment'] # use the cached copy while it is validated
+            if cached['fingerprint'] == fingerprint and cached['shell'] == self.shell:
+                return
+        environment = self.capture()
+        if environment is not None:
+            with self.lock:
+                self.environment = environment
+            self.write_cache({'shell': self.shell, 'fingerprint': fingerprint, 'environment': environment})
+
+    def get_fingerprint(self):
+        fingerprint = {}
+        for startup_file in self.startup_files:
+            try:
+                fingerprint[startup_file] = os.stat(os.path.expanduser(startup_file)).st_mtime
+            except OSError:
+                fingerprint[startup_file] = None
+        return fingerprint
+
+    #------------------------------------------------------------------------------
+    # [ capture method ] - run the login shell once and parse its environment
+    #   returns None if the shell fails or does not finish in capture_timeout seconds, the cached
+    #   environment is kept then and the next refresh tries again
+    #------------------------------------------------------------------------------
+    def capture(self):
+        envgetter = "echo " + self.marker + "; env"
+        try:
+            # own process group, a timeout also stops the programs that the startup files started
+            process = subprocess.Popen([self.shell, '-ilc', envgetter], stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, **process_group_args())
+        except OSError:
+            return None
+        if version_info[0] == 3:
+            try:
+                stdout = process.communicate(timeout=self.capture_timeout)[0]
+            except subprocess.TimeoutExpired:
+                kill_process_group(process)
+                process.communicate()
+                return None
+        else:
+            timed_out = []
+            def stop():
+                timed_out.append(True)
+                kill_process_group(process)
+            timer = threading.Timer(self.capture_timeout, stop)
+            timer.daemon = True
+            timer.start()
+            try:
+                stdout = process.communicate()[0]
+            finally:
+                timer.cancel()
+            if timed_out:
+                return None
+        output = stdout.decode('utf-8', 'replace')
+        if self.marker not in output:
+            return None
+        environment = {}
+        name = None
+        for line in output.split(self.marker, 1)[1].splitlines():
+            match = self.variable_pattern.match(line)
+            if match:
+                name = match.group(1)
+                environment[name] = match.group(2)
+            elif name is not None:
+                environment[name] += '\n' + line # continuation of a multi-line value
+        for name in self.ignored_variables:
+            environment.pop(name, None)
+        if 'PATH' in environment:
+            environment['PATH'] = environment['PATH'].rstrip().rstrip(':')
+        return environment
+
+    def read_cache(self):
+        if self.cache_file is None or not os.path.isfile(self.cache_file):
+            return None
+        try:
+            cached = json.loads(FileReader(self.cache_file).read_utf8())
+            if 'environment' in cached and 'fingerprint' in cached and 'shell' in cached:
+                return cached
+        except Exception:
+            pass # corrupt cache file, it is replaced after the next capture
+        return None
+
+    def write_cache(self, data):
+        if self.cache_file is None:
+            return
+        cache_dir = os.path.dirname(self.cache_file)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        FileWriter(self.cache_file).write_utf8(json.dumps(data))
+
+# shared by all GlueCommand instances
+login_environment = LoginEnvironment()
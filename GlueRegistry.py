@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import threading
+from sys import version_info
+
+#------------------------------------------------------------------------------
+# [ SubcommandRegistry class ] - maps 'glue <name>' subcommands to their handlers
+#   handlers are called as handler(glue, com_args, glue_command) where glue is the running GlueCommand.
+#   Lazy handlers are given as a module and function name and are imported on first use.
+#
+#   Other packages can add subcommands with:
+#       from Glue.GlueRegistry import subcommands
+#       subcommands.register('name', handler)
+#------------------------------------------------------------------------------
+class SubcommandRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handlers = {} # name -> handler callable or (module name, function name) tuple
+
+    def register(self, name, handler):
+        with self.lock:
+            self.handlers[name] = handler
+
+    def register_lazy(self, name, module_name, function_name):
+        with self.lock:
+            self.handlers[name] = (module_name, function_name)
+
+    def unregister(self, name):
+        with self.lock:
+            self.handlers.pop(name, None)
+
+    #------------------------------------------------------------------------------
+    # [ get method ] - returns the handler for the subcommand, None if it is not registered
+    #------------------------------------------------------------------------------
+    def get(self, name):
+        with self.lock:
+            handler = self.handlers.get(name)
+            if isinstance(handler, tuple):
+                handler = getattr(self.import_module(handler[0]), handler[1])
+                self.handlers[name] = handler
+            return handler
+
+    def names(self):
+        with self.lock:
+            return set(self.handlers)
+
+    # module names are relative to the Glue package
+    def import_module(self, module_name):
+        if version_info[0] == 3:
+            import importlib
+            return importlib.import_module('.' + module_name, __package__)
+        else:
+            return __import__(module_name, globals(), locals(), ['__name__'])
+
+# shared by all GlueCommand instances
+subcommands = SubcommandRegistry()
+
+# built-in subcommands
+subcommands.register_lazy('--help', 'subcommands.info', 'run_help')
+subcommands.register_lazy('-h', 'subcommands.info', 'run_help')
+subcommands.register_lazy('help', 'subcommands.info', 'run_help')
+subcommands.register_lazy('browse', 'subcommands.browser', 'run_browse')
+subcommands.register_lazy('cached', 'subcommands.cached', 'run_cached')
+subcommands.register_lazy('cancel', 'subcommands.jobs', 'run_cancel')
+subcommands.register_lazy('clear', 'subcommands.editor', 'run_clear')
+subcommands.register_lazy('finder', 'subcommands.editor', 'run_finder')
+subcommands.register_lazy('goto', 'subcommands.editor', 'run_goto')
+subcommands.register_lazy('grep', 'subcommands.search', 'run_grep')
+subcommands.register_lazy('history', 'subcommands.history', 'run_history')
+subcommands.register_lazy('localhost', 'subcommands.browser', 'run_localhost')
+subcommands.register_lazy('new', 'subcommands.editor', 'run_new')
+subcommands.register_lazy('open', 'subcommands.editor', 'run_open')
+subcommands.register_lazy('page', 'subcommands.pager', 'run_page')
+subcommands.register_lazy('parallel', 'subcommands.parallel', 'run_parallel')
+subcommands.register_lazy('path', 'subcommands.shell', 'run_path')
+subcommands.register_lazy('rehash', 'subcommands.shell', 'run_rehash')
+subcommands.register_lazy('show', 'subcommands.search', 'run_show')
+subcommands.register_lazy('stats', 'subcommands.stats', 'run_stats')
+subcommands.register_lazy('template', 'subcommands.info', 'run_template')
+subcommands.register_lazy('timeout', 'subcommands.jobs', 'run_timeout')
+subcommands.register_lazy('to-buffer', 'subcommands.redirect', 'run_to_buffer')
+subcommands.register_lazy('to-file', 'subcommands.redirect', 'run_to_file')
+subcommands.register_lazy('user', 'subcommands.info', 'run_user')
+subcommands.register_lazy('wco', 'subcommands.editor', 'run_wco')
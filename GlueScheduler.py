@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import sys
+import sublime
+import threading
+import traceback
+from collections import deque
+
+#------------------------------------------------------------------------------
+# [ Scheduler class ] - runs callbacks from worker threads on the ST main thread
+#   worker threads call notify() when a job has new output or finishes.  Notifications with
+#   the same key are coalesced and all pending callbacks are run from a single set_timeout,
+#   so nothing is polled and there are no timers while Glue is idle.
+#------------------------------------------------------------------------------
+class Scheduler:
+    def __init__(self, batch_delay=15, tick_interval=75):
+        self.batch_delay = batch_delay # ms, collects the notifications of one UI frame into one drain
+        self.tick_interval = tick_interval # ms, progress indicator animation
+        self.lock = threading.Lock()
+        self.pending_keys = deque()
+        self.pending = {} # key -> callback
+        self.drain_scheduled = False
+        self.indicators = {} # key -> view
+        self.tick_scheduled = False
+        self.tick_count = 0
+
+    #------------------------------------------------------------------------------
+    # [ notify method ] - thread safe, schedule callback on the main thread (once per key per drain)
+    #------------------------------------------------------------------------------
+    def notify(self, key, callback):
+        with self.lock:
+            if key not in self.pending:
+                self.pending_keys.append(key)
+            self.pending[key] = callback
+            if self.drain_scheduled:
+                return
+            self.drain_scheduled = True
+        sublime.set_timeout(self.drain, self.batch_delay)
+
+    def drain(self):
+        with self.lock:
+            callbacks = [self.pending[key] for key in self.pending_keys]
+            self.pending_keys = deque()
+            self.pending = {}
+            self.drain_scheduled = False
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # one failing callback (e.g. for a closed view) must not drop the others of this drain
+                sys.stderr.write("Glue Plugin Error: a scheduled callback raised an exception:\n" + traceback.format_exc())
+
+    #------------------------------------------------------------------------------
+    # [ start_indicator method ] - show the running command indicator in the status bar of the view
+    #   all indicators are animated from a single timer that stops when the last one is removed
+    #------------------------------------------------------------------------------
+    def start_indicator(self, key, view):
+        self.indicators[key] = view
+        self.draw_indicators()
+        if not self.tick_scheduled:
+            self.tick_scheduled = True
+            sublime.set_timeout(self.tick, self.tick_interval)
+
+    def stop_indicator(self, key):
+        view = self.indicators.pop(key, None)
+        if view is None:
+            return
+        if not any(other_view.id() == view.id() for other_view in self.indicators.values()):
+            view.erase_status('glue_status_indicator')
+            sublime.status_message('Glue: Command completed.')
+        else:
+            self.draw_indicators()
+
+    def tick(self):
+        if len(self.indicators) == 0:
+            self.tick_scheduled = False
+            return
+        self.tick_count += 1
+        self.draw_indicators()
+        sublime.set_timeout(self.tick, self.tick_interval)
+
+    def draw_indicators(self):
+        position = self.tick_count % 14
+        before = position if position < 8 else 14 - position # bounce between the brackets
+        after = 7 - before
+        views = {}
+        for view in self.indicators.values():
+            views.setdefault(view.id(), [view, 0])[1] += 1
+        for view, count in views.values():
+            if count > 1:
+                running_string = 'Running ' + str(count) + ' commands'
+            else:
+                running_string = 'Running command'
+            view.set_status('glue_status_indicator', 'Glue: %s [%s|%s]' % (running_string, ' ' * before, ' ' * after))
+
+# shared by all Glue commands
+scheduler = Scheduler()
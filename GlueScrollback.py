@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import sublime
+import os
+import re
+import threading
+from collections import deque
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileWriter
+else:
+    from GlueIO import FileWriter
+
+#------------------------------------------------------------------------------
+# [ ScrollbackTrimmer class ] - keeps a Glue terminal view under the scrollback limits
+#   trims whole prompt/output blocks from the top of the view in the edit that appends new text
+#------------------------------------------------------------------------------
+class ScrollbackTrimmer:
+    def __init__(self, settings):
+        self.max_lines = settings.get('glue_scrollback_lines', 0) # 0 = unlimited
+        self.max_chars = settings.get('glue_scrollback_chars', 0) # 0 = unlimited
+        self.archive = settings.get('glue_scrollback_archive', False)
+        self.block_pattern = '^' + re.escape(settings.get('glue_ps1') + ' ')
+
+    def is_enabled(self):
+        return self.max_lines > 0 or self.max_chars > 0
+
+    #------------------------------------------------------------------------------
+    # [ trim method ] - erase the oldest blocks when a limit is exceeded, returns number of chars removed
+    #------------------------------------------------------------------------------
+    def trim(self, view, edit):
+        if not self.is_enabled():
+            return 0
+        size = view.size()
+        cut_point = 0
+        if self.max_chars > 0 and size > self.max_chars:
+            cut_point = size - self.max_chars
+        if self.max_lines > 0:
+            line_count = view.rowcol(size)[0] + 1
+            if line_count > self.max_lines:
+                cut_point = max(cut_point, view.text_point(line_count - self.max_lines, 0))
+        if cut_point == 0:
+            return 0
+        # cut at the start of the first prompt block that begins at or after the cut point, fall back to the
+        # next line boundary when that would erase everything but the newest block (it alone exceeds the limit)
+        block_region = view.find(self.block_pattern, cut_point)
+        if self.is_found(block_region) and self.is_found(view.find(self.block_pattern, block_region.end())):
+            cut_point = block_region.begin()
+        else:
+            cut_point = view.full_line(cut_point).end()
+        trim_region = sublime.Region(0, cut_point)
+        if self.archive:
+            self.archive_text(view, view.substr(trim_region))
+        view.erase(edit, trim_region)
+        return cut_point
+
+    # ST2 returns None, ST3 returns an empty Region(-1, -1) when there is no match
+    def is_found(self, region):
+        return region is not None and region.begin() >= 0
+
+    #------------------------------------------------------------------------------
+    # [ archive_text method ] - append trimmed text to a <file>.glue-archive file beside the terminal file
+    #------------------------------------------------------------------------------
+    def archive_text(self, view, text):
+        file_path = view.file_name()
+        if file_path: # unsaved terminal buffers have nowhere to archive to
+            archive_writer.append(os.path.splitext(file_path)[0] + '.glue-archive', text)
+
+#------------------------------------------------------------------------------
+# [ ArchiveWriter class ] - appends trimmed text to the archive files in a background thread
+#   trim() runs inside the edit of GlueFlushCommand on the UI thread, the appends are queued
+#   so that a slow disk does not hold up the redraw.  One worker keeps them in order.
+#------------------------------------------------------------------------------
+class ArchiveWriter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = deque() # (file path, text)
+        self.worker = None
+
+    def append(self, file_path, text):
+        with self.lock:
+            self.queue.append((file_path, text))
+            if self.worker is not None:
+                return
+            self.worker = threading.Thread(target=self.work)
+            self.worker.daemon = True
+        self.worker.start()
+
+    def work(self):
+        while True:
+            with self.lock:
+                if len(self.queue) == 0:
+                    self.worker = None
+                    return
+                file_path, text = self.queue.popleft()
+            try:
+                FileWriter(file_path).append_utf8(text)
+            except (IOError, OSError):
+                pass # the text is lost from the archive, the view is trimmed either way
+
+# shared by all Glue views
+archive_writer = ArchiveWriter()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import re
+import json
+import time
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileReader, FileWriter, MappedFile, AtomicWriter
+else:
+    from GlueIO import FileReader, FileWriter, MappedFile, AtomicWriter
+
+trigram_bits = 65536 # size of the trigram bitmap of one record
+regex_chars = '.^$*+?{}[]\\|()'
+quantifier_re = re.compile(r'\{(?:\d+|\d*,\d*)\}') # {m} {m,} {m,n} {,n}, {} is not a quantifier
+
+#------------------------------------------------------------------------------
+# [ OutputRecord class ] - the output of one command with its command, working directory, time and exit status
+#   the output is written to its own file as it arrives, a trigram bitmap of the output is
+#   built in the background when the command finishes
+#------------------------------------------------------------------------------
+class OutputRecord:
+    def __init__(self, record_id, command, cwd, start_time, exitcode=None, size=0):
+        self.record_id = record_id
+        self.command = command
+        self.cwd = cwd
+        self.start_time = start_time
+        self.exitcode = exitcode # None while the command runs
+        self.size = size # bytes in the output file
+        self.bitmap = None # bytearray, loaded or built on demand
+        self.file = None
+
+    def to_dict(self):
+        return {'id': self.record_id, 'c': self.command, 'd': self.cwd, 't': self.start_time, 'x': self.exitcode, 's': self.size}
+
+#------------------------------------------------------------------------------
+# [ RecordWriter class ] - receives the decoded output of a running command
+#   record is None when output is not recorded
+#------------------------------------------------------------------------------
+class RecordWriter:
+    def __init__(self, index, record):
+        self.index = index
+        self.record = record
+
+    def write(self, text):
+        if text and self.record is not None and self.record.file is not None:
+            try:
+                data = text.encode('utf-8')
+                self.record.file.write(data)
+                self.record.size += len(data)
+            except (IOError, OSError):
+                self.record.file.close()
+                self.record.file = None # the command continues without a record
+
+    def close(self, exitcode):
+        if self.record is not None:
+            self.index.finish(self.record, exitcode)
+
+#------------------------------------------------------------------------------
+# [ OutputIndex class ] - searchable store of the output of past commands
+#   outputs/<id>.txt   the output of a command (utf-8)
+#   outputs/<id>.idx   the trigram bitmap of the lower case output
+#   outputs/records.jsonl   one line per finished record, records that were removed are dropped when the file is rewritten
+#   a search only reads the records whose bitmap contains every trigram of the literal parts of the pattern
+#------------------------------------------------------------------------------
+class OutputIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.store_dir = None
+        self.max_bytes = 0 # 0 = do not record output
+        self.max_records = 1000
+        self.records = [] # OutputRecord, oldest first
+        self.next_id = 1
+        self.file_entries = 0 # lines in records.jsonl
+        self.loaded = False
+        self.queue = [] # records that need a bitmap
+        self.worker = None
+
+    def configure(self, store_dir, max_bytes, max_records):
+        with self.lock:
+            self.store_dir = store_dir
+            self.max_bytes = max_bytes
+            self.max_records = max_records
+            self.loaded = False
+
+    def is_enabled(self):
+        return self.store_dir is not None and self.max_bytes > 0
+
+    #------------------------------------------------------------------------------
+    # [ load method ] - read the record list, run from a background thread on plugin load
+    #------------------------------------------------------------------------------
+    def load(self):
+        with self.lock:
+            self.load_records()
+
+    # call with self.lock held
+    def load_records(self):
+        if self.loaded or not self.is_enabled():
+            return
+        self.loaded = True
+        records = {}
+        lines = 0
+        records_path = os.path.join(self.store_dir, 'records.jsonl')
+        if os.path.isfile(records_path):
+            for entry in FileReader(records_path).iter_records(): # skips a line that was cut off when ST closed
+                lines += 1
+                try:
+                    if entry.get('removed'):
+                        records.pop(entry['id'], None)
+                    else:
+                        records[entry['id']] = OutputRecord(entry['id'], entry['c'], entry['d'], entry['t'], entry['x'], entry['s'])
+                except (AttributeError, KeyError, TypeError):
+                    pass
+        self.records = [records[record_id] for record_id in sorted(records) if os.path.isfile(self.get_path(record_id, '.txt'))]
+        self.file_entries = lines
+        if len(records) > 0:
+            self.next_id = max(self.next_id, max(records) + 1)
+        for record in self.records:
+            if not os.path.isfile(self.get_path(record.record_id, '.idx')):
+                self.queue.append(record)
+        self.remove_old_records()
+        self.start_worker()
+
+    def get_path(self, record_id, extension):
+        return os.path.join(self.store_dir, str(record_id) + extension)
+
+    #------------------------------------------------------------------------------
+    # [ create_writer method ] - returns a RecordWriter for the output of a command that is starting
+    #------------------------------------------------------------------------------
+    def create_writer(self, command, cwd):
+        with self.lock:
+            if not self.is_enabled():
+                return RecordWriter(self, None)
+            self.load_records()
+            record = OutputRecord(self.next_id, command, cwd, time.time())
+            self.next_id += 1
+            try:
+                if not os.path.isdir(self.store_dir):
+                    os.makedirs(self.store_dir)
+                record.file = open(self.get_path(record.record_id, '.txt'), 'wb')
+            except (IOError, OSError):
+                return RecordWriter(self, None)
+        return RecordWriter(self, record)
+
+    # adds a finished command output in one call (commands that are not streamed)
+    def add(self, command, cwd, exitcode, text):
+        writer = self.create_writer(command, cwd)
+        writer.write(text)
+        writer.close(exitcode)
+
+    def finish(self, record, exitcode):
+        if record.file is None:
+            return
+        record.file.close()
+        record.file = None
+        record.exitcode = exitcode
+        line = json.dumps(record.to_dict()) + '\n'
+        with self.lock:
+            self.records.append(record)
+            self.queue.append(record)
+            self.append_line(line)
+            self.remove_old_records()
+            self.start_worker()
+
+    # call with self.lock held
+    def append_line(self, line):
+        try:
+            FileWriter(os.path.join(self.store_dir, 'records.jsonl')).append_utf8(line)
+            self.file_entries += 1
+        except (IOError, OSError):
+            pass
+
+    # call with self.lock held, removes the oldest records above the size budget
+    def remove_old_records(self):
+        total_size = sum(record.size for record in self.records)
+        removed = []
+        while len(self.records) > 1 and (total_size > self.max_bytes or len(self.records) > self.max_records):
+            record = self.records.pop(0)
+            total_size -= record.size
+            removed.append(record)
+        for record in removed:
+            if record in self.queue:
+                self.queue.remove(record)
+            for extension in ('.txt', '.idx'):
+                try:
+                    os.remove(self.get_path(record.record_id, extension))
+                except OSError:
+                    pass
+            self.append_line(json.dumps({'id': record.record_id, 'removed': True}) + '\n')
+        if self.file_entries > 2 * len(self.records) + 100:
+            self.rewrite_records()
+
+    # call with self.lock held
+    def rewrite_records(self):
+        try:
+            FileWriter(os.path.join(self.store_dir, 'records.jsonl')).write_lines(json.dumps(record.to_dict()) + '\n' for record in self.records)
+            self.file_entries = len(self.records)
+        except (IOError, OSError):
+            pass
+
+    #------------------------------------------------------------------------------
+    # [ bitmap worker ] - builds the trigram bitmaps of finished records in a background thread
+    #------------------------------------------------------------------------------
+    # call with self.lock held
+    def start_worker(self):
+        if self.worker is not None or len(self.queue) == 0:
+            return
+        self.worker = threading.Thread(target=self.work)
+        self.worker.daemon = True
+        self.worker.start()
+
+    def work(self):
+        while True:
+            with self.lock:
+                if len(self.queue) == 0:
+                    self.worker = None
+                    return
+                record = self.queue.pop(0)
+            self.build_bitmap(record)
+
+    def build_bitmap(self, record):
+        try:
+            with MappedFile(self.get_path(record.record_id, '.txt')) as mapped: # the output is not copied into memory
+                bitmap = make_bitmap(mapped)
+        except (IOError, OSError, ValueError):
+            return
+        try:
+            with AtomicWriter(self.get_path(record.record_id, '.idx'), binary=True, sync=False) as bitmap_file:
+                bitmap_file.write(bytes(bitmap))
+        except (IOError, OSError):
+            pass
+        record.bitmap = bitmap
+
+    def get_bitmap(self, record):
+        if record.bitmap is None:
+            try:
+                bitmap = bytearray(FileReader(self.get_path(record.record_id, '.idx')).read_bytes())
+                if len(bitmap) == trigram_bits // 8:
+                    record.bitmap = bitmap
+            except (IOError, OSError):
+                pass
+        return record.bitmap # None while the bitmap is not built, the record is then always read
+
+    #------------------------------------------------------------------------------
+    # [ search method ] - returns (record, [(line number, line text)]) for the records that match
+    #   the pattern (a regular expression), most recent first.  command_filter limits the search to
+    #   records whose command contains it.
+    #------------------------------------------------------------------------------
+    def search(self, pattern, ignore_case=False, command_filter=None, limit=200):
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(pattern, flags)
+        query_hashes = get_query_hashes(pattern, ignore_case)
+        with self.lock:
+            self.load_records()
+            records = list(reversed(self.records))
+        results = []
+        match_count = 0
+        for record in records:
+            if command_filter is not None and command_filter not in record.command:
+                continue
+            bitmap = self.get_bitmap(record)
+            if bitmap is not None and not all(bitmap[value >> 3] & (1 << (value & 7)) for value in query_hashes):
+                continue
+            lines = self.search_record(record, regex, limit - match_count)
+            if len(lines) > 0:
+                results.append((record, lines))
+                match_count += len(lines)
+                if match_count >= limit:
+                    break
+        return results
+
+    # returns up to limit (line number, line text) for the lines of the record output that match, each line once
+    def search_record(self, record, regex, limit):
+        text = self.read_output(record)
+        lines = []
+        position = 0
+        line_number = 1
+        while len(lines) < limit and position <= len(text):
+            match = regex.search(text, position)
+            if match is None:
+                break
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            line_number += text.count('\n', position, line_start)
+            line_end = text.find('\n', match.start())
+            if line_end == -1:
+                line_end = len(text)
+            lines.append((line_number, text[line_start:line_end]))
+            position = line_end + 1
+            line_number += 1
+        return lines
+
+    def read_output(self, record):
+        try:
+            return FileReader(self.get_path(record.record_id, '.txt')).read_bytes().decode('utf-8', 'replace')
+        except (IOError, OSError):
+            return ''
+
+    def get_record(self, record_id):
+        with self.lock:
+            self.load_records()
+            for record in self.records:
+                if record.record_id == record_id:
+                    return record
+        return None
+
+# shared by all GlueCommand instances
+output_index = OutputIndex()
+
+#------------------------------------------------------------------------------
+# [ trigram hashing ] - bit numbers of the trigrams of lower case utf-8 bytes
+#------------------------------------------------------------------------------
+def hash_trigram(a, b, c):
+    return ((a * 1031 + b) * 1031 + c) * 2654435761 % 4294967296 % trigram_bits
+
+def make_bitmap(data, chunk_size=262144):
+    bitmap = bytearray(trigram_bits // 8)
+    trigrams = set()
+    # in chunks so that other threads (the ST UI) run between them
+    for start in range(0, max(1, len(data) - 2), chunk_size):
+        chunk = bytearray(data[start:start + chunk_size + 2].lower())
+        trigrams.update(zip(chunk, chunk[1:], chunk[2:]))
+    for a, b, c in trigrams:
+        value = hash_trigram(a, b, c)
+        bitmap[value >> 3] |= 1 << (value & 7)
+    return bitmap
+
+# the bit numbers that every output with a match must have, an empty list if the pattern has no usable literal
+def get_query_hashes(pattern, ignore_case):
+    hashes = set()
+    for literal in get_literals(pattern):
+        data = literal.encode('utf-8')
+        if ignore_case and any(ord(char) > 127 for char in literal):
+            continue # the bitmap only folds the case of ascii characters
+        data = bytearray(data.lower())
+        for a, b, c in zip(data, data[1:], data[2:]):
+            hashes.add(hash_trigram(a, b, c))
+    return hashes
+
+#------------------------------------------------------------------------------
+# [ get_literals function ] - the literal runs of a regular expression that every match contains
+#   patterns with alternation or groups, and patterns that this parser does not understand
+#   (numeric escapes, unclosed classes, braces that are not a quantifier) return no literals
+#------------------------------------------------------------------------------
+def get_literals(pattern):
+    if '|' in pattern or '(' in pattern:
+        return []
+    literals = []
+    run = ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 == len(pattern) or pattern[i + 1] in 'xuUN0123456789':
+                return [] # \x41 \u00e9 \N{...} and octal escapes are followed by more characters
+            if pattern[i + 1].isalnum():
+                literals.append(run) # \d \w \b ...
+                run = ''
+            else:
+                run += pattern[i + 1]
+            i += 2
+            continue
+        if char == '[':
+            literals.append(run)
+            run = ''
+            start = i + 1
+            if pattern.startswith('^', start):
+                start += 1
+            end = pattern.find(']', start + 1) # a ] right after [ or [^ is part of the class
+            if end == -1 or '\\' in pattern[start:end]:
+                return []
+            i = end + 1
+            continue
+        if char == '{':
+            quantifier = quantifier_re.match(pattern, i)
+            if quantifier is None:
+                return [] # Python reads braces that are not a quantifier literally
+            literals.append(run[:-1]) # the previous character may occur zero times
+            run = ''
+            i = quantifier.end()
+            continue
+        if char in '*?':
+            literals.append(run[:-1]) # the previous character is optional
+            run = ''
+        elif char in regex_chars:
+            literals.append(run)
+            run = ''
+        else:
+            run += char
+        i += 1
+    literals.append(run)
+    return [literal for literal in literals if len(literal) >= 3]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import signal
+import subprocess
+import threading
+import uuid
+from sys import version_info
+
+#------------------------------------------------------------------------------
+# [ ShellSession class ] - one long-lived shell process that runs the commands of a Glue terminal view
+#   commands are written to the stdin of the shell, each one is followed by a printf of a marker
+#   that is unique to the session with the exit status and working directory of the command:
+#       <marker>:<exit status>:<working directory>
+#   exported variables, aliases, functions and cd are kept between commands
+#------------------------------------------------------------------------------
+class ShellSession:
+    def __init__(self, shellpath, env=None, chunk_size=65536):
+        self.shellpath = shellpath
+        self.env = env
+        self.chunk_size = chunk_size
+        self.marker = ('__glue_done_' + uuid.uuid4().hex).encode('ascii')
+        self.lock = threading.Lock() # one command at a time
+        self.process = None
+        self.pid = None
+        self.pwd = None # working directory of the shell after the last command
+        self.leftover = b'' # output that arrived after the marker (background processes of the shell)
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        # the shell gets its own process group so that kill() also stops the command that it runs
+        if version_info[0] == 3:
+            session_args = {'start_new_session': True} # setsid in the child without running Python code between fork and exec
+        else:
+            session_args = {'preexec_fn': os.setsid}
+        self.process = subprocess.Popen([self.shellpath], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, env=self.env, bufsize=0, **session_args)
+        self.pid = self.process.pid
+        self.pwd = None
+        self.leftover = b''
+        if os.path.basename(self.shellpath) == 'bash':
+            self.write('shopt -s expand_aliases\n') # bash only expands aliases in interactive shells by default
+
+    def write(self, text):
+        self.process.stdin.write(text.encode('utf-8'))
+        self.process.stdin.flush()
+
+    #------------------------------------------------------------------------------
+    # [ run method ] - run the command in the session, output bytes are passed to on_output as they arrive
+    #   returns (exit status, working directory), the working directory is None if the shell exited
+    #------------------------------------------------------------------------------
+    def run(self, command, cwd, on_output):
+        with self.lock:
+            if not self.is_alive():
+                self.start()
+            script = ''
+            if cwd != self.pwd:
+                script += 'cd -- ' + quote(cwd) + ' 2>/dev/null; '
+            # eval keeps an unbalanced command from swallowing the marker, commands do not read the session stdin
+            script += 'eval ' + quote(command) + ' </dev/null 2>&1; '
+            script += "printf '%s:%d:%s\\n' " + quote(self.marker.decode('ascii')) + ' "$?" "$PWD"\n'
+            try:
+                self.write(script)
+            except (IOError, OSError):
+                self.start() # the shell exited since the last command
+                self.write(script)
+            return self.read_output(on_output)
+
+    # call with self.lock held
+    def read_output(self, on_output):
+        pending = self.leftover
+        self.leftover = b''
+        fd = self.process.stdout.fileno()
+        while True:
+            marker_index = pending.find(self.marker)
+            if marker_index == -1:
+                # pass on everything except a possible partial marker at the end
+                safe_size = len(pending) - len(self.marker) + 1
+                if safe_size > 0:
+                    on_output(pending[:safe_size])
+                    pending = pending[safe_size:]
+            else:
+                if marker_index > 0:
+                    on_output(pending[:marker_index])
+                    pending = pending[marker_index:]
+                newline_index = pending.find(b'\n')
+                if newline_index != -1:
+                    status = pending[len(self.marker) + 1:newline_index].decode('utf-8', 'replace').split(':', 1)
+                    self.leftover = pending[newline_index + 1:]
+                    self.pwd = status[1]
+                    return int(status[0]), self.pwd
+            chunk = os.read(fd, self.chunk_size)
+            if not chunk:
+                # the shell exited (exit in the command, killed, or a syntax error in sh)
+                if pending:
+                    on_output(pending)
+                exitcode = self.process.wait()
+                self.close()
+                return exitcode, None
+            pending += chunk
+
+    def kill(self):
+        if self.is_alive():
+            try:
+                os.killpg(self.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def close(self):
+        if self.process is None:
+            return
+        if self.is_alive():
+            try:
+                self.process.stdin.close()
+            except (IOError, OSError):
+                pass
+            self.kill()
+        self.process.stdout.close()
+        self.process.wait()
+        self.process = None
+
+# single quoted for POSIX shells
+def quote(text):
+    return "'" + text.replace("'", "'\\''") + "'"
+
+sessions = {} # view id -> ShellSession
+
+#------------------------------------------------------------------------------
+# [ get_session function ] - returns the shell session of a Glue terminal view, started on first use
+#------------------------------------------------------------------------------
+def get_session(view_id, shellpath, env=None):
+    if view_id not in sessions or sessions[view_id].shellpath != shellpath:
+        close_session(view_id)
+        sessions[view_id] = ShellSession(shellpath, env)
+    return sessions[view_id]
+
+def close_session(view_id):
+    session = sessions.pop(view_id, None)
+    if session is not None:
+        session.close()
@@ -8,15 +8,17 @@ from sys import version_info
 
 if version_info[0] == 3:
     from .GlueIO import FileWriter
+    from .GlueTranscript import transcript_registry
 else:
     from GlueIO import FileWriter
+    from GlueTranscript import transcript_registry
 
 class GlueSidebarOpenerCommand(sublime_plugin.WindowCommand):
     def run(self, paths=[]):
         path = paths[0] # only use the first of the paths in the passed argument (prevents multiple terminals from opening)
         if os.path.exists(path) and os.path.isfile(path) and path.endswith('.glue'):
-            self.erase_existing_glue_file(path) # clear the terminal text in .glue files
-            self.open_the_file(path)
+            self.restore_glue_file(path) # the terminal text is the end of the transcript
+            self.go_to_end(self.open_the_file(path))
             self.window.active_view().run_command('glue')
         elif os.path.exists(path) and os.path.isfile(path):
             file_path = os.path.join(os.path.dirname(path), 'terminal.glue')
@@ -30,8 +32,8 @@ class GlueSidebarOpenerCommand(sublime_plugin.WindowCommand):
             if len(glue_filenames) > 0:
                 path = os.path.join(path, glue_filenames[0])
                 if path.endswith('.glue'):
-                    self.erase_existing_glue_file(path) # clear the terminal text in .glue files
-                self.open_the_file(path)
+                    self.restore_glue_file(path) # the terminal text is the end of the transcript
+                self.go_to_end(self.open_the_file(path))
                 self.window.active_view().run_command('glue')
             else:
                 # write a terminal.glue file in the selected directory
@@ -48,15 +50,26 @@ class GlueSidebarOpenerCommand(sublime_plugin.WindowCommand):
         view = window.open_file(path)
         # window.set_view_index(view, view_index[0], view_index[1])
         sublime.active_window().focus_view(view)
+        return view
 
-    def go_to_end(self):
-        line, row = self.window.active_view().rowcol(self.window.active_view().size())
-        pt = self.window.active_view().text_point(line, 0)
-        self.window.active_view().sel().clear()
-        self.window.active_view().sel().add(sublime.Region(pt))
-        self.window.active_view().show(pt)
+    # Glue writes at the cursor, new output follows the restored text
+    def go_to_end(self, view):
+        if view.is_loading():
+            sublime.set_timeout(lambda: self.go_to_end(view), 50)
+            return
+        pt = view.size()
+        view.sel().clear()
+        view.sel().add(sublime.Region(pt))
+        view.show(pt)
 
-    def erase_existing_glue_file(self, file_path):
-        FileWriter(file_path).write_utf8(' ')
+    #------------------------------------------------------------------------------
+    # [ restore_glue_file method ] - replace the text of a .glue file with the newest blocks of its transcript
+    #   the older blocks stay in the transcript, the file is cleared when there is no transcript
+    #------------------------------------------------------------------------------
+    def restore_glue_file(self, file_path):
+        block_count = sublime.load_settings('Glue.sublime-settings').get('glue_transcript_blocks', 20)
+        transcript = transcript_registry.get(file_path)
+        text = transcript.read_blocks(block_count) if transcript is not None else ''
+        FileWriter(file_path).write_utf8(text if len(text) > 0 else ' ')
 
 
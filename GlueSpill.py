@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import io
+import threading
+from collections import deque
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import MappedFile
+else:
+    from GlueIO import MappedFile
+
+#------------------------------------------------------------------------------
+# [ SpillFile class ] - command output that is written to disk instead of the Glue view
+#------------------------------------------------------------------------------
+class SpillFile:
+    def __init__(self, spill_id, file_path, tail_chars):
+        self.spill_id = spill_id
+        self.file_path = file_path
+        self.file = io.open(file_path, mode='w', encoding='utf-8', newline='')
+        self.size = 0
+        self.line_count = 0
+        self.tail = deque()
+        self.tail_size = 0
+        self.tail_chars = tail_chars
+
+    def write(self, text):
+        self.file.write(text)
+        self.size += len(text)
+        self.line_count += text.count('\n')
+        self.tail.append(text)
+        self.tail_size += len(text)
+        while self.tail_size - len(self.tail[0]) >= self.tail_chars:
+            self.tail_size -= len(self.tail.popleft())
+
+    def close(self):
+        self.file.close()
+
+    #------------------------------------------------------------------------------
+    # [ get_tail method ] - returns the complete lines in the last tail_chars characters of the output
+    #------------------------------------------------------------------------------
+    def get_tail(self):
+        tail = ''.join(self.tail)[-self.tail_chars:]
+        if self.size > len(tail) and '\n' in tail:
+            tail = tail[tail.index('\n') + 1:] # drop the partial first line
+        return tail
+
+#------------------------------------------------------------------------------
+# [ SpillRegistry class ] - numbers the spill files of the session and removes the oldest ones
+#------------------------------------------------------------------------------
+class SpillRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spill_dir = None
+        self.max_files = 20
+        self.next_id = 1
+        self.file_paths = {} # spill id -> file path
+
+    def configure(self, spill_dir, max_files):
+        with self.lock:
+            self.spill_dir = spill_dir
+            self.max_files = max_files
+
+    #------------------------------------------------------------------------------
+    # [ clear method ] - remove the spill files of earlier sessions
+    #------------------------------------------------------------------------------
+    def clear(self):
+        with self.lock:
+            if self.spill_dir is None or not os.path.isdir(self.spill_dir):
+                return
+            for name in os.listdir(self.spill_dir):
+                if name.endswith('.txt'):
+                    try:
+                        os.remove(os.path.join(self.spill_dir, name))
+                    except OSError:
+                        pass
+
+    def create(self, tail_chars):
+        with self.lock:
+            if not os.path.isdir(self.spill_dir):
+                os.makedirs(self.spill_dir)
+            spill_id = self.next_id
+            self.next_id += 1
+            file_path = os.path.join(self.spill_dir, str(spill_id) + '.txt')
+            self.file_paths[spill_id] = file_path
+            for old_id in sorted(self.file_paths)[:max(0, len(self.file_paths) - self.max_files)]:
+                try:
+                    os.remove(self.file_paths.pop(old_id))
+                except OSError:
+                    pass
+        return SpillFile(spill_id, file_path, tail_chars)
+
+    def get_path(self, spill_id):
+        with self.lock:
+            return self.file_paths.get(spill_id)
+
+# shared by all GlueCommand instances
+spill_registry = SpillRegistry()
+
+#------------------------------------------------------------------------------
+# [ OutputSpiller class ] - passes command output to the sink until it exceeds the threshold,
+#   then writes all of it (including the part already passed on) to a spill file and passes
+#   on only a notice and, when the command finishes, the tail of the output
+#------------------------------------------------------------------------------
+class OutputSpiller:
+    def __init__(self, sink, threshold, tail_chars):
+        self.sink = sink # callable that receives text for the view
+        self.threshold = threshold # 0 = never spill
+        self.tail_chars = tail_chars
+        self.head = [] # output passed to the sink, kept until the threshold is reached
+        self.size = 0
+        self.spill = None
+
+    def feed(self, text):
+        if not text:
+            return
+        if self.spill is not None:
+            self.spill.write(text)
+        elif self.threshold == 0 or self.size + len(text) <= self.threshold:
+            self.size += len(text)
+            if self.threshold > 0:
+                self.head.append(text)
+            self.sink(text)
+        else:
+            # the part of this text that still fits goes to the sink, a first chunk larger than the threshold has a head too
+            head_size = self.threshold - self.size
+            if head_size > 0:
+                self.head.append(text[:head_size])
+                self.sink(text[:head_size])
+                self.size += head_size
+            self.spill = spill_registry.create(self.tail_chars)
+            for head_text in self.head:
+                self.spill.write(head_text)
+            self.head = []
+            self.spill.write(text[max(0, head_size):])
+            spill_msg = "\n[ Glue: the output is larger than " + str(self.threshold) + " characters and is written to " + self.spill.file_path + " ]\n"
+            self.sink(spill_msg)
+
+    def close(self):
+        if self.spill is None:
+            return
+        self.spill.close()
+        self.sink("[ Glue: ... last lines of the output ... ]\n" + self.spill.get_tail())
+        summary_msg = "\n[ Glue: " + str(self.spill.line_count) + " lines (" + str(self.spill.size) + " characters) in " + self.spill.file_path
+        summary_msg += " - use 'glue page " + str(self.spill.spill_id) + "' to view them ]\n"
+        self.sink(summary_msg)
+
+#------------------------------------------------------------------------------
+# [ PagedReader class ] - reads a large file one page at a time through a memory map
+#   pages end at line boundaries so that lines are not split between pages
+#------------------------------------------------------------------------------
+class PagedReader:
+    def __init__(self, file_path, page_size=1048576):
+        self.file_path = file_path
+        self.page_size = page_size
+
+    def get_page_count(self):
+        size = os.path.getsize(self.file_path)
+        return max(1, (size + self.page_size - 1) // self.page_size)
+
+    #------------------------------------------------------------------------------
+    # [ read_page method ] - returns the decoded text of page number page (1-based)
+    #------------------------------------------------------------------------------
+    def read_page(self, page):
+        with MappedFile(self.file_path) as mapped:
+            size = len(mapped)
+            start = self.line_start((page - 1) * self.page_size, mapped, size)
+            end = self.line_start(page * self.page_size, mapped, size)
+            return mapped[start:end].decode('utf-8', 'replace')
+
+    # first line start at or after offset, the offset itself if no line starts in the page that begins there
+    # (a line that is longer than a page is split between pages at a character boundary)
+    def line_start(self, offset, mapped, size):
+        if offset <= 0:
+            return 0
+        if offset >= size:
+            return size
+        newline = mapped.find(b'\n', offset - 1, offset + self.page_size - 1)
+        if newline != -1:
+            return newline + 1
+        while offset > 0 and bytearray(mapped[offset:offset + 1])[0] & 0xC0 == 0x80:
+            offset -= 1 # utf-8 continuation byte
+        return offset
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import re
+import threading
+import codecs
+from collections import deque
+
+try:
+    import selectors # Py3.4+
+except ImportError:
+    selectors = None
+
+try:
+    import select
+except ImportError:
+    select = None
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+#------------------------------------------------------------------------------
+# [ OutputStream class ] - bounded text buffer shared by a reader thread and the UI thread
+#   the reader thread blocks in feed() when the buffer is full so that memory use
+#   does not grow with the size of the command output.  In discard mode (background jobs
+#   that nobody is reading) the oldest text is dropped instead of blocking the reader.
+#   The listener is called from the reader thread when text arrives in an empty buffer
+#   and when the stream is closed.
+#------------------------------------------------------------------------------
+class OutputStream:
+    def __init__(self, max_pending=1048576, discard=False):
+        self.max_pending = max_pending
+        self.discard = discard
+        self.dropped = 0 # number of characters dropped in discard mode
+        self.pending = deque()
+        self.pending_size = 0
+        self.closed = False
+        self.exitcode = None
+        self.listener = None
+        self.cond = threading.Condition()
+
+    def set_listener(self, listener):
+        with self.cond:
+            self.listener = listener
+
+    def feed(self, text):
+        if not text:
+            return
+        with self.cond:
+            while self.pending_size >= self.max_pending and not self.closed and not self.discard:
+                self.cond.wait(0.1)
+            was_empty = self.pending_size == 0
+            self.pending.append(text)
+            self.pending_size += len(text)
+            if self.discard:
+                self.drop_oldest()
+            listener = self.listener
+        if was_empty and listener is not None:
+            listener()
+
+    # call with self.cond held
+    def drop_oldest(self):
+        while self.pending_size > self.max_pending:
+            excess = self.pending_size - self.max_pending
+            oldest = self.pending[0]
+            if len(oldest) <= excess:
+                self.pending.popleft()
+                self.pending_size -= len(oldest)
+                self.dropped += len(oldest)
+            else:
+                self.pending[0] = oldest[excess:]
+                self.pending_size -= excess
+                self.dropped += excess
+
+    #------------------------------------------------------------------------------
+    # [ set_discard method ] - switch between discard (background) and blocking (foreground) modes
+    #------------------------------------------------------------------------------
+    def set_discard(self, discard):
+        with self.cond:
+            self.discard = discard
+            if discard:
+                self.drop_oldest()
+            self.cond.notify_all()
+
+    def drain(self):
+        with self.cond:
+            if not self.pending:
+                return ''
+            text = ''.join(self.pending)
+            self.pending = deque()
+            self.pending_size = 0
+            self.cond.notify_all()
+        return text
+
+    def close(self, exitcode):
+        with self.cond:
+            self.exitcode = exitcode
+            self.closed = True
+            self.cond.notify_all()
+            listener = self.listener
+        if listener is not None:
+            listener()
+
+    def is_closed(self):
+        with self.cond:
+            return self.closed
+
+    def is_done(self):
+        with self.cond:
+            return self.closed and not self.pending
+
+#------------------------------------------------------------------------------
+# [ iter_process_output generator ] - yield (name, bytes) chunks from the stdout and stderr pipes of a process
+#   uses a non-blocking selector loop where the platform supports it on pipes, reader threads otherwise
+#------------------------------------------------------------------------------
+def iter_process_output(process, chunk_size=65536):
+    pipes = {}
+    if process.stdout is not None:
+        pipes[process.stdout.fileno()] = 'stdout'
+    if process.stderr is not None:
+        pipes[process.stderr.fileno()] = 'stderr'
+    if os.name == 'nt' or (selectors is None and select is None):
+        return _iter_threaded(pipes, chunk_size)
+    elif selectors is not None:
+        return _iter_selectors(pipes, chunk_size)
+    else:
+        return _iter_select(pipes, chunk_size)
+
+def _iter_selectors(pipes, chunk_size):
+    selector = selectors.DefaultSelector()
+    try:
+        for fd in pipes:
+            selector.register(fd, selectors.EVENT_READ)
+        open_fds = len(pipes)
+        while open_fds:
+            for key, event in selector.select():
+                chunk = os.read(key.fd, chunk_size)
+                if chunk:
+                    yield pipes[key.fd], chunk
+                else:
+                    selector.unregister(key.fd)
+                    open_fds -= 1
+    finally:
+        selector.close()
+
+def _iter_select(pipes, chunk_size):
+    open_fds = list(pipes)
+    while open_fds:
+        readable = select.select(open_fds, [], [])[0]
+        for fd in readable:
+            chunk = os.read(fd, chunk_size)
+            if chunk:
+                yield pipes[fd], chunk
+            else:
+                open_fds.remove(fd)
+
+def _iter_threaded(pipes, chunk_size):
+    chunk_queue = queue.Queue(maxsize=16) # bounded so that the reader threads block when the consumer falls behind
+
+    def reader(fd, name):
+        try:
+            while True:
+                chunk = os.read(fd, chunk_size)
+                if not chunk:
+                    break
+                chunk_queue.put((name, chunk))
+        finally:
+            chunk_queue.put((name, None))
+
+    for fd, name in pipes.items():
+        t = threading.Thread(target=reader, args=(fd, name))
+        t.daemon = True
+        t.start()
+    open_fds = len(pipes)
+    while open_fds:
+        name, chunk = chunk_queue.get()
+        if chunk is None:
+            open_fds -= 1
+        else:
+            yield name, chunk
+
+#------------------------------------------------------------------------------
+# [ get_codec function ] - returns (encoding, errors), falls back to utf-8 / replace for unknown names
+#------------------------------------------------------------------------------
+def get_codec(encoding, errors):
+    try:
+        codecs.lookup(encoding)
+    except (LookupError, TypeError):
+        encoding = 'utf-8'
+    try:
+        codecs.lookup_error(errors)
+    except (LookupError, TypeError):
+        errors = 'replace'
+    return encoding, errors
+
+newline_re = re.compile(u'\r\n?')
+crlf_re = re.compile(u'\r\n')
+# colour and style codes (SGR), most escape sequences in command output are these.  This pattern has no
+# alternatives, re.sub with it is cheaper per match than with ansi_re, which then only runs if an ESC is left
+sgr_re = re.compile(u'\x1b\\[[0-9;]*m')
+# complete escape sequences: CSI (colours, cursor movement, erase), OSC (window title) ended by BEL or ST, two and three character escapes
+ansi_re = re.compile(u'\x1b\\[[0-?]*[ -/]*[@-~]|\x1b(?:\\][^\x07\x1b]*(?:\x07|\x1b\\\\)|[()*+][ -~]|[ -/]*[0-~])') # CSI first, it is the most common
+# the start of an escape sequence that is cut off at the end of a chunk
+ansi_partial_re = re.compile(u'\x1b(?:\\[[0-?]*[ -/]*|\\][^\x07\x1b]*\x1b?|[()*+]|[ -/]*)?\\Z')
+ansi_max_partial = 4096 # longer unfinished sequences are passed on
+overwritten_line_re = re.compile(u'[^\n]*\r[^\n]*')
+
+#------------------------------------------------------------------------------
+# [ StreamDecoder class ] - incremental decoding, one decoder per pipe so that multi-byte
+#   characters split across chunks (or interleaved with the other pipe) decode correctly.
+#   CRLF is replaced with LF in the same pass, a CR at the end of a chunk is held back until
+#   the next chunk shows whether it is followed by LF.
+#   strip_ansi removes ANSI escape sequences (colours, cursor codes), a sequence that is cut off
+#   at the end of a chunk is held back until the rest arrives.
+#   overwrite_lines keeps the text after the last CR of a line, like a terminal shows a progress
+#   bar when it is done.  A line with a CR is held back until its LF arrives, the text before its
+#   last CR is dropped as it arrives.  Without overwrite_lines a CR is a line break.
+#------------------------------------------------------------------------------
+class StreamDecoder:
+    def __init__(self, encoding='utf-8', errors='replace', strip_ansi=False, overwrite_lines=False):
+        self.encoding, self.errors = get_codec(encoding, errors)
+        self.strip_ansi = strip_ansi
+        self.overwrite_lines = overwrite_lines
+        self.decoders = {}
+        self.pending_cr = {} # pipe name -> True if the last chunk ended with CR
+        self.pending_ansi = {} # pipe name -> unfinished escape sequence at the end of the last chunk
+        self.pending_line = {} # pipe name -> CR + the last part of an unfinished line with a CR
+
+    def decode(self, name, chunk):
+        if name not in self.decoders:
+            self.decoders[name] = codecs.getincrementaldecoder(self.encoding)(errors=self.errors)
+        text = self.decoders[name].decode(chunk)
+        if not text:
+            return text
+        return self.clean(name, text, False)
+
+    def flush(self):
+        tail = []
+        for name in self.decoders:
+            text = self.decoders[name].decode(b'', final=True)
+            tail.append(self.clean(name, text, True))
+        return u''.join(tail)
+
+    # escape sequences, line endings and overwritten lines, final=True at the end of the output
+    def clean(self, name, text, final):
+        if self.strip_ansi:
+            text = self.pending_ansi.pop(name, u'') + text
+            if u'\x1b' in text:
+                if len(text) - text.rfind(u'\x1b') < ansi_max_partial:
+                    partial = ansi_partial_re.search(text, max(0, len(text) - ansi_max_partial))
+                    if partial is not None:
+                        if not final:
+                            self.pending_ansi[name] = text[partial.start():]
+                        text = text[:partial.start()]
+                text = sgr_re.sub(u'', text)
+                if u'\x1b' in text:
+                    text = ansi_re.sub(u'', text)
+        if not self.overwrite_lines:
+            if self.pending_cr.pop(name, False):
+                text = u'\r' + text
+            if not final and text.endswith(u'\r'):
+                self.pending_cr[name] = True
+                text = text[:-1]
+            return newline_re.sub(u'\n', text)
+        line = self.pending_line.pop(name, None)
+        if line is not None:
+            text = line + text
+        if u'\r' not in text:
+            return text
+        text = crlf_re.sub(u'\n', text)
+        line_start = text.rfind(u'\n') + 1
+        if not final and u'\r' in text[line_start:]:
+            # keep the last part of the line and a trailing CR, it may be followed by LF or overwritten
+            line = text[line_start:]
+            self.pending_line[name] = u'\r' + get_last_part(line) + (u'\r' if line.endswith(u'\r') else u'')
+            text = text[:line_start]
+        return overwritten_line_re.sub(lambda match: get_last_part(match.group(0)), text)
+
+# the text after the last CR of a line that is not empty
+def get_last_part(line):
+    for part in reversed(line.split(u'\r')):
+        if part:
+            return part
+    return u''
+
+#------------------------------------------------------------------------------
+# [ decode_output function ] - decode and normalize the complete output of a command
+#------------------------------------------------------------------------------
+def decode_output(data, encoding='utf-8', errors='replace', strip_ansi=False, overwrite_lines=False):
+    decoder = StreamDecoder(encoding, errors, strip_ansi, overwrite_lines)
+    return decoder.decode('output', data) + decoder.flush()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import json
+import time
+import hashlib
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileReader, FileWriter, MappedFile, AtomicWriter
+else:
+    from GlueIO import FileReader, FileWriter, MappedFile, AtomicWriter
+
+#------------------------------------------------------------------------------
+# [ Transcript class ] - append-only log of the text that was written to one .glue terminal file
+#   <key>.idx has a header line that names the data file, then one line per finished block:
+#       {"o": byte offset, "n": byte length, "t": time, "c": first line of the block}
+#   A block is a prompt line, the command and its output.  The text goes to the data file as it is
+#   written to the view, the block line is added when the command finishes.  Compaction writes the
+#   newest blocks to a new data file and then replaces the index, so the index always names a data
+#   file that matches its offsets.
+#------------------------------------------------------------------------------
+class Transcript:
+    def __init__(self, transcript_dir, key, max_bytes):
+        self.lock = threading.Lock()
+        self.transcript_dir = transcript_dir
+        self.key = key
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(transcript_dir, key + '.idx')
+        self.data_path = None
+        self.size = 0 # bytes in the data file
+        self.block_start = None # offset of the block that is being written, None between blocks
+        self.block_head = ''
+        self.compacting = False
+
+    # call with self.lock held
+    def open(self):
+        if self.data_path is not None:
+            return
+        data_name = read_data_name(self.index_path)
+        if data_name is None or not os.path.isfile(os.path.join(self.transcript_dir, data_name)):
+            if not os.path.isdir(self.transcript_dir):
+                os.makedirs(self.transcript_dir)
+            data_name = self.key + '-' + str(int(time.time() * 1000)) + '.log'
+            FileWriter(os.path.join(self.transcript_dir, data_name)).write_utf8('')
+            FileWriter(self.index_path).write_utf8(json.dumps({'data': data_name}) + '\n')
+        self.data_path = os.path.join(self.transcript_dir, data_name)
+        self.size = os.path.getsize(self.data_path)
+
+    #------------------------------------------------------------------------------
+    # [ append method ] - add text that was written to the view, end_block=True when the command finished
+    #------------------------------------------------------------------------------
+    def append(self, text, end_block=False):
+        compact = False
+        with self.lock:
+            try:
+                self.open()
+                if text:
+                    data = text.encode('utf-8')
+                    if self.block_start is None:
+                        self.block_start = self.size
+                        self.block_head = text.split('\n', 1)[0][:200]
+                    FileWriter(self.data_path).append_bytes(data)
+                    self.size += len(data)
+                if end_block and self.block_start is not None:
+                    block = {'o': self.block_start, 'n': self.size - self.block_start, 't': time.time(), 'c': self.block_head}
+                    FileWriter(self.index_path).append_utf8(json.dumps(block) + '\n')
+                    self.block_start = None
+                    compact = self.size > self.max_bytes + self.max_bytes // 2 and not self.compacting
+                    self.compacting = self.compacting or compact
+            except (IOError, OSError):
+                self.data_path = None # opened again with the next text
+                self.block_start = None
+        if compact:
+            compact_thread = threading.Thread(target=self.compact)
+            compact_thread.daemon = True
+            compact_thread.start()
+
+    #------------------------------------------------------------------------------
+    # [ read_blocks method ] - returns the text of the newest block_count finished blocks
+    #   only the end of the index is read, the blocks are sliced from a memory map of the data file
+    #------------------------------------------------------------------------------
+    def read_blocks(self, block_count):
+        with self.lock:
+            try:
+                self.open()
+                blocks = read_index_tail(self.index_path, block_count)
+                with MappedFile(self.data_path) as mapped:
+                    texts = [mapped[block['o']:block['o'] + block['n']] for block in blocks if block['o'] + block['n'] <= len(mapped)]
+            except (IOError, OSError):
+                return ''
+        return b''.join(texts).decode('utf-8', 'replace')
+
+    #------------------------------------------------------------------------------
+    # [ compact method ] - keep the newest blocks that fit in max_bytes (at least one), run in a background thread
+    #   the data file only grows, so the kept blocks are copied to the new data file without the lock.
+    #   The lock is taken at the end to copy the text that was written meanwhile and to swap the index.
+    #------------------------------------------------------------------------------
+    def compact(self):
+        data_file = None
+        try:
+            with self.lock:
+                self.open()
+                old_path = self.data_path
+                copied_size = self.size
+                index_size = os.path.getsize(self.index_path)
+                # the running block and everything after it is moved as one tail
+                tail_start = self.block_start if self.block_start is not None else self.size
+            blocks = [block for block in FileReader(self.index_path).iter_records() if 'o' in block and block['o'] < tail_start]
+            kept = []
+            kept_size = 0
+            for block in reversed(blocks):
+                if len(kept) > 0 and kept_size + block['n'] > self.max_bytes:
+                    break
+                kept.append(block)
+                kept_size += block['n']
+            kept.reverse()
+            data_name = self.key + '-' + str(int(time.time() * 1000)) + '.log'
+            data_path = os.path.join(self.transcript_dir, data_name)
+            index_lines = [json.dumps({'data': data_name}) + '\n']
+            offset = 0
+            data_file = AtomicWriter(data_path, binary=True, sync=False)
+            with MappedFile(old_path) as mapped:
+                for block in kept:
+                    data_file.write(mapped[block['o']:block['o'] + block['n']])
+                    index_lines.append(json.dumps({'o': offset, 'n': block['n'], 't': block['t'], 'c': block['c']}) + '\n')
+                    offset += block['n']
+                data_file.write(mapped[tail_start:copied_size])
+            with self.lock:
+                if self.data_path != old_path:
+                    return # the data file could not be written and was opened again
+                if self.size > copied_size:
+                    with open(old_path, 'rb') as old_file:
+                        old_file.seek(copied_size)
+                        data_file.write(old_file.read(self.size - copied_size))
+                # blocks that finished while the kept blocks were copied, their lines come after index_size
+                for block in read_index_from(self.index_path, index_size):
+                    if block['o'] >= tail_start:
+                        index_lines.append(json.dumps({'o': block['o'] - tail_start + offset, 'n': block['n'], 't': block['t'], 'c': block['c']}) + '\n')
+                data_file.commit()
+                data_file = None
+                FileWriter(self.index_path).write_lines(index_lines) # the new data file is used from here on
+                self.data_path = data_path
+                self.size = os.path.getsize(data_path)
+                if self.block_start is not None:
+                    self.block_start = self.block_start - tail_start + offset
+            for name in os.listdir(self.transcript_dir):
+                if name.startswith(self.key + '-') and name != data_name:
+                    os.remove(os.path.join(self.transcript_dir, name)) # the old data file and files of an interrupted compaction
+        except (IOError, OSError, KeyError, ValueError):
+            pass
+        finally:
+            if data_file is not None:
+                data_file.discard()
+            self.compacting = False
+
+# the data file name from the header line of an index file, None if there is no valid index
+def read_data_name(index_path):
+    if not os.path.isfile(index_path):
+        return None
+    for line in FileReader(index_path).iter_lines():
+        try:
+            return json.loads(line)['data']
+        except (ValueError, KeyError, TypeError):
+            return None
+    return None
+
+# the block lines of an index file after byte offset
+def read_index_from(index_path, offset):
+    with open(index_path, 'rb') as index_file:
+        index_file.seek(offset)
+        data = index_file.read()
+    blocks = []
+    for line in data.decode('utf-8', 'replace').splitlines():
+        try:
+            block = json.loads(line)
+            if 'o' in block and 'n' in block:
+                blocks.append(block)
+        except ValueError:
+            pass
+    return blocks
+
+# the last block_count block lines of an index file, read from the end of the file
+def read_index_tail(index_path, block_count):
+    if block_count <= 0:
+        return []
+    blocks = []
+    for line in FileReader(index_path).read_tail(block_count).splitlines():
+        try:
+            block = json.loads(line)
+            if 'o' in block and 'n' in block:
+                blocks.append(block)
+        except ValueError:
+            pass # the header line, or a line that was cut off when ST closed
+    return blocks
+
+#------------------------------------------------------------------------------
+# [ TranscriptRegistry class ] - the transcripts of the .glue files, stored in the Glue cache directory
+#   transcripts are named after a hash of the .glue file path
+#------------------------------------------------------------------------------
+class TranscriptRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.transcript_dir = None
+        self.max_bytes = 4194304
+        self.transcripts = {} # .glue file path -> Transcript
+
+    def configure(self, transcript_dir, max_bytes):
+        with self.lock:
+            self.transcript_dir = transcript_dir
+            self.max_bytes = max_bytes
+
+    #------------------------------------------------------------------------------
+    # [ get method ] - returns the Transcript of a .glue file, None if transcripts are off or the view is not a saved .glue file
+    #------------------------------------------------------------------------------
+    def get(self, file_path):
+        if not file_path or not file_path.endswith('.glue'):
+            return None
+        with self.lock:
+            if self.transcript_dir is None or self.max_bytes <= 0:
+                return None
+            file_path = os.path.abspath(file_path)
+            if file_path not in self.transcripts:
+                key = hashlib.sha1(file_path.encode('utf-8')).hexdigest()
+                self.transcripts[file_path] = Transcript(self.transcript_dir, key, self.max_bytes)
+            return self.transcripts[file_path]
+
+# shared by all Glue views
+transcript_registry = TranscriptRegistry()
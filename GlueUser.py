@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import re
+import json
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from .GlueIO import FileReader
+else:
+    from GlueIO import FileReader
+
+#------------------------------------------------------------------------------
+# [ UserCommandCycleError class ] - raised when user commands expand into each other in a loop
+#------------------------------------------------------------------------------
+class UserCommandCycleError(Exception):
+    def __init__(self, chain):
+        self.chain = chain
+        Exception.__init__(self, ' -> '.join(chain))
+
+#------------------------------------------------------------------------------
+# [ CommandTemplate class ] - a user command string precompiled into literal and replacement tag segments
+#------------------------------------------------------------------------------
+class CommandTemplate:
+    tag_pattern = re.compile(r'\{\{(args|pwd|clipboard)\}\}')
+
+    def __init__(self, template):
+        self.template = template
+        self.segments = [] # literal strings and tag names, tags are stored as 1-tuples
+        position = 0
+        for match in self.tag_pattern.finditer(template):
+            if match.start() > position:
+                self.segments.append(template[position:match.start()])
+            self.segments.append((match.group(1),))
+            position = match.end()
+        if position < len(template):
+            self.segments.append(template[position:])
+        self.tags = set(segment[0] for segment in self.segments if isinstance(segment, tuple))
+
+    #------------------------------------------------------------------------------
+    # [ render method ] - values maps tag names to strings or to callables that are only called if the tag is used
+    #------------------------------------------------------------------------------
+    def render(self, values):
+        resolved = {}
+        for tag in self.tags:
+            value = values.get(tag, '')
+            resolved[tag] = value() if callable(value) else value
+        return ''.join(resolved[segment[0]] if isinstance(segment, tuple) else segment for segment in self.segments)
+
+#------------------------------------------------------------------------------
+# [ get_template function ] - the command string of a glue.json value, a string or an object:
+#   {"command": "<command>", "cached": true, "inputs": ["<glob>", ...], "max_age": <seconds>}
+#   cached commands run through glue cached with the input files as part of the cache key
+#------------------------------------------------------------------------------
+def get_template(value):
+    if not isinstance(value, dict):
+        return value
+    template = value.get('command', '')
+    if not value.get('cached', False):
+        return template
+    options = ['glue', 'cached']
+    for pattern in value.get('inputs', []):
+        options.append('--input=' + pattern)
+    if value.get('max_age'):
+        options.append('--max-age=' + str(int(value['max_age'])))
+    return ' '.join(options) + ' -- ' + template
+
+#------------------------------------------------------------------------------
+# [ UserCommandRegistry class ] - Glue user command extensions from one or more JSON files
+#   files are merged in order (later files override earlier ones) and only re-read when one of them changes
+#------------------------------------------------------------------------------
+class UserCommandRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.file_paths = []
+        self.signature = None
+        self.commands = {} # command name -> CommandTemplate
+        self.refreshing = False
+
+    def set_files(self, file_paths):
+        with self.lock:
+            if file_paths != self.file_paths:
+                self.file_paths = list(file_paths)
+                self.signature = None
+
+    def has_files(self):
+        with self.lock:
+            return any(os.path.isfile(file_path) for file_path in self.file_paths)
+
+    #------------------------------------------------------------------------------
+    # [ get_commands method ] - returns the dict of command name -> CommandTemplate, reloads if a file changed
+    #------------------------------------------------------------------------------
+    def get_commands(self):
+        with self.lock:
+            signature = self.get_signature()
+            if signature != self.signature:
+                commands = {}
+                for file_path in self.file_paths:
+                    if os.path.isfile(file_path):
+                        user_json = FileReader(file_path).read_utf8()
+                        for name, value in json.loads(user_json).items():
+                            commands[name] = CommandTemplate(get_template(value))
+                self.commands = commands
+                self.signature = signature
+            return self.commands
+
+    # names of the commands that were loaded last, does not check the files
+    def get_names(self):
+        return sorted(self.commands)
+
+    #------------------------------------------------------------------------------
+    # [ refresh_async method ] - reload changed command files in a background thread
+    #   called on every Tab press and panel open, a call while a refresh is running does nothing
+    #------------------------------------------------------------------------------
+    def refresh_async(self):
+        if self.refreshing:
+            return
+        self.refreshing = True
+        refresh_thread = threading.Thread(target=self.refresh)
+        refresh_thread.daemon = True
+        refresh_thread.start()
+
+    def refresh(self):
+        try:
+            self.get_commands()
+        except Exception:
+            pass # a glue.json syntax error is reported when the user runs a command
+        finally:
+            self.refreshing = False
+
+    # call with self.lock held
+    def get_signature(self):
+        signature = []
+        for file_path in self.file_paths:
+            try:
+                stat_info = os.stat(file_path)
+                signature.append((file_path, stat_info.st_mtime, stat_info.st_size))
+            except OSError:
+                signature.append((file_path, None, None))
+        return signature
+
+    #------------------------------------------------------------------------------
+    # [ expand method ] - expand a user command into the system command string that it maps to
+    #   user commands that expand to 'glue <other user command>' are followed, cycles raise UserCommandCycleError
+    #   chain holds the user commands that are being run already (a user command that runs 'glue timeout 5 glue <name>'
+    #   re-enters through muterun), the names expanded here are appended to it.  Returns None if name is not a user command
+    #------------------------------------------------------------------------------
+    def expand(self, name, arguments, values, reserved=(), chain=None):
+        commands = self.get_commands()
+        if name not in commands:
+            return None
+        if chain is None:
+            chain = []
+        while True:
+            if name in chain:
+                raise UserCommandCycleError(chain + [name])
+            chain.append(name)
+            values['args'] = arguments
+            command = commands[name].render(values)
+            command_parts = command.split(None, 2)
+            if len(command_parts) > 1 and command_parts[0] == 'glue' and command_parts[1] in commands and command_parts[1] not in reserved:
+                name = command_parts[1]
+                arguments = command_parts[2] if len(command_parts) > 2 else ''
+            else:
+                return command
+
+# shared by all GlueCommand instances
+user_commands = UserCommandRegistry()
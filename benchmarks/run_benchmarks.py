@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Glue benchmarks - runs the Glue hot paths on plain CPython against the stub sublime API
+#
+#   python benchmarks/run_benchmarks.py                     all scenarios at full size
+#   python benchmarks/run_benchmarks.py --quick             all scenarios at reduced size
+#   python benchmarks/run_benchmarks.py path_lookup writer  selected scenarios
+#   python benchmarks/run_benchmarks.py --json new.json --compare old.json
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import argparse
+import tempfile
+import importlib
+import subprocess
+
+try:
+    import tracemalloc # Py3.4+
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None # Windows
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+package_dir = os.path.dirname(benchmark_dir)
+sys.path.insert(0, os.path.join(benchmark_dir, 'stubs'))
+
+import sublime
+import sublime_plugin
+
+#------------------------------------------------------------------------------
+# [ load_glue function ] - import the repository as the Glue package and register its commands
+#------------------------------------------------------------------------------
+def load_glue():
+    package = types.ModuleType('Glue')
+    package.__path__ = [package_dir]
+    sys.modules['Glue'] = package
+    glue_module = importlib.import_module('Glue.Glue')
+    for name in dir(glue_module):
+        member = getattr(glue_module, name)
+        if isinstance(member, type) and name.endswith('Command') and issubclass(member, sublime_plugin.TextCommand) and member is not sublime_plugin.TextCommand:
+            sublime.text_commands[command_name(name)] = member
+    return glue_module
+
+# GlueStreamWriterCommand -> glue_stream_writer, like ST does
+def command_name(class_name):
+    name = class_name[:-len('Command')]
+    return ''.join('_' + c.lower() if c.isupper() and i > 0 else c.lower() for i, c in enumerate(name))
+
+#------------------------------------------------------------------------------
+# [ Terminal class ] - a Glue terminal view with the input panel driven by the benchmark
+#------------------------------------------------------------------------------
+class Terminal:
+    def __init__(self, glue_module, working_dir):
+        self.glue_module = glue_module
+        self.window = sublime.active_window()
+        self.view = self.window.new_file()
+        self.view.path = os.path.join(working_dir, 'terminal.glue')
+        self.window.input_panels = []
+        self.view.run_command('glue')
+
+    def glue(self):
+        return self.glue_module.GlueCommand(self.view)
+
+    def panel_count(self):
+        return len(self.window.input_panels)
+
+    # enter a command in the most recent input panel, returns the muterun dispatch time
+    def submit(self, user_command):
+        on_done = self.window.input_panels[-1][1]
+        start = time.time()
+        on_done(user_command)
+        return time.time() - start
+
+    # runs the event loop until the command has finished and the input panel was reopened
+    def wait_for_panel(self, panel_count, timeout=600.0):
+        sublime.event_loop.run_until(lambda: self.panel_count() > panel_count, timeout)
+
+#------------------------------------------------------------------------------
+# Measurements
+#------------------------------------------------------------------------------
+def percentiles(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    result = {'count': len(ordered), 'mean_ms': 1000.0 * sum(ordered) / len(ordered)}
+    for p in (50, 90, 99):
+        result['p' + str(p) + '_ms'] = 1000.0 * ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+    result['max_ms'] = 1000.0 * ordered[-1]
+    return result
+
+def max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss # bytes on macOS, KiB elsewhere
+
+def command_stats(view, *names):
+    return dict((name, percentiles(view.command_times.get(name, []))) for name in names)
+
+#------------------------------------------------------------------------------
+# Scenarios - each returns a dict of measurements, the size argument scales the workload
+#------------------------------------------------------------------------------
+
+# resolve executables against a PATH with 10,000 directories
+def scenario_path_lookup(env, quick):
+    entry_count = 1000 if quick else 10000
+    path_root = os.path.join(env.work_dir, 'path')
+    path_dirs = []
+    for i in range(entry_count):
+        path_dir = os.path.join(path_root, 'd%05d' % i)
+        os.makedirs(path_dir)
+        path_dirs.append(path_dir)
+    tool_path = os.path.join(path_dirs[-1], 'glue-bench-tool')
+    with open(tool_path, 'w') as tool_file:
+        tool_file.write('#!/bin/sh\n')
+    os.chmod(tool_path, 0o755)
+    env.settings.set('glue_userpath', os.pathsep.join(path_dirs))
+    glue = env.terminal.glue()
+    index = env.glue_module.executable_index
+    rehash_times = []
+    for i in range(5):
+        start = time.time()
+        index.rehash(glue.userpath)
+        rehash_times.append(time.time() - start)
+    hit_times = []
+    miss_times = []
+    for i in range(2000):
+        start = time.time()
+        glue.get_path('glue-bench-tool')
+        hit_times.append(time.time() - start)
+        start = time.time()
+        glue.get_path('glue-bench-missing')
+        miss_times.append(time.time() - start)
+    env.settings.set('glue_userpath', '')
+    return {'path_entries': entry_count, 'rehash': percentiles(rehash_times),
+            'lookup_hit': percentiles(hit_times), 'lookup_miss': percentiles(miss_times)}
+
+# one command that writes 100 MB of output
+def scenario_large_output(env, quick):
+    output_mb = 10 if quick else 100
+    line = 'x' * 99
+    script = "import sys\nline = %r + '\\n'\nblock = line * 10000\nfor i in range(%d):\n    sys.stdout.write(block)\n" % (line, output_mb)
+    script_path = os.path.join(env.work_dir, 'large_output.py')
+    with open(script_path, 'w') as script_file:
+        script_file.write(script)
+    panel_count = env.terminal.panel_count()
+    start = time.time()
+    dispatch_time = env.terminal.submit(sys.executable + ' ' + script_path)
+    first_output = []
+    view_size = env.terminal.view.size()
+    def done():
+        if not first_output and env.terminal.view.size() > view_size + 200:
+            first_output.append(time.time() - start)
+        return env.terminal.panel_count() > panel_count
+    sublime.event_loop.run_until(done)
+    wall_time = time.time() - start
+    return {'output_mb': output_mb, 'wall_s': wall_time, 'throughput_mb_s': output_mb / wall_time,
+            'dispatch_ms': 1000.0 * dispatch_time, 'first_output_ms': 1000.0 * first_output[0] if first_output else None,
+            'view_chars': env.terminal.view.size(), 'commands': command_stats(env.terminal.view, 'glue_stream_writer', 'glue_flush')}
+
+# 1,000 commands entered one after another, each as soon as the input panel reopens
+def scenario_queued_commands(env, quick):
+    command_count = 100 if quick else 1000
+    dispatch_times = []
+    completion_times = []
+    for i in range(command_count):
+        panel_count = env.terminal.panel_count()
+        start = time.time()
+        dispatch_times.append(env.terminal.submit('echo glue benchmark ' + str(i)))
+        env.terminal.wait_for_panel(panel_count)
+        completion_times.append(time.time() - start)
+    return {'commands': command_count, 'dispatch': percentiles(dispatch_times), 'completion': percentiles(completion_times)}
+
+# the same commands in the persistent shell session of the view
+def scenario_session_commands(env, quick):
+    env.settings.set('glue_session_mode', True)
+    env.terminal.view.commands.pop('glue', None) # the GlueCommand instance reads the setting when it is created
+    try:
+        return scenario_queued_commands(env, quick)
+    finally:
+        env.settings.set('glue_session_mode', False)
+
+# muterun dispatch of glue user commands from a glue.json with 500 extensions
+def scenario_user_commands(env, quick):
+    extension_count = 500
+    user_json = {}
+    for i in range(extension_count):
+        if i % 5 == 0:
+            user_json['alias' + str(i)] = 'glue cmd' + str(i + 1) + ' {{args}}' # followed to the next command
+        elif i % 5 == 1:
+            user_json['cmd' + str(i)] = 'jobs {{args}}'
+        elif i % 5 == 2:
+            user_json['cmd' + str(i)] = 'jobs {{pwd}}'
+        else:
+            user_json['cmd' + str(i)] = 'jobs'
+    json_path = os.path.join(sublime.packages_path(), 'Glue-Commands', 'glue.json')
+    with open(json_path, 'w') as json_file:
+        json.dump(user_json, json_file)
+    names = sorted(user_json)
+    start = time.time()
+    env.glue_module.user_commands.set_files([json_path])
+    env.glue_module.user_commands.get_commands()
+    load_time = time.time() - start
+    dispatch_times = []
+    for i in range(5000 if not quick else 1000):
+        dispatch_times.append(env.terminal.submit('glue ' + names[i % len(names)] + ' arg'))
+    sublime.event_loop.run_until(lambda: not sublime.event_loop.timers)
+    os.utime(json_path, (time.time() + 10, time.time() + 10))
+    start = time.time()
+    env.glue_module.user_commands.get_commands()
+    reload_time = time.time() - start
+    return {'extensions': extension_count, 'load_ms': 1000.0 * load_time, 'reload_ms': 1000.0 * reload_time,
+            'dispatch': percentiles(dispatch_times)}
+
+# GlueWriterCommand insertion and flushing with the scrollback limit reached
+def scenario_writer(env, quick):
+    write_count = 2000 if quick else 20000
+    env.settings.set('glue_scrollback_lines', 10000) # off by default
+    view = env.terminal.view
+    view.commands.pop('glue_flush', None) # the trimmer reads the setting when the command is created
+    view.command_times.clear()
+    output = '\n'.join('output line ' + str(i) for i in range(20))
+    for i in range(write_count):
+        view.run_command('glue_writer', {'text': output, 'command': 'bench ' + str(i), 'exit': False})
+        if i % 10 == 9:
+            sublime.event_loop.run_until(lambda: not sublime.event_loop.timers)
+    sublime.event_loop.run_until(lambda: not sublime.event_loop.timers)
+    return {'writes': write_count, 'view_chars': view.size(), 'commands': command_stats(view, 'glue_writer', 'glue_flush')}
+
+# StreamDecoder with ANSI stripping and CR overwrites on 64 KB chunks of typical terminal output
+def scenario_ansi_decoder(env, quick):
+    stream_module = importlib.import_module('Glue.GlueStream')
+    line_count = 20000 if quick else 200000
+    names = ['file_' + str(i) for i in range(line_count)]
+    code = '    value = compute_value(%d, other_argument) + 17'
+    inputs = [
+        # ls --color: two or three colour codes per short line
+        ('ls_color', ''.join(['\x1b[0m\x1b[01;34m%s\x1b[0m\n', '\x1b[01;32m%s.sh\x1b[0m\n', '%s.txt\n', '\x1b[01;36m%s\x1b[0m -> target\n'][i % 4] % name for i, name in enumerate(names))),
+        # git diff --color: one colour code per code line, hunk headers
+        ('diff_color', ''.join(['\x1b[32m+%s\x1b[m\n', '\x1b[31m-%s\x1b[m\n', ' %s\n', '\x1b[36m@@ -1,5 +1,6 @@\x1b[m%s\n'][i % 4] % (code % i) for i in range(line_count))),
+        # progress bars redrawn with CR
+        ('progress', ''.join(''.join('\rDownloading [%-20s] %3d%%' % ('#' * (j // 5), j) for j in range(101)) + '\n' for i in range(line_count // 80))),
+        ('plain', ''.join(' %s\n' % (code % i) for i in range(line_count))),
+    ]
+    result = {}
+    for name, text in inputs:
+        data = text.encode('utf-8')
+        best_time = None
+        for repeat in range(3):
+            decoder = stream_module.StreamDecoder('utf-8', 'replace', True, True)
+            start = time.time()
+            for offset in range(0, len(data), 65536):
+                decoder.decode('stdout', data[offset:offset + 65536])
+            decoder.flush()
+            elapsed = time.time() - start
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+        result[name] = {'input_mb': len(data) / 1048576.0, 'throughput_mb_s': len(data) / 1048576.0 / best_time}
+    return result
+
+scenarios = [
+    ('path_lookup', scenario_path_lookup),
+    ('large_output', scenario_large_output),
+    ('queued_commands', scenario_queued_commands),
+    ('session_commands', scenario_session_commands),
+    ('user_commands', scenario_user_commands),
+    ('writer', scenario_writer),
+    ('ansi_decoder', scenario_ansi_decoder),
+]
+
+#------------------------------------------------------------------------------
+# [ BenchmarkEnvironment class ] - temporary Packages and cache directories and a fresh terminal view
+#------------------------------------------------------------------------------
+class BenchmarkEnvironment:
+    def __init__(self, glue_module):
+        self.glue_module = glue_module
+        self.work_dir = tempfile.mkdtemp(prefix='glue-bench-')
+        self.settings = sublime.load_settings('Glue.sublime-settings')
+        sublime.data_dirs['packages'] = os.path.join(self.work_dir, 'Packages')
+        sublime.data_dirs['cache'] = os.path.join(self.work_dir, 'Cache')
+        os.makedirs(os.path.join(sublime.packages_path(), 'Glue-Commands'))
+        os.makedirs(sublime.cache_path())
+        sublime.event_loop.reset()
+        glue_module.plugin_loaded()
+        self.terminal = Terminal(glue_module, self.work_dir)
+
+    def close(self):
+        os.chdir(package_dir)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+#------------------------------------------------------------------------------
+# [ run_scenario function ] - run one scenario in this process, the peak memory is the peak of this process
+#------------------------------------------------------------------------------
+def run_scenario(name, quick, trace_memory):
+    function = dict(scenarios)[name]
+    glue_module = load_glue()
+    env = BenchmarkEnvironment(glue_module)
+    try:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.time()
+        result = function(env, quick)
+        result['total_s'] = time.time() - start
+        if trace_memory:
+            result['peak_traced_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        result['max_rss_kb'] = max_rss_kb()
+        return result
+    finally:
+        env.close()
+
+# each scenario runs in a new interpreter so that the module state and the peak memory are its own
+def run_scenario_process(name, quick, trace_memory):
+    command = [sys.executable, os.path.abspath(__file__), '--child', name]
+    if quick:
+        command.append('--quick')
+    if trace_memory:
+        command.append('--tracemalloc')
+    output = subprocess.check_output(command)
+    return json.loads(output.decode('utf-8').splitlines()[-1])
+
+#------------------------------------------------------------------------------
+# Reporting
+#------------------------------------------------------------------------------
+def flatten(result, prefix=''):
+    rows = []
+    for key in sorted(result):
+        value = result[key]
+        if isinstance(value, dict):
+            rows.extend(flatten(value, prefix + key + '.'))
+        else:
+            rows.append((prefix + key, value))
+    return rows
+
+def format_value(value):
+    if isinstance(value, float):
+        return '%.3f' % value
+    return str(value)
+
+def print_report(results, baseline):
+    for name in results:
+        print('')
+        print(name)
+        baseline_rows = dict(flatten(baseline.get(name, {})))
+        for key, value in flatten(results[name]):
+            line = '  ' + key.ljust(40) + format_value(value).rjust(14)
+            old_value = baseline_rows.get(key)
+            if isinstance(value, (int, float)) and isinstance(old_value, (int, float)) and old_value:
+                line += ('%+.1f%%' % (100.0 * (value - old_value) / old_value)).rjust(10)
+            print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Glue hot paths without Sublime Text')
+    parser.add_argument('scenario', nargs='*', help='scenarios to run: ' + ', '.join(name for name, function in scenarios))
+    parser.add_argument('--quick', action='store_true', help='reduced workload sizes')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='show the change against results written earlier with --json')
+    parser.add_argument('--tracemalloc', action='store_true', help='also report the peak of Python allocations (slows the scenarios down)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args.quick, args.tracemalloc)))
+        return
+    unknown = set(args.scenario) - set(name for name, function in scenarios)
+    if unknown:
+        parser.error('unknown scenario: ' + ', '.join(sorted(unknown)))
+    if args.tracemalloc and tracemalloc is None:
+        parser.error('--tracemalloc requires Python 3.4 or later')
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = {}
+    for name, function in scenarios:
+        if not args.scenario or name in args.scenario:
+            results[name] = run_scenario_process(name, args.quick, args.tracemalloc)
+            print_report({name: results[name]}, baseline)
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Stub of the Sublime Text sublime module for the Glue benchmarks
+#   views keep their text in an in-memory string, set_timeout callbacks are queued on a
+#   virtual clock and run in due order by run_until() on the benchmark thread
+#------------------------------------------------------------------------------
+
+import os
+import re
+import sys
+import json
+import time
+import heapq
+import threading
+
+#------------------------------------------------------------------------------
+# [ EventLoop class ] - deterministic replacement for the ST main thread timer queue
+#------------------------------------------------------------------------------
+class EventLoop:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timers = [] # heap of (due time, sequence number, callback)
+        self.sequence = 0
+        self.now = 0 # virtual milliseconds
+
+    def set_timeout(self, callback, delay=0):
+        with self.lock:
+            self.sequence += 1
+            heapq.heappush(self.timers, (self.now + max(0, delay), self.sequence, callback))
+
+    def reset(self):
+        with self.lock:
+            self.timers = []
+            self.now = 0
+
+    # runs the next callback, advancing the virtual clock to its due time, returns False if there are none
+    def run_next(self):
+        with self.lock:
+            if not self.timers:
+                return False
+            due, sequence, callback = heapq.heappop(self.timers)
+            self.now = max(self.now, due)
+        callback()
+        return True
+
+    #------------------------------------------------------------------------------
+    # [ run_until method ] - run callbacks until done() is true, waits for worker threads when
+    #   the queue is empty or only holds timers that are due later (the progress indicator)
+    #------------------------------------------------------------------------------
+    def run_until(self, done, timeout=600.0, poll=0.0005):
+        deadline = time.time() + timeout
+        while not done():
+            if time.time() > deadline:
+                raise RuntimeError("benchmark event loop timed out")
+            with self.lock:
+                next_due = self.timers[0][0] if self.timers else None
+            if next_due is None or next_due > self.now:
+                time.sleep(poll) # let the worker threads produce output
+            self.run_next()
+
+event_loop = EventLoop()
+
+def set_timeout(callback, delay=0):
+    event_loop.set_timeout(callback, delay)
+
+def set_timeout_async(callback, delay=0):
+    event_loop.set_timeout(callback, delay)
+
+#------------------------------------------------------------------------------
+# Settings and paths
+#------------------------------------------------------------------------------
+class Settings(dict):
+    def get(self, key, default=None):
+        return dict.get(self, key, default)
+
+    def set(self, key, value):
+        self[key] = value
+
+package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+data_dirs = {'packages': package_dir, 'cache': package_dir}
+loaded_settings = {}
+
+def load_settings(name):
+    if name not in loaded_settings:
+        settings = Settings()
+        settings_path = os.path.join(package_dir, name)
+        if os.path.isfile(settings_path):
+            with open(settings_path) as settings_file:
+                settings.update(json.load(settings_file))
+        loaded_settings[name] = settings
+    return loaded_settings[name]
+
+def packages_path():
+    return data_dirs['packages']
+
+def cache_path():
+    return data_dirs['cache']
+
+def platform():
+    if sys.platform == 'darwin':
+        return 'osx'
+    elif sys.platform.startswith('win'):
+        return 'windows'
+    return 'linux'
+
+def status_message(message):
+    pass
+
+def error_message(message):
+    raise RuntimeError(message)
+
+clipboard = ['']
+
+def get_clipboard():
+    return clipboard[0]
+
+def set_clipboard(text):
+    clipboard[0] = text
+
+#------------------------------------------------------------------------------
+# Regions, views and windows
+#------------------------------------------------------------------------------
+class Region:
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return self.end() - self.begin()
+
+class Selection(list):
+    def __init__(self, view):
+        list.__init__(self, [Region(view.cursor)])
+        self.view = view
+
+    def clear(self):
+        pass
+
+    def add(self, region):
+        self.view.cursor = region.begin()
+
+# command name -> command class, filled by the benchmark harness (ST derives the names from the class names)
+text_commands = {}
+window_commands = {}
+
+class View:
+    next_id = 1
+
+    def __init__(self, window=None):
+        self.view_id = View.next_id
+        View.next_id += 1
+        self.text = ''
+        self.cursor = 0
+        self.name = ''
+        self.path = None
+        self.window_ref = window
+        self.view_settings = Settings()
+        self.status = {}
+        self.command_times = {} # command name -> list of run times in seconds
+        self.commands = {} # command name -> command instance, ST keeps one instance per view
+
+    def id(self):
+        return self.view_id
+
+    def window(self):
+        return self.window_ref
+
+    def file_name(self):
+        return self.path
+
+    def set_name(self, name):
+        self.name = name
+
+    def set_scratch(self, scratch):
+        pass
+
+    def set_read_only(self, read_only):
+        pass
+
+    def settings(self):
+        return self.view_settings
+
+    def set_status(self, key, value):
+        self.status[key] = value
+
+    def erase_status(self, key):
+        self.status.pop(key, None)
+
+    def size(self):
+        return len(self.text)
+
+    def substr(self, region):
+        if isinstance(region, int):
+            return self.text[region:region + 1]
+        return self.text[region.begin():region.end()]
+
+    def insert(self, edit, point, text):
+        self.text = self.text[:point] + text + self.text[point:]
+        if point <= self.cursor:
+            self.cursor += len(text)
+        return len(text)
+
+    def replace(self, edit, region, text):
+        self.erase(edit, region)
+        self.insert(edit, region.begin(), text)
+
+    def erase(self, edit, region):
+        self.text = self.text[:region.begin()] + self.text[region.end():]
+        if self.cursor > region.end():
+            self.cursor -= region.size()
+        elif self.cursor > region.begin():
+            self.cursor = region.begin()
+
+    def sel(self):
+        return Selection(self)
+
+    def show(self, point, show_surrounds=True):
+        pass
+
+    def rowcol(self, point):
+        row = self.text.count('\n', 0, point)
+        return row, point - (self.text.rfind('\n', 0, point) + 1)
+
+    def text_point(self, row, col):
+        point = 0
+        for i in range(row):
+            newline = self.text.find('\n', point)
+            if newline == -1:
+                return len(self.text)
+            point = newline + 1
+        return point + col
+
+    def find(self, pattern, start_point, flags=0):
+        match = re.compile(pattern, re.M).search(self.text, start_point)
+        if match is None:
+            return Region(-1, -1)
+        return Region(match.start(), match.end())
+
+    def find_all(self, pattern, flags=0):
+        return [Region(match.start(), match.end()) for match in re.finditer(pattern, self.text, re.M)]
+
+    def full_line(self, point):
+        if isinstance(point, Region):
+            point = point.begin()
+        start = self.text.rfind('\n', 0, point) + 1
+        end = self.text.find('\n', point)
+        return Region(start, len(self.text) if end == -1 else end + 1)
+
+    def line(self, point):
+        region = self.full_line(point)
+        end = region.end()
+        if end > region.begin() and self.text[end - 1] == '\n':
+            end -= 1
+        return Region(region.begin(), end)
+
+    def run_command(self, name, args=None):
+        if name == 'append':
+            self.text += args['characters']
+            return
+        if name not in self.commands:
+            if name not in text_commands:
+                return
+            self.commands[name] = text_commands[name](self)
+        start = time.time()
+        self.commands[name].run(None, **(args or {}))
+        self.command_times.setdefault(name, []).append(time.time() - start)
+
+class Window:
+    def __init__(self):
+        self.window_views = []
+        self.input_panels = [] # (caption, on_done) of every show_input_panel call
+
+    def new_file(self):
+        view = View(self)
+        self.window_views.append(view)
+        return view
+
+    def open_file(self, file_path):
+        view = self.new_file()
+        view.path = file_path
+        return view
+
+    def views(self):
+        return list(self.window_views)
+
+    def active_view(self):
+        return self.window_views[-1] if self.window_views else None
+
+    def show_input_panel(self, caption, initial_text, on_done, on_change, on_cancel):
+        self.input_panels.append((caption, on_done))
+        panel_view = View(self)
+        panel_view.text = initial_text
+        return panel_view
+
+    def run_command(self, name, args=None):
+        command_class = window_commands.get(name)
+        if command_class is not None:
+            command_class(self).run(**(args or {}))
+
+    def folders(self):
+        return []
+
+windows = [Window()]
+
+def active_window():
+    return windows[0]
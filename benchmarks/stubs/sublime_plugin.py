@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Stub of the Sublime Text sublime_plugin module for the Glue benchmarks
+#------------------------------------------------------------------------------
+
+class TextCommand:
+    def __init__(self, view):
+        self.view = view
+
+class WindowCommand:
+    def __init__(self, window):
+        self.window = window
+
+class EventListener:
+    pass
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import webbrowser
+
+#------------------------------------------------------------------------------
+# [ run_browse function ] - glue browse <url,path>
+#------------------------------------------------------------------------------
+def run_browse(glue, com_args, glue_command):
+    if len(com_args) > 2:
+        browse_string = com_args[2]
+        # if they requested a url with protocol, just open it
+        if browse_string.startswith('http://') or browse_string.startswith('https://'):
+            webbrowser.open(browse_string)
+        else:
+            # check if it is a local file that user wants to open in browser
+              # remove the initial OS dependent filepath separator character if added (will be added back in .join method below)
+            if browse_string.startswith(os.sep):
+                browse_string = browse_string[1:] # remove the first char (?are there typically two chars '\\' in Windows?)
+            elif os.altsep != None:
+                if browse_string.startswith(os.altsep): # if there is an alternate separator (i.e. / on windows)
+                    browse_string = browse_string[1:] # then remove it
+            check_path = os.path.join(os.path.abspath(glue.current_dirpath), browse_string)
+            # test for existence of local file on the path
+            if glue.is_file_here(check_path):
+                webbrowser.open('file://' + check_path) # if it is a local file, open it in browser
+            else:
+                webbrowser.open('http://' + browse_string) # if not, assume that it is a URL without protcol and add it
+        browser_msg = "glue browse [ " + browse_string + " ] complete\n"
+        glue.view.run_command('glue_writer', {'text': browser_msg, 'command': glue_command, 'exit': False})
+    else:
+        browser_error_msg = "Please enter a URL or local filepath after the glue browse command\n"
+        glue.view.run_command('glue_writer', {'text': browser_error_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_localhost function ] - glue localhost [port]
+#------------------------------------------------------------------------------
+def run_localhost(glue, com_args, glue_command):
+    localhost_url = 'http://localhost:8000'
+    if len(com_args) > 2:
+        protocol = com_args[2] # the argument is the requested protocol (doesn't perform sanity check)
+        localhost_url = 'http://localhost:' + protocol
+    webbrowser.open(localhost_url)
+    localhost_browse_msg = "glue localhost complete\n"
+    glue.view.run_command('glue_writer', {'text': localhost_browse_msg, 'command': glue_command, 'exit': False})
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import time
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueCache import result_cache, get_cache_key
+    from ..GlueSpill import OutputSpiller
+    from ..GlueScheduler import scheduler
+else:
+    from GlueCache import result_cache, get_cache_key
+    from GlueSpill import OutputSpiller
+    from GlueScheduler import scheduler
+
+#------------------------------------------------------------------------------
+# [ run_cached function ] - glue cached [--input <glob>] [--max-age <seconds>] [--] <command>
+#                           glue cached --clear
+#   prints the output of an earlier run of the command when the command, the working directory,
+#   the environment and the input files have not changed, runs the command otherwise
+#------------------------------------------------------------------------------
+def run_cached(glue, com_args, glue_command):
+    input_patterns = []
+    max_age = 0
+    arguments = com_args[2:]
+    index = 0
+    while index < len(arguments) and arguments[index].startswith('--'):
+        argument = arguments[index]
+        index += 1
+        if argument == '--':
+            break
+        elif argument == '--clear':
+            removed = result_cache.clear()
+            cached_msg = "Removed " + str(removed) + " cached results\n"
+            glue.view.run_command('glue_writer', {'text': cached_msg, 'command': glue_command, 'exit': False})
+            return
+        if '=' in argument:
+            argument, value = argument.split('=', 1)
+        elif index < len(arguments):
+            value = arguments[index]
+            index += 1
+        else:
+            value = ''
+        if argument == '--input' and len(value) > 0:
+            input_patterns.append(value)
+        elif argument == '--max-age' and value.isdigit():
+            max_age = int(value)
+        else:
+            cached_error_msg = "Unknown cached option '" + argument + "'.  Use --input <glob> and --max-age <seconds> before the command.\n"
+            glue.view.run_command('glue_writer', {'text': cached_error_msg, 'command': glue_command, 'exit': False})
+            return
+    command_args = arguments[index:]
+    if len(command_args) == 0:
+        cached_error_msg = "Please enter a system command after the cached command.\n"
+        glue.view.run_command('glue_writer', {'text': cached_error_msg, 'command': glue_command, 'exit': False})
+        return
+    if command_args[0] in ('glue', 'cd', 'exit', 'jobs', 'fg', 'kill') or command_args[-1].endswith('&'):
+        cached_error_msg = "The cached command runs foreground system commands only.\n"
+        glue.view.run_command('glue_writer', {'text': cached_error_msg, 'command': glue_command, 'exit': False})
+        return
+    command = ' '.join(command_args)
+    if result_cache.max_bytes <= 0:
+        glue.muterun(command) # the cache is disabled with glue_cache_size 0
+        return
+    shell_env = glue.get_shell_env()
+    env = dict((name, shell_env.get(name)) for name in ['PATH'] + glue.settings.get('glue_cache_env', []))
+    CachedRun(glue, glue_command, command, env, input_patterns, max_age).start()
+
+#------------------------------------------------------------------------------
+# [ CachedRun class ] - looks up the command in the result cache on a background thread
+#   the input files are matched and checked off the main thread, the cached output is printed
+#   or the command is run on the main thread
+#------------------------------------------------------------------------------
+class CachedRun:
+    def __init__(self, glue, glue_command, command, env, input_patterns, max_age):
+        self.glue = glue
+        self.glue_command = glue_command
+        self.command = command
+        self.cwd = glue.current_dirpath
+        self.env = env
+        self.input_patterns = input_patterns
+        self.max_age = max_age
+        self.key = None
+        self.entry = None
+        self.error = None
+
+    def start(self):
+        lookup_thread = threading.Thread(target=self.lookup)
+        lookup_thread.daemon = True
+        lookup_thread.start()
+
+    def lookup(self):
+        try:
+            self.key = get_cache_key(self.command, self.cwd, self.env, self.input_patterns)
+            self.entry = result_cache.get(self.key, self.max_age)
+        except Exception as e:
+            self.error = str(e)
+        scheduler.notify(self, self.print_output)
+
+    def print_output(self):
+        glue = self.glue
+        if self.error is not None:
+            cached_error_msg = "Glue was unable to check the result cache: " + self.error + "\n"
+            glue.view.run_command('glue_writer', {'text': cached_error_msg, 'command': self.glue_command, 'exit': False})
+        elif self.entry is None:
+            # run from a scheduler callback, not from muterun_runner, so errors are reported here
+            glue.next_cache_key = self.key
+            glue.next_prompt_command = self.glue_command
+            try:
+                glue.muterun(self.command)
+            except Exception:
+                glue.exception_handler(self.glue_command)
+            finally:
+                glue.next_cache_key = None
+                glue.next_prompt_command = None
+        else:
+            header, output = self.entry
+            view_text = []
+            spiller = OutputSpiller(view_text.append, glue.spill_threshold, glue.spill_tail_chars)
+            spiller.feed(output)
+            spiller.close()
+            cached_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(header['created']))
+            view_text.append("[ Glue: cached result from " + cached_time + " ]\n")
+            glue.view.run_command('glue_writer', {'text': ''.join(view_text), 'command': self.glue_command, 'exit': False})
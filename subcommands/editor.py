@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+
+#------------------------------------------------------------------------------
+# [ run_clear function ] - glue clear
+#------------------------------------------------------------------------------
+def run_clear(glue, com_args, glue_command):
+    glue.view.run_command('glue_clear_editor')
+    # keeps the input panel open for more commands
+    glue.view.run_command('glue', {'panel_only': True})
+
+#------------------------------------------------------------------------------
+# [ run_finder function ] - glue finder [path]
+#------------------------------------------------------------------------------
+def run_finder(glue, com_args, glue_command):
+    # user is requesting a directory as an argument
+    if len(com_args) > 2:
+        finder_dirpath = com_args[2]
+        if os.path.isdir(finder_dirpath):
+            glue.view.window().run_command("open_dir", {"dir": os.path.abspath(finder_dirpath)}) # open it
+            curdir_finder_msg = "The requested directory was opened in your finder\n"
+        elif os.path.isfile(finder_dirpath):
+            finder_dirpath = os.path.dirname(finder_dirpath)
+            glue.view.window().run_command("open_dir", {"dir": os.path.abspath(finder_dirpath)}) # open it
+            curdir_finder_msg = "The requested directory was opened in your finder\n"
+        else:
+            curdir_finder_msg = "Unable to find the requested directory path.  Please try again.\n"
+        # provide Glue view output to user after execution of the finder reveal
+        glue.view.run_command('glue_writer', {'text': curdir_finder_msg, 'command': glue_command, 'exit': False})
+    # user is requesting the current working directory (i.e. no argument)
+    else:
+        if len(glue.current_dirpath) > 0 and os.path.isdir(glue.current_dirpath):
+            glue.view.window().run_command("open_dir", {"dir": glue.current_dirpath})
+            curdir_finder_msg = "The current directory was opened in your finder.\n"
+            glue.view.run_command('glue_writer', {'text': curdir_finder_msg, 'command': glue_command, 'exit': False})
+        else:
+            curdir_finderror_msg = "Unable to detect the current working directory.  Please restart the Glue plugin and try again.\n"
+            glue.view.run_command('glue_writer', {'text': curdir_finderror_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_goto function ] - glue goto <query>
+#------------------------------------------------------------------------------
+def run_goto(glue, com_args, glue_command):
+    if len(com_args) > 2:
+        goto_user_msg = "goto " + com_args[2] + " completed\n"
+        glue.view.window().run_command("show_overlay", {"overlay": "goto", "show_files": True, "text": com_args[2]})
+        glue.view.run_command('glue_writer', {'text': goto_user_msg, 'command': glue_command, 'exit': False})
+    else:
+        # if no query string, just open the overlay
+        goto_user_msg = "goto overlay launch completed\n"
+        glue.view.window().run_command("show_overlay", {"overlay": "goto", "show_files": True})
+        glue.view.run_command('glue_writer', {'text': goto_user_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_new function ] - glue new
+#------------------------------------------------------------------------------
+def run_new(glue, com_args, glue_command):
+    filenew_text = "glue new command completed\n"
+    glue.view.run_command('glue_writer', {'text': filenew_text, 'command': glue_command, 'exit': False})
+    glue.view.window().new_file()
+
+#------------------------------------------------------------------------------
+# [ run_open function ] - glue open <path> [path2] [...]
+#------------------------------------------------------------------------------
+def run_open(glue, com_args, glue_command):
+    if len(com_args) > 2:
+        fileopen_text = "glue open command completed\n"
+        glue.view.run_command('glue_writer', {'text': fileopen_text, 'command': glue_command, 'exit': False})
+        glue.view.window().run_command('glue_file_opener', {'current_dir': glue.current_dirpath, 'file_list': com_args[2:]})
+    else:
+        missing_file_error_msg = "Please enter at least one filepath after the open command.\n"
+        glue.view.run_command('glue_writer', {'text': missing_file_error_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_wco function ] - glue wco <pattern>
+#------------------------------------------------------------------------------
+def run_wco(glue, com_args, glue_command):
+    if len(com_args) > 2:
+        fileopen_text = "glue wco command completed\n"
+        glue.view.run_command('glue_writer', {'text': fileopen_text, 'command': glue_command, 'exit': False})
+        # the files are opened as they are found, the number of files is shown in the status bar
+        for match_pattern in com_args[2:]:
+            glue.view.window().run_command('glue_file_wildcard_opener', {'current_dir': glue.current_dirpath, 'match_pattern': match_pattern})
+    else:
+        missing_file_error_msg = "Please enter at least one filepath after the open command.\n"
+        glue.view.run_command('glue_writer', {'text': missing_file_error_msg, 'command': glue_command, 'exit': False})
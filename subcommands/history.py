@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueHistory import command_history
+else:
+    from GlueHistory import command_history
+
+#------------------------------------------------------------------------------
+# [ run_history function ] - glue history [query], glue history --clear
+#   lists the unique commands that contain the query, most recent last like the shell history command
+#------------------------------------------------------------------------------
+def run_history(glue, com_args, glue_command):
+    if len(com_args) > 2 and com_args[2] == '--clear':
+        command_history.clear()
+        glue.view.run_command('glue_writer', {'text': "Glue command history cleared\n", 'command': glue_command, 'exit': False})
+        return
+    query = ' '.join(com_args[2:])
+    commands = command_history.search(query, limit=glue.settings.get('glue_history_display', 100))
+    if len(commands) == 0:
+        if len(query) > 0:
+            history_msg = "No commands in the history contain '" + query + "'\n"
+        else:
+            history_msg = "The command history is empty\n"
+    else:
+        commands.reverse()
+        width = len(str(len(commands)))
+        history_lines = [str(number).rjust(width) + "  " + command for number, command in enumerate(commands, 1)]
+        history_msg = '\n'.join(history_lines) + '\n'
+    glue.view.run_command('glue_writer', {'text': history_msg, 'command': glue_command, 'exit': False})
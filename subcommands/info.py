@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueUser import user_commands
+else:
+    from GlueUser import user_commands
+
+#------------------------------------------------------------------------------
+# [ run_help function ] - glue help
+#------------------------------------------------------------------------------
+def run_help(glue, com_args, glue_command):
+    help_text = get_help_text()
+    glue.view.run_command('glue_writer', {'text': help_text, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_user function ] - glue user
+#------------------------------------------------------------------------------
+def run_user(glue, com_args, glue_command):
+    if glue.load_user_commands():
+        usercom_dict = user_commands.get_commands()
+        if len(usercom_dict) > 0:
+            if len(usercom_dict) == 1:
+                com_extension_string = 'extension'
+                com_number_string = 'lonely'
+            else:
+                com_extension_string = 'extensions'
+                com_number_string = str(len(usercom_dict))
+            number_com_msg = "Your " + com_number_string + " Glue " + com_extension_string + ":\n\n"
+            com_list = []
+            for key, value in glue.xitems(usercom_dict):
+                com_string = key + " : " + value.template
+                com_list.append(com_string)
+            com_string = '\n'.join(sorted(com_list))
+            com_string = number_com_msg + com_string + '\n'
+            glue.view.run_command('glue_writer', {'text': com_string, 'command': glue_command, 'exit': False})
+        else:
+            user_error_msg = "Your glue.json file does not contain any commands\n"
+            glue.view.run_command('glue_writer', {'text': user_error_msg, 'command': glue_command, 'exit': False})
+    else:
+        usercom_error_msg = "The glue.json file could not be found.  Please confirm that this is contained in a Glue-Commands directory in your Sublime Text Packages directory.\n"
+        glue.view.run_command('glue_writer', {'text': usercom_error_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_template function ] - glue template <name> [--multi] [--name=<filename>]
+#------------------------------------------------------------------------------
+def run_template(glue, com_args, glue_command):
+    if len(com_args) > 2:
+        template_name = ""
+        template_filename = ""
+        template_multi = False
+        # test for the flag and name option in the user command
+        for argument in com_args[2:]: # only test the arguments after the 'template' subcommand
+            if "--multi" in argument:
+                template_multi = True # user indicated that the file will specify multiple file paths
+            elif argument.startswith('--name='):
+                name_list = argument.split('=')
+                template_filename = name_list[1] # the user assigned file write name of the file
+            else:
+                template_name = argument # if it is not one of the above options, then it is the requested template name
+        print_string = template_name + " " + template_filename + " " + str(template_multi)
+        glue.view.run_command('glue_writer', {'text': print_string, 'command': glue_command, 'exit': False})
+    else:
+        # user did not enter a template name
+        template_err_msg = "Please enter a template name after your command.\n"
+        glue.view.run_command('glue_writer', {'text': template_err_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ get_help_text function ] - returns the user help string
+#------------------------------------------------------------------------------
+def get_help_text():
+    help_string = """
+        __
+ .-----|  .--.--.-----.
+ |  _  |  |  |  |  -__|
+ |___  |__|_____|_____|
+ |_____|
+
+Copyright 2014 Christopher Simpkins | MIT License
+
+Glue joins your shell to Sublime Text in quasi-perfect harmony.
+
+USAGE
+
+  <command> [option(s)]
+
+  Enter a system command in the input panel at the bottom of your editor using the same syntax that you use in your terminal.  The standard output stream from the executable is printed in the active view of your editor as it is received.
+
+  To quit Glue, submit the command 'exit'.
+
+COMMANDS
+
+  Glue provides the following additional commands:
+
+    glue browse <url,path>    Open default browser to <url> or local <path>
+    glue cached <cmd>         Print the saved output of system command <cmd>, run it if something changed
+    glue cancel [%n]          Stop job n, or all running jobs
+    glue clear                Clear the text in the Glue view
+    glue finder [path]        Reveal current directory (default) or [path] directory in finder
+    glue goto <query>         Sublime Text Goto Anything search for <query>
+    glue grep <pattern>       Search the output of earlier commands for the regular expression <pattern>
+    glue help                 Glue help
+    glue history [query]      View the commands that you entered, optionally those that contain [query]
+    glue localhost [port]     Open browser to localhost:8000 or optional localhost:[port]
+    glue new                  Create a new Sublime Text buffer
+    glue open <path>          Open a file at <path> in the editor. Accepts multiple <path>
+    glue page <n> [page]      View large output <n> that was written to disk, one page at a time
+    glue parallel <cmd> [...] Run the quoted system commands at the same time, output in command order
+    glue path                 View your PATH settings
+    glue rehash               Rebuild the index of executables on your PATH
+    glue show <n>[:line]      Open the recorded output <n> of an earlier command, at [line]
+    glue stats [clear]        View the run times of recent system commands by executable
+    glue timeout <s> <cmd>    Run system command <cmd> and stop it after <s> seconds
+    glue to-buffer <cmd>      Write the output of system command <cmd> to a new buffer
+    glue to-file <path> <cmd> Write the output of system command <cmd> to the file at <path>
+    glue user                 View your Glue extensions (if present)
+    glue wco <pattern>        Open file(s) with wildcard <pattern> in the editor
+
+USER COMMANDS
+
+  Create a `Glue-Commands` directory inside your Sublime Text `Packages` directory.  Create a `glue.json` file inside the `Glue-Commands` directory.  Then map your JSON key:value as "command-name": "system command string".
+
+  You have the option to include the following replacement tags in your system command string:
+
+    {{args}}              additional arguments that you include on the command line
+    {{clipboard}}         the contents of the clipboard
+    {{pwd}}               the current working directory path
+
+  Launch Glue and run your command extension(s) with the following syntax:
+
+     glue <command-name> [args]
+
+  Your command is executed from your current working directory. Please see the documentation for additional details.
+
+  Additional extension files can be listed in the `glue_user_command_files` setting.  They are merged in the listed order and later files override earlier ones.
+
+  A command can also be an object with the options of `glue cached`, for example "test": {"command": "make test", "cached": true, "inputs": ["src/**/*.c"], "max_age": 3600}.  The saved output is printed while the files that match the inputs do not change.
+
+JOBS
+
+  Add a trailing '&' to a command to run it in the background and keep using Glue while it runs.
+
+  jobs                       List the running and finished Glue jobs
+  fg [n]                     View the output of background job [n] (default: most recent)
+  kill %n                    Stop job n
+
+  Press ctrl+alt+c (super+alt+c on OS X) in the Glue view to cancel the running command.  The output that it wrote so far is kept.  Set `glue_command_timeout` to a number of seconds to stop commands that run longer, or use `glue timeout <seconds> <command>` for one command.  A cancelled command is stopped together with the processes that it started.
+
+SHELL SESSION
+
+  Set `glue_session_mode` to true to run commands in one long-running shell per Glue view.  Exported variables, aliases, functions and directory changes are kept from one command to the next.  Background jobs still run in their own shell.  Killing a command also ends its session, and a new session starts with the next command.
+
+COLORS AND PROGRESS BARS
+
+  ANSI color and cursor codes in the command output are removed.  A line that a command redraws with a carriage return (progress bars, download counters) is shown in its last state.  Set `glue_strip_ansi` or `glue_overwrite_lines` to false to keep the codes or every version of the line.
+
+HISTORY
+
+  Glue saves the commands that you enter.  Press the up and down arrow keys in the command input box to step through them.  The commands that you entered in the current working directory come first.  Text that you type before the first key press limits the search to commands that start with it.
+
+  Use `glue history --clear` to delete the history.
+
+TRANSCRIPT
+
+  The text of a saved .glue terminal file is also appended to a transcript in the Glue cache directory, one block per command.  When you open the .glue file again from the sidebar, the newest `glue_transcript_blocks` blocks are restored and the older ones stay in the transcript.  The oldest blocks are removed when the transcript is larger than `glue_transcript_size` bytes.  Set it to 0 to turn the transcript off.
+
+WILDCARDS
+
+  `glue wco` accepts the wildcards * ? and [abc] in each part of the path, and ** for any number of subdirectories (for example `glue wco src/**/*.py`).  Hidden files and directories only match when the pattern part starts with a dot.  Paths that are excluded by a .gitignore file or by the `glue_wco_exclude` setting are skipped.  Glue asks before it opens more than `glue_wco_max_files` files.
+
+PARALLEL COMMANDS
+
+  glue parallel "make lint" "make test"      Run the commands at the same time
+  glue parallel --file tasks.txt             Run the commands in tasks.txt (one per line, # starts a comment)
+  glue parallel -j 2 <command> [...]         Run at most 2 commands at a time
+
+  The number of commands that run at a time defaults to the `glue_parallel_jobs` setting, or the number of CPUs if it is 0.  The output of each command is written when its turn comes, in the order of the commands, and a table of the exit status and run time of each command follows.
+
+SEARCH
+
+  Glue records the output of the system commands that you run.  Search it with a regular expression:
+
+  glue grep <pattern>           List the matching lines, most recent command first
+  glue grep -i <pattern>        Ignore case
+  glue grep <pattern> --cmd X   Only search the output of commands that contain X
+  glue show <n>:<line>          Open output <n> in a new buffer at <line>
+
+  The oldest outputs are removed when the recorded output is larger than `glue_output_index_size` bytes.  Set it to 0 to turn recording off.
+
+CACHED RESULTS
+
+  glue cached <cmd>                     Print the saved output of <cmd>, or run it and save the output
+  glue cached --input src/**/*.c <cmd>  Run <cmd> again when a file that matches the input pattern changes
+  glue cached --max-age 600 <cmd>       Run <cmd> again when the saved output is older than 600 seconds
+  glue cached --clear                   Remove all saved outputs
+
+  The output is saved when the command exits with status 0.  It is used again for the same command in the same working directory with the same PATH (and the variables in the `glue_cache_env` setting) while the size and modification time of the input files do not change.  The least recently used outputs are removed when the saved outputs are larger than `glue_cache_size` bytes.  Set it to 0 to turn the cache off.
+
+COMPLETION
+
+  Press the tab key in the command input box to complete the word before the cursor.  The first word completes to executables on your PATH and to Glue commands.  The word after 'glue' completes to Glue commands and your extensions.  Other words complete to file paths.  If more than one name matches, the status bar lists the matches and each tab press selects the next one.
+
+NAVIGATION
+
+  The working directory is initially set to the directory containing the buffer in which you are using Glue (when you open from sidebar right click menu or with a project file open in the editor).
+
+  Change directories with the 'cd' command:
+
+  cd <directory path>        Make `directory path` the working directory
+  cd ..                      Make parent directory the working directory
+  cd ~                       Make user home directory the working directory
+
+  Note that your working directory defaults to the system User directory if you launch Glue from the Command Palette without having an open project file in the editor (or in a clean editor window without an open project).
+
+ISSUES
+
+  Please submit bug reports on the GitHub repository @ https://github.com/chrissimpkins/glue/issues
+
+HELP
+
+  Detailed help is available @ http://gluedocs.readthedocs.org/
+
+"""
+    return help_string
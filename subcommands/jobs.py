@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# [ run_cancel function ] - glue cancel [%n]
+#   stops job n, or all running jobs of the view.  Running foreground commands are cancelled
+#   with the glue_cancel key binding because the input panel is closed while they run.
+#------------------------------------------------------------------------------
+def run_cancel(glue, com_args, glue_command):
+    if len(com_args) > 2:
+        job = glue.find_job(com_args[2])
+        if job is None:
+            cancel_msg = "cancel: no such job\n"
+        elif job.kill():
+            cancel_msg = "[" + str(job.job_id) + "] cancelled " + job.command + "\n"
+        else:
+            cancel_msg = "[" + str(job.job_id) + "] is not running\n"
+    else:
+        cancelled = [job for job in glue.get_jobs().list_jobs() if job.kill()]
+        if len(cancelled) > 0:
+            cancel_msg = ''.join("[" + str(job.job_id) + "] cancelled " + job.command + "\n" for job in cancelled)
+        else:
+            cancel_msg = "There are no running Glue jobs\n"
+    glue.view.run_command('glue_writer', {'text': cancel_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_timeout function ] - glue timeout <seconds> <command>
+#   runs the system command and stops it (and the processes that it started) after the number of seconds
+#------------------------------------------------------------------------------
+def run_timeout(glue, com_args, glue_command):
+    try:
+        timeout = float(com_args[2]) if len(com_args) > 3 else 0
+    except ValueError:
+        timeout = 0
+    if timeout <= 0:
+        timeout_error_msg = "Please enter a number of seconds and a system command after the timeout command.\n"
+        glue.view.run_command('glue_writer', {'text': timeout_error_msg, 'command': glue_command, 'exit': False})
+        return
+    if timeout == int(timeout):
+        timeout = int(timeout)
+    glue.next_timeout = timeout
+    glue.muterun(' '.join(com_args[3:]))
+    glue.next_timeout = None # the command was not a system command
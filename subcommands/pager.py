@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueSpill import spill_registry, PagedReader
+else:
+    from GlueSpill import spill_registry, PagedReader
+
+#------------------------------------------------------------------------------
+# [ run_page function ] - glue page <n> [page]
+#   opens one page of a spilled command output in a new scratch buffer
+#------------------------------------------------------------------------------
+def run_page(glue, com_args, glue_command):
+    if len(com_args) < 3 or not com_args[2].isdigit():
+        page_error_msg = "Please enter the number of the spilled output after the page command.\n"
+        glue.view.run_command('glue_writer', {'text': page_error_msg, 'command': glue_command, 'exit': False})
+        return
+    spill_id = int(com_args[2])
+    spill_path = spill_registry.get_path(spill_id)
+    if spill_path is None or not os.path.isfile(spill_path):
+        page_error_msg = "Glue could not find spilled output " + str(spill_id) + ".\n"
+        glue.view.run_command('glue_writer', {'text': page_error_msg, 'command': glue_command, 'exit': False})
+        return
+    reader = PagedReader(spill_path, glue.settings.get('glue_spill_page_size', 1048576))
+    page_count = reader.get_page_count()
+    page = 1
+    if len(com_args) > 3 and com_args[3].isdigit():
+        page = min(max(1, int(com_args[3])), page_count)
+    page_view = glue.view.window().new_file()
+    page_view.set_name("Glue output " + str(spill_id) + " - page " + str(page) + " of " + str(page_count))
+    page_view.set_scratch(True)
+    page_view.run_command('append', {'characters': reader.read_page(page)})
+    page_view.set_read_only(True)
+    page_msg = "Opened page " + str(page) + " of " + str(page_count) + " of output " + str(spill_id) + "\n"
+    if page < page_count:
+        page_msg += "Use 'glue page " + str(spill_id) + " " + str(page + 1) + "' for the next page\n"
+    glue.view.run_command('glue_writer', {'text': page_msg, 'command': glue_command, 'exit': False})
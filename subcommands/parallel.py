@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import time
+import threading
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueStream import iter_process_output
+    from ..GlueSpill import OutputSpiller
+    from ..GlueMetrics import CommandMetrics, command_metrics, format_duration
+    from ..GlueSearch import output_index
+    from ..GlueScheduler import scheduler
+    from ..GlueJobs import kill_process_group, release_process
+    from ..GlueIO import FileReader
+else:
+    from GlueStream import iter_process_output
+    from GlueSpill import OutputSpiller
+    from GlueMetrics import CommandMetrics, command_metrics, format_duration
+    from GlueSearch import output_index
+    from GlueScheduler import scheduler
+    from GlueJobs import kill_process_group, release_process
+    from GlueIO import FileReader
+
+#------------------------------------------------------------------------------
+# [ run_parallel function ] - glue parallel [-j <n>] <command> [command2] [...]
+#                             glue parallel [-j <n>] --file <path>
+#   commands with spaces are quoted, a command file has one command per line (# starts a comment)
+#------------------------------------------------------------------------------
+def run_parallel(glue, com_args, glue_command):
+    pool_size = glue.settings.get('glue_parallel_jobs', 0)
+    commands = []
+    arguments = com_args[2:]
+    index = 0
+    while index < len(arguments):
+        argument = arguments[index]
+        if argument in ('-j', '--jobs', '--file') and index + 1 < len(arguments):
+            value = arguments[index + 1]
+            index += 1
+        elif argument.startswith('--jobs=') or argument.startswith('--file='):
+            argument, value = argument.split('=', 1)
+        else:
+            if len(argument.strip()) > 0:
+                commands.append(argument)
+            index += 1
+            continue
+        if argument == '--file':
+            file_commands = read_command_file(os.path.join(glue.current_dirpath, os.path.expanduser(value)))
+            if file_commands is None:
+                parallel_error_msg = "Unable to read the command file '" + value + "'\n"
+                glue.view.run_command('glue_writer', {'text': parallel_error_msg, 'command': glue_command, 'exit': False})
+                return
+            commands.extend(file_commands)
+        elif value.isdigit() and int(value) > 0:
+            pool_size = int(value)
+        else:
+            parallel_error_msg = "The number of parallel jobs must be a positive number\n"
+            glue.view.run_command('glue_writer', {'text': parallel_error_msg, 'command': glue_command, 'exit': False})
+            return
+        index += 1
+    if len(commands) == 0:
+        parallel_error_msg = "Please enter the commands to run after the parallel command, or a command file with --file <path>.\n"
+        glue.view.run_command('glue_writer', {'text': parallel_error_msg, 'command': glue_command, 'exit': False})
+        return
+    if pool_size <= 0:
+        pool_size = get_cpu_count()
+    ParallelRun(glue, glue_command, commands, pool_size).start()
+
+def read_command_file(file_path):
+    try:
+        lines = [line.strip() for line in FileReader(file_path).iter_lines()]
+    except (IOError, OSError):
+        return None
+    return [line for line in lines if len(line) > 0 and not line.startswith('#')]
+
+def get_cpu_count():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 2
+
+#------------------------------------------------------------------------------
+# [ ParallelTask class ] - one command of a parallel run and the output that was not written to the view yet
+#------------------------------------------------------------------------------
+class ParallelTask:
+    def __init__(self, number, command):
+        self.number = number
+        self.command = command
+        self.lock = threading.Lock()
+        self.pending = [] # output text
+        self.process = None
+        self.started = False
+        self.done = False
+        self.exitcode = None
+        self.metrics = None
+
+    def append(self, text):
+        with self.lock:
+            self.pending.append(text)
+
+    def take(self):
+        with self.lock:
+            text = ''.join(self.pending)
+            self.pending = []
+            return text
+
+#------------------------------------------------------------------------------
+# [ ParallelRun class ] - runs the commands on a pool of worker threads as one Glue job
+#   the output of each command is kept separately and written to the view in the order of the
+#   commands: the output of the first unfinished command is written as it arrives, the output of
+#   the later commands when their turn comes.  Large outputs are spilled to disk like other commands.
+#------------------------------------------------------------------------------
+class ParallelRun:
+    def __init__(self, glue, glue_command, commands, pool_size):
+        self.glue = glue
+        self.glue_command = glue_command
+        self.tasks = [ParallelTask(number, command) for number, command in enumerate(commands, 1)]
+        self.pool_size = min(pool_size, len(commands))
+        self.lock = threading.Lock()
+        self.next_task = 0 # next task for a worker
+        self.next_print = 0 # task whose output is written to the view
+        self.header_printed = False
+        self.cancelled = False
+        self.pid = None # the job table shows '-'
+        self.job = None
+        self.started = None
+
+    def start(self):
+        glue = self.glue
+        self.job = glue.get_jobs().add(self.glue_command, False, glue.stream_buffer_size)
+        self.job.metrics = CommandMetrics(self.glue_command, 'parallel', glue.current_dirpath)
+        self.job.timeout = glue.get_timeout(False)
+        self.started = time.time()
+        self.env = glue.get_shell_env()
+        glue.view.run_command('glue_writer', {'text': '', 'command': self.glue_command, 'exit': False, 'stream': True})
+        self.job.set_process(self) # glue cancel and the job timeout call kill()
+        self.job.thread = threading.Thread(target=self.run_pool)
+        scheduler.start_indicator(self.job, glue.view)
+        self.job.thread.start()
+
+    def run_pool(self):
+        workers = [threading.Thread(target=self.work) for i in range(self.pool_size)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+        failed = len([task for task in self.tasks if task.exitcode != 0])
+        self.job.exitcode = 1 if failed > 0 else 0
+        self.glue.record_metrics(self.job)
+        self.job.finish(self.job.exitcode)
+        self.notify()
+
+    def work(self):
+        while True:
+            with self.lock:
+                if self.cancelled or self.next_task >= len(self.tasks):
+                    return
+                task = self.tasks[self.next_task]
+                self.next_task += 1
+                task.started = True
+            self.run_task(task)
+            self.notify()
+
+    def run_task(self, task):
+        glue = self.glue
+        task.metrics = CommandMetrics(task.command, task.command.split()[0], glue.current_dirpath)
+        output = OutputSpiller(task.append, glue.spill_threshold, glue.spill_tail_chars)
+        record = output_index.create_writer(task.command, glue.current_dirpath)
+        exitcode = 1
+        process = None
+        try:
+            spawn_start = time.time()
+            process = glue.open_process(task.command, self.env)
+            with self.lock:
+                task.process = process
+                if self.cancelled:
+                    kill_process_group(process) # cancelled while the process started
+            task.metrics.spawn_time = time.time() - spawn_start
+            decoder = glue.create_decoder()
+            for name, chunk in iter_process_output(process):
+                if task.metrics.first_byte_time is None:
+                    task.metrics.first_byte_time = task.metrics.elapsed()
+                task.metrics.output_bytes += len(chunk)
+                text = decoder.decode(name, chunk)
+                output.feed(text)
+                record.write(text)
+                if task is self.tasks[self.next_print]:
+                    self.notify() # the output of the first unfinished command is written as it arrives
+            text = decoder.flush()
+            output.feed(text)
+            record.write(text)
+            process.stdout.close()
+            process.stderr.close()
+            exitcode = process.wait()
+        except Exception as e:
+            output.feed("Glue was unable to execute the command: " + str(e) + "\n")
+        finally:
+            if process is not None:
+                release_process(process)
+            output.close()
+            record.close(exitcode)
+            task.metrics.finish(exitcode)
+            command_metrics.add(task.metrics)
+            task.exitcode = exitcode
+            task.done = True
+
+    def notify(self):
+        scheduler.notify(self.job, self.print_output)
+
+    #------------------------------------------------------------------------------
+    # [ print_output method ] - write the output that is ready, in command order (main thread)
+    #------------------------------------------------------------------------------
+    def print_output(self):
+        if self.job.reported:
+            return
+        texts = []
+        while self.next_print < len(self.tasks):
+            task = self.tasks[self.next_print]
+            if not task.started:
+                break
+            if not self.header_printed:
+                texts.append("[" + str(task.number) + "/" + str(len(self.tasks)) + "] " + task.command + "\n")
+                self.header_printed = True
+            done = task.done # read before take() so that no output is left behind
+            texts.append(task.take())
+            if not done:
+                break
+            texts.append("[" + str(task.number) + "/" + str(len(self.tasks)) + "] exit " + str(task.exitcode) + " in " + format_duration(task.metrics.wall_time) + "\n\n")
+            self.next_print += 1
+            self.header_printed = False
+        if self.job.stream.is_closed():
+            texts.append(self.get_summary())
+        text = ''.join(texts)
+        if text:
+            self.glue.view.run_command('glue_stream_writer', {'text': text})
+        if self.job.stream.is_closed():
+            self.job.reported = True
+            scheduler.stop_indicator(self.job)
+            self.glue.remove_job(self.job)
+            self.glue.show_duration(self.job)
+            self.glue.view.run_command('glue_stream_writer', {'text': '', 'complete': True})
+
+    def get_summary(self):
+        rows = [['#', 'exit', 'time', 'command']]
+        for task in self.tasks:
+            if task.done:
+                rows.append([str(task.number), str(task.exitcode), format_duration(task.metrics.wall_time), task.command])
+            else:
+                rows.append([str(task.number), '-', '-', task.command + ' (not run)'])
+        widths = [max(len(row[i]) for row in rows) for i in range(3)]
+        summary_lines = ['  '.join([row[0].rjust(widths[0]), row[1].rjust(widths[1]), row[2].rjust(widths[2]), row[3]]) for row in rows]
+        failed = len([task for task in self.tasks if task.done and task.exitcode != 0])
+        command_time = sum(task.metrics.wall_time for task in self.tasks if task.done)
+        summary_lines.append('')
+        summary_lines.append(str(len(self.tasks)) + " commands, " + str(failed) + " failed, " + format_duration(time.time() - self.started) +
+                             " with " + str(self.pool_size) + " jobs (" + format_duration(command_time) + " of command time)")
+        summary_text = '\n'.join(summary_lines) + '\n'
+        return summary_text + self.job.get_stop_message()
+
+    #------------------------------------------------------------------------------
+    # [ kill method ] - stop the running commands, the commands that have not started are not run
+    #------------------------------------------------------------------------------
+    def kill(self):
+        with self.lock:
+            self.cancelled = True
+            processes = [task.process for task in self.tasks if task.process is not None and not task.done]
+        for process in processes:
+            kill_process_group(process)
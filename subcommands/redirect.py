@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import time
+import threading
+from collections import deque
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueStream import iter_process_output
+    from ..GlueMetrics import CommandMetrics, format_duration
+    from ..GlueScheduler import scheduler
+    from ..GlueJobs import release_process
+else:
+    from GlueStream import iter_process_output
+    from GlueMetrics import CommandMetrics, format_duration
+    from GlueScheduler import scheduler
+    from GlueJobs import release_process
+
+chunk_size = 1048576 # bytes per pipe read
+stderr_tail_chars = 4096 # error output that is shown in the terminal
+
+#------------------------------------------------------------------------------
+# [ run_to_buffer function ] - glue to-buffer <command>
+#   streams the standard output of the command into a new scratch buffer
+#------------------------------------------------------------------------------
+def run_to_buffer(glue, com_args, glue_command):
+    if len(com_args) < 3:
+        to_buffer_error_msg = "Please enter a command after the to-buffer command.\n"
+        glue.view.run_command('glue_writer', {'text': to_buffer_error_msg, 'command': glue_command, 'exit': False})
+        return
+    target_view = glue.view.window().new_file()
+    target_view.set_name(' '.join(com_args[2:]))
+    target_view.set_scratch(True)
+    redirect = OutputRedirect(glue, glue_command, com_args[2:], target_view=target_view)
+    redirect.start()
+
+#------------------------------------------------------------------------------
+# [ run_to_file function ] - glue to-file <path> <command>
+#   writes the standard output of the command to the file, the file is replaced
+#------------------------------------------------------------------------------
+def run_to_file(glue, com_args, glue_command):
+    if len(com_args) < 4:
+        to_file_error_msg = "Please enter a file path and a command after the to-file command.\n"
+        glue.view.run_command('glue_writer', {'text': to_file_error_msg, 'command': glue_command, 'exit': False})
+        return
+    file_path = os.path.join(glue.current_dirpath, os.path.expanduser(com_args[2]))
+    if os.path.isdir(file_path):
+        to_file_error_msg = "'" + com_args[2] + "' is a directory.\n"
+        glue.view.run_command('glue_writer', {'text': to_file_error_msg, 'command': glue_command, 'exit': False})
+        return
+    redirect = OutputRedirect(glue, glue_command, com_args[3:], file_path=file_path)
+    redirect.start()
+
+#------------------------------------------------------------------------------
+# [ OutputRedirect class ] - runs a command as a Glue job and sends its stdout to a view or a file
+#   file output is written as the raw bytes that are read from the pipe.  View output is decoded
+#   and passed through the bounded job stream, so the reader waits when the view falls behind.
+#   Only a summary line and the end of the error output are written to the terminal view.
+#------------------------------------------------------------------------------
+class OutputRedirect:
+    def __init__(self, glue, glue_command, command_args, target_view=None, file_path=None):
+        self.glue = glue
+        self.glue_command = glue_command
+        self.command_args = command_args
+        self.target_view = target_view
+        self.file_path = file_path
+        self.job = None
+        self.output_bytes = 0
+        self.line_count = 0
+        self.stderr_tail = deque()
+        self.stderr_size = 0
+        self.stderr_trimmed = False
+        self.error = None
+
+    def start(self):
+        glue = self.glue
+        executable = self.command_args[0]
+        metrics = CommandMetrics(self.glue_command, executable, glue.current_dirpath)
+        command = os.path.join(glue.get_path(executable), executable) + " " + ' '.join(self.command_args[1:])
+        metrics.path_time = metrics.elapsed()
+        self.job = glue.get_jobs().add(self.glue_command, False, glue.stream_buffer_size)
+        self.job.metrics = metrics
+        self.job.timeout = glue.get_timeout(False)
+        self.job.stream.set_listener(lambda: scheduler.notify(self.job, self.print_output))
+        self.job.thread = threading.Thread(target=self.execute, args=(command,))
+        scheduler.start_indicator(self.job, glue.view)
+        self.job.thread.start()
+
+    def execute(self, command):
+        job = self.job
+        exitcode = 1
+        output_file = None
+        process = None
+        try:
+            if self.file_path is not None:
+                output_file = open(self.file_path, 'wb')
+            spawn_start = time.time()
+            process = self.glue.open_process(command)
+            job.set_process(process)
+            job.metrics.spawn_time = time.time() - spawn_start
+            decoder = self.glue.create_decoder()
+            for name, chunk in iter_process_output(process, chunk_size):
+                if job.metrics.first_byte_time is None:
+                    job.metrics.first_byte_time = job.metrics.elapsed()
+                if name == 'stderr':
+                    self.add_stderr(decoder.decode(name, chunk))
+                    continue
+                self.output_bytes += len(chunk)
+                self.line_count += chunk.count(b'\n')
+                if output_file is not None:
+                    output_file.write(chunk)
+                else:
+                    job.stream.feed(decoder.decode(name, chunk))
+            if output_file is None:
+                job.stream.feed(decoder.flush())
+            process.stdout.close()
+            process.stderr.close()
+            exitcode = process.wait()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if process is not None:
+                release_process(process)
+            if output_file is not None:
+                output_file.close()
+            job.metrics.output_bytes = self.output_bytes
+            job.exitcode = exitcode
+            self.glue.record_metrics(job)
+            job.finish(exitcode)
+
+    def add_stderr(self, text):
+        self.stderr_tail.append(text)
+        self.stderr_size += len(text)
+        while self.stderr_size - len(self.stderr_tail[0]) >= stderr_tail_chars:
+            self.stderr_size -= len(self.stderr_tail.popleft())
+            self.stderr_trimmed = True
+
+    #------------------------------------------------------------------------------
+    # [ print_output method ] - run on the main thread when the job has new output or finishes
+    #------------------------------------------------------------------------------
+    def print_output(self):
+        job = self.job
+        if job.reported:
+            return
+        text = job.stream.drain()
+        if text and self.target_view is not None:
+            self.target_view.run_command('append', {'characters': text})
+        if job.stream.is_done():
+            job.reported = True
+            scheduler.stop_indicator(job)
+            self.glue.remove_job(job)
+            self.glue.show_duration(job)
+            self.glue.view.run_command('glue_writer', {'text': self.get_summary(), 'command': self.glue_command, 'exit': False})
+
+    def get_summary(self):
+        if self.error is not None:
+            return "Glue was unable to execute the command: " + self.error + "\n"
+        if self.target_view is not None:
+            target = "a new buffer"
+        else:
+            target = self.file_path
+        summary = "Wrote " + str(self.line_count) + " lines (" + str(self.output_bytes) + " bytes) to " + target
+        summary += " in " + format_duration(self.job.metrics.wall_time) + ", exit " + str(self.job.exitcode) + "\n"
+        summary += self.job.get_stop_message()
+        stderr_text = ''.join(self.stderr_tail)
+        if len(stderr_text) > 0:
+            if self.stderr_trimmed and '\n' in stderr_text:
+                stderr_text = stderr_text[stderr_text.index('\n') + 1:] # drop the partial first line
+            summary += stderr_text if stderr_text.endswith('\n') else stderr_text + '\n'
+        return summary
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import re
+import time
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueSearch import output_index
+else:
+    from GlueSearch import output_index
+
+#------------------------------------------------------------------------------
+# [ run_grep function ] - glue grep [-i] <pattern> [--cmd <text>]
+#   lists the lines of earlier command outputs that match the regular expression, most recent command first
+#------------------------------------------------------------------------------
+def run_grep(glue, com_args, glue_command):
+    ignore_case = False
+    command_filter = None
+    pattern_args = []
+    arguments = com_args[2:]
+    index = 0
+    while index < len(arguments):
+        if arguments[index] == '-i':
+            ignore_case = True
+        elif arguments[index] == '--cmd' and index + 1 < len(arguments):
+            command_filter = arguments[index + 1]
+            index += 1
+        elif arguments[index].startswith('--cmd='):
+            command_filter = arguments[index][len('--cmd='):]
+        else:
+            pattern_args.append(arguments[index])
+        index += 1
+    if len(pattern_args) == 0:
+        grep_error_msg = "Please enter a search pattern after the grep command.\n"
+        glue.view.run_command('glue_writer', {'text': grep_error_msg, 'command': glue_command, 'exit': False})
+        return
+    if not output_index.is_enabled():
+        grep_error_msg = "Command output is not recorded.  Set glue_output_index_size to a number of bytes to record it.\n"
+        glue.view.run_command('glue_writer', {'text': grep_error_msg, 'command': glue_command, 'exit': False})
+        return
+    pattern = ' '.join(pattern_args)
+    try:
+        results = output_index.search(pattern, ignore_case, command_filter, glue.settings.get('glue_grep_max_results', 200))
+    except re.error as e:
+        grep_error_msg = "The search pattern is not a valid regular expression: " + str(e) + "\n"
+        glue.view.run_command('glue_writer', {'text': grep_error_msg, 'command': glue_command, 'exit': False})
+        return
+    if len(results) == 0:
+        grep_msg = "No recorded output matches '" + pattern + "'\n"
+    else:
+        grep_lines = []
+        for record, lines in results:
+            grep_lines.append(format_record(record))
+            width = len(str(lines[-1][0]))
+            for line_number, line in lines:
+                grep_lines.append("  " + str(record.record_id) + ":" + str(line_number).ljust(width) + "  " + line)
+        grep_lines.append('')
+        grep_lines.append("Use 'glue show <output>:<line>' to open an output at a line")
+        grep_msg = '\n'.join(grep_lines) + '\n'
+    glue.view.run_command('glue_writer', {'text': grep_msg, 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_show function ] - glue show <output>[:<line>]
+#   opens a recorded command output in a new scratch buffer, at the line if there is one
+#------------------------------------------------------------------------------
+def run_show(glue, com_args, glue_command):
+    location = com_args[2].split(':') if len(com_args) > 2 else []
+    if len(location) == 0 or not location[0].isdigit() or (len(location) > 1 and not location[1].isdigit()):
+        show_error_msg = "Please enter the output number and optional line number after the show command (e.g. glue show 12:40).\n"
+        glue.view.run_command('glue_writer', {'text': show_error_msg, 'command': glue_command, 'exit': False})
+        return
+    record = output_index.get_record(int(location[0]))
+    if record is None:
+        show_error_msg = "Glue could not find recorded output " + location[0] + ".\n"
+        glue.view.run_command('glue_writer', {'text': show_error_msg, 'command': glue_command, 'exit': False})
+        return
+    output_view = glue.view.window().new_file()
+    output_view.set_name("Glue output " + str(record.record_id) + " - " + record.command)
+    output_view.set_scratch(True)
+    output_view.run_command('append', {'characters': output_index.read_output(record)})
+    output_view.set_read_only(True)
+    if len(location) > 1:
+        output_view.run_command('goto_line', {'line': int(location[1])})
+    show_msg = "Opened " + format_record(record) + "\n"
+    glue.view.run_command('glue_writer', {'text': show_msg, 'command': glue_command, 'exit': False})
+
+def format_record(record):
+    record_time = time.strftime('%Y-%m-%d %H:%M', time.localtime(record.start_time))
+    return "[" + str(record.record_id) + "] " + record.command + "  (exit " + str(record.exitcode) + ", " + record_time + ", " + record.cwd + ")"
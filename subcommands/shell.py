@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GluePath import executable_index
+else:
+    from GluePath import executable_index
+
+#------------------------------------------------------------------------------
+# [ run_path function ] - glue path
+#------------------------------------------------------------------------------
+def run_path(glue, com_args, glue_command):
+    if len(glue.userpath) == 0:
+        glue.get_path('') # establish the PATH for this platform (login shell PATH on Mac and optionally Linux)
+    if len(glue.userpath) > 0:
+        the_path = glue.userpath
+    else:
+        the_path = os.environ['PATH'] # Windows, or the login shell environment is still loading
+    glue.view.run_command('glue_writer', {'text': the_path + '\n', 'command': glue_command, 'exit': False})
+
+#------------------------------------------------------------------------------
+# [ run_rehash function ] - glue rehash
+#------------------------------------------------------------------------------
+def run_rehash(glue, com_args, glue_command):
+    if len(glue.userpath) == 0:
+        glue.get_path('') # establish the PATH string for this platform
+    executable_count, directory_count = executable_index.rehash(glue.userpath or os.environ['PATH'])
+    rehash_msg = "Indexed " + str(executable_count) + " executables in " + str(directory_count) + " PATH directories\n"
+    glue.view.run_command('glue_writer', {'text': rehash_msg, 'command': glue_command, 'exit': False})
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from sys import version_info
+
+if version_info[0] == 3:
+    from ..GlueMetrics import command_metrics, format_duration
+else:
+    from GlueMetrics import command_metrics, format_duration
+
+#------------------------------------------------------------------------------
+# [ run_stats function ] - glue stats [clear]
+#   per executable summary of the recent system commands
+#------------------------------------------------------------------------------
+def run_stats(glue, com_args, glue_command):
+    if len(com_args) > 2 and com_args[2] == 'clear':
+        command_metrics.clear()
+        glue.view.run_command('glue_writer', {'text': "Glue command metrics cleared\n", 'command': glue_command, 'exit': False})
+        return
+    summaries = command_metrics.aggregate()
+    if len(summaries) == 0:
+        glue.view.run_command('glue_writer', {'text': "Glue has not run any system commands yet\n", 'command': glue_command, 'exit': False})
+        return
+    columns = ['executable', 'runs', 'failed', 'total', 'mean', 'max', 'path', 'spawn', '1st byte', 'output']
+    rows = []
+    for summary in summaries:
+        wall_times = summary['wall_times']
+        rows.append([summary['executable'], str(summary['runs']), str(summary['failures']),
+                     format_duration(sum(wall_times)), format_duration(mean(wall_times)), format_duration(max(wall_times) if wall_times else None),
+                     format_duration(mean(summary['path_times'])), format_duration(mean(summary['spawn_times'])),
+                     format_duration(mean(summary['first_byte_times'])), format_bytes(summary['output_bytes'])])
+    widths = [max(len(row[i]) for row in [columns] + rows) for i in range(len(columns))]
+    stats_lines = []
+    for row in [columns] + rows:
+        cells = [row[0].ljust(widths[0])] + [row[i].rjust(widths[i]) for i in range(1, len(row))]
+        stats_lines.append('  '.join(cells))
+    last = command_metrics.get_last()
+    stats_lines.append('')
+    stats_lines.append("Last command: " + last.command + " " + format_duration(last.wall_time) + " (exit " + str(last.exitcode) + ")")
+    stats_lines.append("Times are means over the last " + str(len(command_metrics.get_records())) + " system commands")
+    if command_metrics.log_path is not None:
+        stats_lines.append("Metrics log: " + command_metrics.log_path)
+    glue.view.run_command('glue_writer', {'text': '\n'.join(stats_lines) + '\n', 'command': glue_command, 'exit': False})
+
+def mean(values):
+    if len(values) == 0:
+        return None
+    return sum(values) / float(len(values))
+
+def format_bytes(byte_count):
+    for unit in ('B', 'KB', 'MB'):
+        if byte_count < 1024:
+            return str(byte_count) + unit
+        byte_count = byte_count // 1024
+    return str(byte_count) + 'GB'
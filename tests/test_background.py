@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Glue background job tests - python -m unittest discover tests
+#   the commands run in a terminal view of the stub sublime API from the benchmarks
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import unittest
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(package_dir, 'benchmarks'))
+
+import run_benchmarks # also puts the sublime stubs on sys.path
+import sublime
+
+class BackgroundTest(unittest.TestCase):
+    def setUp(self):
+        self.glue_module = run_benchmarks.load_glue()
+        self.env = run_benchmarks.BenchmarkEnvironment(self.glue_module)
+        self.terminal = self.env.terminal
+
+    def tearDown(self):
+        self.env.close()
+
+    def run_command(self, user_command):
+        panel_count = self.terminal.panel_count()
+        self.terminal.submit(user_command)
+        self.terminal.wait_for_panel(panel_count, 10)
+        return self.terminal.view.text
+
+    def test_strip_background(self):
+        strip_background = self.glue_module.strip_background
+        self.assertEqual(strip_background("sleep 1 &"), "sleep 1 ")
+        self.assertEqual(strip_background("sleep 1&  "), "sleep 1")
+        self.assertEqual(strip_background('echo "a"&'), 'echo "a"')
+        self.assertIsNone(strip_background("echo 'a &'"))
+        self.assertIsNone(strip_background("echo a\\&"))
+        self.assertIsNone(strip_background("echo a &&"))
+        self.assertIsNone(strip_background("echo a"))
+
+    def test_trailing_ampersand_runs_in_background(self):
+        text = self.run_command("sleep 0 &")
+        self.assertIn("[1] running in the background", text)
+        job = self.terminal.view.commands['glue'].get_jobs().list_jobs()[0]
+        sublime.event_loop.run_until(job.stream.is_closed, 10) # the job must not outlive the temporary directory
+
+    def test_quoted_ampersand_runs_in_foreground(self):
+        text = self.run_command("echo 'a &'")
+        self.assertNotIn("running in the background", text)
+        self.assertEqual(self.terminal.view.commands['glue'].get_jobs().list_jobs(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Glue cached tests - python -m unittest discover tests
+#   the commands run in a terminal view of the stub sublime API from the benchmarks
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import unittest
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(package_dir, 'benchmarks'))
+
+import run_benchmarks # also puts the sublime stubs on sys.path
+
+class CachedTest(unittest.TestCase):
+    def setUp(self):
+        self.glue_module = run_benchmarks.load_glue()
+        self.env = run_benchmarks.BenchmarkEnvironment(self.glue_module)
+        self.terminal = self.env.terminal
+
+    def tearDown(self):
+        self.env.close()
+
+    # returns the text that the command added to the view
+    def run_command(self, user_command):
+        view_size = len(self.terminal.view.text)
+        panel_count = self.terminal.panel_count()
+        self.terminal.submit(user_command)
+        self.terminal.wait_for_panel(panel_count, 10)
+        self.assertGreater(self.terminal.panel_count(), panel_count, 'the input panel was not reopened')
+        return self.terminal.view.text[view_size:]
+
+    def test_miss_then_hit(self):
+        miss_text = self.run_command('glue cached echo cached output')
+        self.assertIn('] glue cached echo cached output\ncached output\n', miss_text) # the prompt shows what was entered
+        hit_text = self.run_command('glue cached echo cached output')
+        self.assertIn('cached output\n[ Glue: cached result from ', hit_text)
+
+    # an error while the missed command starts is reported and does not leave the cache key for the next command
+    def test_miss_error(self):
+        glue_class = self.glue_module.GlueCommand
+        get_jobs = glue_class.get_jobs
+        def failing_get_jobs(glue):
+            raise RuntimeError('get_jobs failed')
+        glue_class.get_jobs = failing_get_jobs # only the system command path uses the job table
+        try:
+            error_text = self.run_command('glue cached echo one')
+        finally:
+            glue_class.get_jobs = get_jobs
+        self.assertIn('Glue encountered an error', error_text)
+        self.assertIn('get_jobs failed', error_text)
+        self.run_command('echo two')
+        self.assertNotIn('cached result', self.run_command('glue cached echo one'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Glue history tests - python -m unittest discover tests
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import types
+import random
+import unittest
+import importlib
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import the repository as the Glue package, like ST does
+def load_module(name):
+    if 'Glue' not in sys.modules:
+        package = types.ModuleType('Glue')
+        package.__path__ = [package_dir]
+        sys.modules['Glue'] = package
+    return importlib.import_module('Glue.' + name)
+
+GlueHistory = load_module('GlueHistory')
+
+# the search results computed from the entries without an index
+def search_entries(entries, query, cwd, prefix, limit):
+    def unique_commands(dir_filter):
+        commands = []
+        for command, entry_cwd, entry_time in reversed(entries):
+            if command not in commands and (dir_filter is None or entry_cwd == dir_filter) and (command.startswith(query) if prefix else query in command):
+                commands.append(command)
+        return commands
+    results = unique_commands(cwd) if cwd is not None else []
+    results += [command for command in unique_commands(None) if command not in results]
+    return results[:limit]
+
+class CommandHistoryTest(unittest.TestCase):
+    def create_history(self, max_entries):
+        history = GlueHistory.CommandHistory(max_entries)
+        history.loaded = True # no history file
+        return history
+
+    def test_most_recent_first(self):
+        history = self.create_history(100)
+        for command in ['git status', 'make', 'git commit', 'git status']:
+            history.add(command, '/a')
+        self.assertEqual(history.search('git'), ['git status', 'git commit'])
+        self.assertEqual(history.search('g', prefix=True), ['git status', 'git commit'])
+        self.assertEqual(history.search('a'), ['git status', 'make'])
+
+    # the indexes are updated by add, including entries that are trimmed from the history
+    def test_matches_entries(self):
+        rng = random.Random(1)
+        words = ['git', 'status', 'ls', 'make', 'cd', 'gi', 'st', 'a', 'x']
+        queries = ['', 'g', 'gi', 'git', 't s', 'sta', 'a', 'x a', 'zz']
+        for max_entries in (5, 20, 50):
+            history = self.create_history(max_entries)
+            for i in range(300):
+                history.add(' '.join(rng.choice(words) for j in range(rng.randint(1, 3))), rng.choice(['/a', '/b']))
+                query = rng.choice(queries)
+                cwd = rng.choice([None, '/a', '/b'])
+                prefix = rng.random() < 0.5
+                limit = rng.choice([1, 3, 50])
+                self.assertEqual(history.search(query, cwd, prefix, limit), search_entries(history.entries, query, cwd, prefix, limit))
+
+if __name__ == '__main__':
+    unittest.main()
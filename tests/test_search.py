@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Glue search tests - python -m unittest discover tests
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import types
+import shutil
+import tempfile
+import unittest
+import importlib
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import the repository as the Glue package, like ST does
+def load_module(name):
+    if 'Glue' not in sys.modules:
+        package = types.ModuleType('Glue')
+        package.__path__ = [package_dir]
+        sys.modules['Glue'] = package
+    return importlib.import_module('Glue.' + name)
+
+GlueSearch = load_module('GlueSearch')
+
+class GetLiteralsTest(unittest.TestCase):
+    def test_plain_pattern(self):
+        self.assertEqual(GlueSearch.get_literals('error: file'), ['error: file'])
+
+    def test_quantifier_braces(self):
+        self.assertEqual(GlueSearch.get_literals('ab{2,3}c'), [])
+        self.assertEqual(GlueSearch.get_literals('a{1,2}bcd'), ['bcd'])
+        self.assertEqual(GlueSearch.get_literals('xyza{3}bcd'), ['xyz', 'bcd'])
+        self.assertEqual(GlueSearch.get_literals('xyza{,3}bcd'), ['xyz', 'bcd'])
+
+    def test_escaped_braces(self):
+        self.assertEqual(GlueSearch.get_literals('ab\\{2,3\\}c'), ['ab{2,3}c'])
+
+    def test_literal_braces(self):
+        # Python matches braces that are not a quantifier literally, no literals rather than wrong ones
+        self.assertEqual(GlueSearch.get_literals('a{}bcd'), [])
+        self.assertEqual(GlueSearch.get_literals('abc{x}def'), [])
+
+    def test_unsure_patterns(self):
+        self.assertEqual(GlueSearch.get_literals('abc\\x41def'), [])
+        self.assertEqual(GlueSearch.get_literals('abc[\\]]def'), [])
+        self.assertEqual(GlueSearch.get_literals('abc[]xyz]def'), ['abc', 'def'])
+
+    # every literal must be in the text of each match
+    def test_literals_are_in_matches(self):
+        cases = [('ab{2,3}c', 'xabbbcx'), ('a{1,2}bcd', 'aabcd'), ('fo{0}bar', 'fbar'), ('colou?red', 'colored'), ('x*yz{2}w', 'yzzw')]
+        for pattern, text in cases:
+            match = GlueSearch.re.search(pattern, text).group(0)
+            for literal in GlueSearch.get_literals(pattern):
+                self.assertIn(literal, match, pattern)
+
+class OutputIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp(prefix='glue-test-')
+        self.index = GlueSearch.OutputIndex()
+        self.index.configure(self.store_dir, 1048576, 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    def wait_for_bitmaps(self):
+        deadline = time.time() + 10
+        while (self.index.worker is not None or len(self.index.queue) > 0) and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_search_with_quantifier(self):
+        self.index.add('echo', self.store_dir, 0, 'xabbbcx\n')
+        self.wait_for_bitmaps()
+        results = self.index.search('ab{2,3}c')
+        self.assertEqual([lines for record, lines in results], [[(1, 'xabbbcx')]])
+
+if __name__ == '__main__':
+    unittest.main()
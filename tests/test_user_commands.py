@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+#------------------------------------------------------------------------------
+# Glue user command tests - python -m unittest discover tests
+#   the commands run in a terminal view of the stub sublime API from the benchmarks
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import unittest
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(package_dir, 'benchmarks'))
+
+import run_benchmarks # also puts the sublime stubs on sys.path
+import sublime
+
+class UserCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.glue_module = run_benchmarks.load_glue()
+        self.env = run_benchmarks.BenchmarkEnvironment(self.glue_module)
+        self.terminal = self.env.terminal
+
+    def tearDown(self):
+        self.env.close()
+
+    def write_commands(self, user_json):
+        with open(os.path.join(sublime.packages_path(), 'Glue-Commands', 'glue.json'), 'w') as json_file:
+            json.dump(user_json, json_file)
+
+    def run_command(self, user_command):
+        panel_count = self.terminal.panel_count()
+        self.terminal.submit(user_command)
+        self.terminal.wait_for_panel(panel_count, 10)
+        return self.terminal.view.text
+
+    def test_expands_user_command(self):
+        self.write_commands({'hello': 'echo hello {{args}}'})
+        self.assertIn('hello world\n', self.run_command('glue hello world'))
+
+    def test_cycle_between_user_commands(self):
+        self.write_commands({'a': 'glue b', 'b': 'glue a'})
+        self.assertIn('Glue found a loop in your user commands: a -> b -> a', self.run_command('glue a'))
+
+    # glue timeout runs its command through muterun again, the loop goes through it
+    def test_cycle_through_builtin(self):
+        self.write_commands({'a': 'glue timeout 5 glue a', 'b': 'glue timeout 5 glue c', 'c': 'glue b'})
+        self.assertIn('Glue found a loop in your user commands: a -> a', self.run_command('glue a'))
+        self.assertIn('Glue found a loop in your user commands: b -> c -> b', self.run_command('glue b'))
+
+    def test_builtin_without_cycle(self):
+        self.write_commands({'a': 'glue timeout 5 glue b', 'b': 'echo done'})
+        self.assertIn('done\n', self.run_command('glue a'))
+        self.assertIn('done\n', self.run_command('glue a')) # the chain of the first run is not kept
+
+if __name__ == '__main__':
+    unittest.main()